@@ -0,0 +1,225 @@
+"""
+Per route group concurrency limits with bounded waiting queues and load shedding.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+
+from app_settings import get_app_settings
+
+# Path prefix of each route group limited by ADMISSION_LIMITS
+ROUTE_GROUP_PREFIXES = {
+    "auth": "/api/v1/auth",
+    "stock-items": "/api/v1/stock-items",
+    "export": "/api/v1/stock-items/export",
+    "users": "/api/v1/users",
+}
+
+
+class RouteGroup:
+    """
+    Admission state of a group of routes sharing a path prefix. At most max_in_flight
+    requests run at once, up to max_queue more wait in arrival order for at most
+    max_wait seconds and everything beyond that is shed. Used from a single event loop.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        prefix: str,
+        max_in_flight: int,
+        max_queue: int,
+        max_wait: float,
+    ):
+        """
+        Initialize RouteGroup.
+        Args:
+            name (str): Name of the group used in the metrics.
+            prefix (str): Path prefix of the routes in the group.
+            max_in_flight (int): Number of requests run concurrently.
+            max_queue (int): Number of requests waiting for a free slot.
+            max_wait (float): Seconds a request waits for a free slot before it is shed.
+        """
+        self.name = name
+        self.prefix = prefix
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self.waiters = deque()
+        self.admitted_total = 0
+        self.shed_queue_full_total = 0
+        self.shed_timeout_total = 0
+        self.queue_wait_seconds_total = 0.0
+
+    async def acquire(self) -> bool:
+        """
+        Wait for a free slot.
+        Returns:
+            bool: Whether the request was admitted. Admitted requests must call release.
+        """
+        if self.in_flight < self.max_in_flight and not self.waiters:
+            self.in_flight += 1
+            self.admitted_total += 1
+            return True
+        if len(self.waiters) >= self.max_queue:
+            self.shed_queue_full_total += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            self.shed_timeout_total += 1
+            return False
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before the client went away
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            self.queue_wait_seconds_total += time.monotonic() - start
+            if not waiter.done() or waiter.cancelled():
+                try:
+                    self.waiters.remove(waiter)
+                except ValueError:
+                    pass
+        self.admitted_total += 1
+        return True
+
+    def release(self):
+        """
+        Free the slot of a finished request, handing it over to the longest waiting one.
+        """
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                # The slot passes to the waiter, in_flight stays the same
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+
+class AdmissionController:
+    """
+    Matches request paths to route groups by the longest prefix and exports their
+    state in the Prometheus text format for monitoring and autoscaling.
+    """
+
+    def __init__(self, groups: list[RouteGroup]):
+        """
+        Initialize AdmissionController.
+        Args:
+            groups (list[RouteGroup]): Route groups, matched by the longest prefix.
+        """
+        self.groups = sorted(groups, key=lambda group: len(group.prefix), reverse=True)
+
+    def get_group(self, path: str) -> RouteGroup | None:
+        """
+        Return the route group of a request path.
+        Args:
+            path (str): Path of the request.
+        Returns:
+            RouteGroup | None: The group with the longest matching prefix, None if no group matches.
+        """
+        for group in self.groups:
+            if path == group.prefix or path.startswith(group.prefix.rstrip("/") + "/"):
+                return group
+        return None
+
+    def format_metrics(self) -> str:
+        """
+        Return the state of all route groups in the Prometheus text format.
+        Returns:
+            str: The metrics.
+        """
+        metrics = [
+            (
+                "admission_in_flight",
+                "gauge",
+                "Requests currently running.",
+                "in_flight",
+            ),
+            (
+                "admission_queue_depth",
+                "gauge",
+                "Requests waiting for a free slot.",
+                "queue_depth",
+            ),
+            (
+                "admission_max_in_flight",
+                "gauge",
+                "Maximum number of requests running at once.",
+                "max_in_flight",
+            ),
+            (
+                "admission_max_queue",
+                "gauge",
+                "Maximum number of waiting requests.",
+                "max_queue",
+            ),
+            (
+                "admission_admitted_total",
+                "counter",
+                "Requests admitted.",
+                "admitted_total",
+            ),
+            (
+                "admission_queue_wait_seconds_total",
+                "counter",
+                "Seconds spent by requests waiting for a free slot.",
+                "queue_wait_seconds_total",
+            ),
+        ]
+        lines = []
+        for name, metric_type, description, attribute in metrics:
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for group in self.groups:
+                if attribute == "queue_depth":
+                    value = len(group.waiters)
+                else:
+                    value = getattr(group, attribute)
+                lines.append(f'{name}{{group="{group.name}"}} {value}')
+        lines.append(
+            "# HELP admission_shed_total Requests rejected with 503 because the queue was full or the wait timed out."
+        )
+        lines.append("# TYPE admission_shed_total counter")
+        for group in self.groups:
+            lines.append(
+                f'admission_shed_total{{group="{group.name}",reason="queue_full"}} {group.shed_queue_full_total}'
+            )
+            lines.append(
+                f'admission_shed_total{{group="{group.name}",reason="timeout"}} {group.shed_timeout_total}'
+            )
+        return "\n".join(lines) + "\n"
+
+
+_admission_controller = None
+_admission_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """
+    Return the process wide admission controller, creating it on first use with
+    the limits of ADMISSION_LIMITS. Groups without configured limits are not limited.
+    Returns:
+        AdmissionController: The admission controller.
+    """
+    global _admission_controller
+    if _admission_controller is None:
+        with _admission_controller_lock:
+            if _admission_controller is None:
+                limits = get_app_settings().admission_limits
+                _admission_controller = AdmissionController(
+                    [
+                        RouteGroup(name, prefix, *limits[name])
+                        for name, prefix in ROUTE_GROUP_PREFIXES.items()
+                        if name in limits
+                    ]
+                )
+    return _admission_controller
@@ -0,0 +1,50 @@
+"""
+ASGI middleware shedding requests of overloaded route groups with 503.
+"""
+
+from starlette.responses import JSONResponse
+
+from admission.admission_controller import AdmissionController
+
+
+class AdmissionControlMiddleware:
+    """
+    Admits requests of each route group up to its in-flight cap, lets a bounded number
+    wait for a free slot and answers the rest with 503 and a Retry-After header right
+    away, so a slow database does not pile up requests until the worker runs out of
+    memory. A request holds its slot until its response, including a streamed body,
+    has been sent. Paths outside of every route group are not limited.
+    """
+
+    def __init__(self, app, controller: AdmissionController, retry_after: int):
+        """
+        Initialize AdmissionControlMiddleware.
+        Args:
+            app: The ASGI application to wrap.
+            controller (AdmissionController): Route groups and their state.
+            retry_after (int): Seconds sent in the Retry-After header of shed requests.
+        """
+        self.app = app
+        self.controller = controller
+        self.retry_after = retry_after
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        group = self.controller.get_group(scope["path"])
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await group.acquire():
+            await JSONResponse(
+                {"detail": "Service is overloaded, retry later"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)},
+            )(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            group.release()
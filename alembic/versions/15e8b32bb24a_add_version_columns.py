@@ -0,0 +1,32 @@
+"""Add version columns
+
+Revision ID: 15e8b32bb24a
+Revises: 81bcfe0cc6d7
+Create Date: 2026-10-19 12:03:41.508214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '15e8b32bb24a'
+down_revision: Union[str, None] = '81bcfe0cc6d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('item_category', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('role', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('stock_item', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('user', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('user', 'version')
+    op.drop_column('stock_item', 'version')
+    op.drop_column('role', 'version')
+    op.drop_column('item_category', 'version')
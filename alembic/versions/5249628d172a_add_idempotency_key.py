@@ -0,0 +1,38 @@
+"""Add idempotency key
+
+Revision ID: 5249628d172a
+Revises: bdc5d2ed3c55
+Create Date: 2026-10-19 13:52:26.914377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5249628d172a'
+down_revision: Union[str, None] = 'bdc5d2ed3c55'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('idempotency_key',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('request_hash', sa.String(length=64), nullable=False),
+    sa.Column('status_code', sa.Integer(), nullable=True),
+    sa.Column('headers', sa.Text(), nullable=True),
+    sa.Column('body', sa.LargeBinary(length=16777216), nullable=True),
+    sa.Column('creation_date', sa.DateTime(), nullable=False),
+    sa.Column('expiration_date', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('user_id', 'key')
+    )
+    op.create_index('ix_IdempotencyKey_expiration_date', 'idempotency_key', ['expiration_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_IdempotencyKey_expiration_date', table_name='idempotency_key')
+    op.drop_table('idempotency_key')
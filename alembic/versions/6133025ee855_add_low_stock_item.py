@@ -0,0 +1,34 @@
+"""Add reorder threshold and low stock item
+
+Revision ID: 6133025ee855
+Revises: 6c1d8e2f4a17
+Create Date: 2026-10-19 18:04:52.731406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6133025ee855'
+down_revision: Union[str, None] = '6c1d8e2f4a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('stock_item', sa.Column('reorder_threshold', sa.Integer(), server_default='0', nullable=False))
+    # Every existing stock item gets threshold 0 and is not low on stock, the table starts empty
+    op.create_table('low_stock_item',
+    sa.Column('stock_item_id', sa.Integer(), nullable=False),
+    sa.Column('low_since', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['stock_item_id'], ['stock_item.id'], name='fk_LowStockItem_stock_item_id'),
+    sa.PrimaryKeyConstraint('stock_item_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('low_stock_item')
+    op.drop_column('stock_item', 'reorder_threshold')
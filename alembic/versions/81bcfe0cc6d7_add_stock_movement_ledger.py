@@ -0,0 +1,72 @@
+"""Add stock movement ledger
+
+Revision ID: 81bcfe0cc6d7
+Revises: fcbcab8f06ca
+Create Date: 2026-10-19 10:41:07.215640
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+from zoneinfo import ZoneInfo
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '81bcfe0cc6d7'
+down_revision: Union[str, None] = 'fcbcab8f06ca'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('stock_movement',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('stock_item_id', sa.Integer(), nullable=False),
+    sa.Column('delta', sa.Integer(), nullable=False),
+    sa.Column('reason', sa.String(length=50), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('creation_date', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_StockMovement_stock_item_id_id', 'stock_movement', ['stock_item_id', 'id'], unique=False)
+    op.create_table('stock_balance_snapshot',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('stock_item_id', sa.Integer(), nullable=False),
+    sa.Column('movement_id', sa.Integer(), nullable=False),
+    sa.Column('balance', sa.Integer(), nullable=False),
+    sa.Column('snapshot_date', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_StockBalanceSnapshot_stock_item_id_snapshot_date', 'stock_balance_snapshot', ['stock_item_id', 'snapshot_date'], unique=False)
+    op.create_index('ix_StockBalanceSnapshot_stock_item_id_movement_id', 'stock_balance_snapshot', ['stock_item_id', 'movement_id'], unique=False)
+    op.add_column('stock_item', sa.Column('movement_count', sa.Integer(), server_default='0', nullable=False))
+    # Opening balances, so existing items have a starting point in the ledger. Dated in
+    # Europe/Warsaw time like the dates the application writes, CURRENT_TIMESTAMP is UTC
+    # on SQLite
+    op.execute(
+        sa.text(
+            "INSERT INTO stock_movement "
+            "(stock_item_id, delta, reason, user_id, creation_date) "
+            "SELECT id, quantity, 'opening balance', NULL, :opening_date "
+            "FROM stock_item WHERE quantity <> 0"
+        ).bindparams(
+            opening_date=datetime.now(ZoneInfo("Europe/Warsaw")).replace(tzinfo=None)
+        )
+    )
+    op.execute("UPDATE stock_item SET movement_count = 1 WHERE quantity <> 0")
+    op.execute(
+        "INSERT INTO stock_balance_snapshot "
+        "(stock_item_id, movement_id, balance, snapshot_date) "
+        "SELECT stock_item_id, id, delta, creation_date FROM stock_movement"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('stock_item', 'movement_count')
+    op.drop_index('ix_StockBalanceSnapshot_stock_item_id_movement_id', table_name='stock_balance_snapshot')
+    op.drop_index('ix_StockBalanceSnapshot_stock_item_id_snapshot_date', table_name='stock_balance_snapshot')
+    op.drop_table('stock_balance_snapshot')
+    op.drop_index('ix_StockMovement_stock_item_id_id', table_name='stock_movement')
+    op.drop_table('stock_movement')
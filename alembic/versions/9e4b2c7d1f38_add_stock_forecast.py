@@ -0,0 +1,47 @@
+"""Add stock forecast and stock forecast run
+
+Revision ID: 9e4b2c7d1f38
+Revises: 6133025ee855
+Create Date: 2026-10-19 19:12:07.318544
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4b2c7d1f38'
+down_revision: Union[str, None] = '6133025ee855'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_StockMovement_creation_date', 'stock_movement', ['creation_date'], unique=False)
+    # The table starts empty, the first compute_stock_forecasts job computes every stock item
+    op.create_table('stock_forecast',
+    sa.Column('stock_item_id', sa.Integer(), nullable=False),
+    sa.Column('short_term_daily_consumption', sa.Float(), nullable=False),
+    sa.Column('long_term_daily_consumption', sa.Float(), nullable=False),
+    sa.Column('days_until_stockout', sa.Float(), nullable=True),
+    sa.Column('suggested_reorder_quantity', sa.Integer(), nullable=False),
+    sa.Column('movement_id', sa.Integer(), nullable=False),
+    sa.Column('computation_date', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('stock_item_id')
+    )
+    op.create_table('stock_forecast_run',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('movement_id', sa.Integer(), nullable=False),
+    sa.Column('full', sa.Boolean(), nullable=False),
+    sa.Column('computed', sa.Integer(), nullable=False),
+    sa.Column('computation_date', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('stock_forecast_run')
+    op.drop_table('stock_forecast')
+    op.drop_index('ix_StockMovement_creation_date', table_name='stock_movement')
@@ -0,0 +1,47 @@
+"""Add stock item tombstone
+
+Revision ID: bdc5d2ed3c55
+Revises: 15e8b32bb24a
+Create Date: 2026-10-19 12:47:12.330871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bdc5d2ed3c55'
+down_revision: Union[str, None] = '15e8b32bb24a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('stock_item_tombstone',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('stock_item_id', sa.Integer(), nullable=False),
+    sa.Column('deletion_date', sa.DateTime(), nullable=False),
+    sa.Column('change_sequence', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_StockItemTombstone_change_sequence_id', 'stock_item_tombstone', ['change_sequence', 'id'], unique=False)
+    op.create_table('stock_item_change_sequence',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO stock_item_change_sequence (id, value) VALUES (1, 0)")
+    op.add_column('stock_item', sa.Column('change_sequence', sa.Integer(), server_default='0', nullable=False))
+    op.create_index('ix_StockItem_change_sequence_id', 'stock_item', ['change_sequence', 'id'], unique=False)
+    op.create_index('ix_StockItem_last_modification_date_id', 'stock_item', ['last_modification_date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_StockItem_last_modification_date_id', table_name='stock_item')
+    op.drop_index('ix_StockItem_change_sequence_id', table_name='stock_item')
+    op.drop_column('stock_item', 'change_sequence')
+    op.drop_table('stock_item_change_sequence')
+    op.drop_index('ix_StockItemTombstone_change_sequence_id', table_name='stock_item_tombstone')
+    op.drop_table('stock_item_tombstone')
@@ -0,0 +1,52 @@
+"""Add category stock summary
+
+Revision ID: fcbcab8f06ca
+Revises: 226b6f30bb67
+Create Date: 2026-10-19 09:12:31.482913
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+from zoneinfo import ZoneInfo
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fcbcab8f06ca'
+down_revision: Union[str, None] = '226b6f30bb67'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('category_stock_summary',
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('item_count', sa.Integer(), nullable=False),
+    sa.Column('total_quantity', sa.Integer(), nullable=False),
+    sa.Column('last_modification_date', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['item_category.id'], name='fk_CategoryStockSummary_category_id'),
+    sa.PrimaryKeyConstraint('category_id')
+    )
+    # Every category gets a row, empty ones with zero totals. Dated in Europe/Warsaw
+    # time like the dates the application writes, CURRENT_TIMESTAMP is UTC on SQLite
+    op.execute(
+        sa.text(
+            "INSERT INTO category_stock_summary "
+            "(category_id, item_count, total_quantity, last_modification_date) "
+            "SELECT item_category.id, COUNT(stock_item.id), "
+            "COALESCE(SUM(stock_item.quantity), 0), :modification_date "
+            "FROM item_category "
+            "LEFT JOIN stock_item ON stock_item.category_id = item_category.id "
+            "GROUP BY item_category.id"
+        ).bindparams(
+            modification_date=datetime.now(ZoneInfo("Europe/Warsaw")).replace(
+                tzinfo=None
+            )
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('category_stock_summary')
@@ -3,10 +3,22 @@ Module for managing application settings and environment variables.
 """
 
 import os
+import threading
 
 from dotenv import load_dotenv
 
-from exceptions.exceptions import NoEnvirnomentVariableException
+from exceptions.exceptions import (
+    InvalidSettingException,
+    NoEnvirnomentVariableException,
+)
+
+# Maximum page size of each list endpoint, MAX_PAGE_SIZES entries override them
+DEFAULT_MAX_PAGE_SIZES = {
+    "stock-items": 200,
+    "item-categories": 100,
+    "users": 100,
+    "roles": 100,
+}
 
 
 class AppSettings:
@@ -38,6 +50,90 @@ class AppSettings:
                 os.getenv("DEV_REFRESH_TOKEN_EXPIRATION_TIME")
             )
             self._alghoritm = os.getenv("DEV_ALGORITHM")
+            self._fast_serialization = os.getenv("DEV_FAST_SERIALIZATION", "false")
+            self._compression_enabled = os.getenv("DEV_COMPRESSION_ENABLED", "true")
+            self._compression_minimum_size = os.getenv(
+                "DEV_COMPRESSION_MINIMUM_SIZE", "1024"
+            )
+            self._compression_level = os.getenv("DEV_COMPRESSION_LEVEL", "6")
+            self._compression_streaming = os.getenv(
+                "DEV_COMPRESSION_STREAMING", "false"
+            )
+            self._stock_snapshot_interval = os.getenv(
+                "DEV_STOCK_SNAPSHOT_INTERVAL", "50"
+            )
+            self._event_backend = os.getenv("DEV_EVENT_BACKEND", "local")
+            self._event_redis_url = os.getenv(
+                "DEV_EVENT_REDIS_URL", "redis://localhost:6379/0"
+            )
+            self._event_channel = os.getenv("DEV_EVENT_CHANNEL", "stock-manager-events")
+            self._event_queue_size = os.getenv("DEV_EVENT_QUEUE_SIZE", "100")
+            self._event_heartbeat_interval = os.getenv(
+                "DEV_EVENT_HEARTBEAT_INTERVAL", "15"
+            )
+            self._stock_item_batch_max_ids = os.getenv(
+                "DEV_STOCK_ITEM_BATCH_MAX_IDS", "500"
+            )
+            self._idempotency_key_ttl = os.getenv("DEV_IDEMPOTENCY_KEY_TTL", "86400")
+            self._idempotency_lock_timeout = os.getenv(
+                "DEV_IDEMPOTENCY_LOCK_TIMEOUT", "60"
+            )
+            self._idempotency_wait_timeout = os.getenv(
+                "DEV_IDEMPOTENCY_WAIT_TIMEOUT", "10"
+            )
+            self._job_workers = os.getenv("DEV_JOB_WORKERS", "2")
+            self._job_stale_timeout = os.getenv("DEV_JOB_STALE_TIMEOUT", "600")
+            self._job_retry_delay = os.getenv("DEV_JOB_RETRY_DELAY", "30")
+            self._import_chunk_size = os.getenv("DEV_IMPORT_CHUNK_SIZE", "1000")
+            self._import_max_errors = os.getenv("DEV_IMPORT_MAX_ERRORS", "1000")
+            self._admission_control_enabled = os.getenv(
+                "DEV_ADMISSION_CONTROL_ENABLED", "true"
+            )
+            self._admission_limits = os.getenv(
+                "DEV_ADMISSION_LIMITS",
+                "auth=20:50:2,stock-items=40:200:5,users=10:50:5,export=2:4:10",
+            )
+            self._admission_retry_after = os.getenv("DEV_ADMISSION_RETRY_AFTER", "1")
+            self._request_coalescing_enabled = os.getenv(
+                "DEV_REQUEST_COALESCING_ENABLED", "false"
+            )
+            self._query_cache_backend = os.getenv("DEV_QUERY_CACHE_BACKEND", "memory")
+            self._query_cache_redis_url = os.getenv(
+                "DEV_QUERY_CACHE_REDIS_URL", "redis://localhost:6379/0"
+            )
+            self._query_cache_max_bytes = os.getenv(
+                "DEV_QUERY_CACHE_MAX_BYTES", "67108864"
+            )
+            self._query_cache_ttl = os.getenv("DEV_QUERY_CACHE_TTL", "60")
+            self._max_page_sizes = os.getenv(
+                "DEV_MAX_PAGE_SIZES",
+                "stock-items=200,item-categories=100,users=100,roles=100",
+            )
+            self._query_cost_budget = os.getenv("DEV_QUERY_COST_BUDGET", "20000")
+            self._fuzzy_search_postings_budget = os.getenv(
+                "DEV_FUZZY_SEARCH_POSTINGS_BUDGET", "200000"
+            )
+            self._fuzzy_search_min_similarity = os.getenv(
+                "DEV_FUZZY_SEARCH_MIN_SIMILARITY", "0.3"
+            )
+            self._stock_item_read_model_enabled = os.getenv(
+                "DEV_STOCK_ITEM_READ_MODEL_ENABLED", "false"
+            )
+            self._stock_item_read_model_sync_interval = os.getenv(
+                "DEV_STOCK_ITEM_READ_MODEL_SYNC_INTERVAL", "1.0"
+            )
+            self._stock_forecast_short_window_days = os.getenv(
+                "DEV_STOCK_FORECAST_SHORT_WINDOW_DAYS", "7"
+            )
+            self._stock_forecast_long_window_days = os.getenv(
+                "DEV_STOCK_FORECAST_LONG_WINDOW_DAYS", "28"
+            )
+            self._stock_forecast_lead_time_days = os.getenv(
+                "DEV_STOCK_FORECAST_LEAD_TIME_DAYS", "7"
+            )
+            self._stock_forecast_coverage_days = os.getenv(
+                "DEV_STOCK_FORECAST_COVERAGE_DAYS", "28"
+            )
         elif self._envirnoment == "production":
             load_dotenv()
             self._db_host = os.getenv("DB_HOST")
@@ -51,6 +147,78 @@ class AppSettings:
                 os.getenv("REFRESH_TOKEN_EXPIRATION_TIME")
             )
             self._alghoritm = os.getenv("ALGORITHM")
+            self._fast_serialization = os.getenv("FAST_SERIALIZATION", "false")
+            self._compression_enabled = os.getenv("COMPRESSION_ENABLED", "true")
+            self._compression_minimum_size = os.getenv(
+                "COMPRESSION_MINIMUM_SIZE", "1024"
+            )
+            self._compression_level = os.getenv("COMPRESSION_LEVEL", "6")
+            self._compression_streaming = os.getenv("COMPRESSION_STREAMING", "false")
+            self._stock_snapshot_interval = os.getenv("STOCK_SNAPSHOT_INTERVAL", "50")
+            self._event_backend = os.getenv("EVENT_BACKEND", "local")
+            self._event_redis_url = os.getenv(
+                "EVENT_REDIS_URL", "redis://localhost:6379/0"
+            )
+            self._event_channel = os.getenv("EVENT_CHANNEL", "stock-manager-events")
+            self._event_queue_size = os.getenv("EVENT_QUEUE_SIZE", "100")
+            self._event_heartbeat_interval = os.getenv("EVENT_HEARTBEAT_INTERVAL", "15")
+            self._stock_item_batch_max_ids = os.getenv(
+                "STOCK_ITEM_BATCH_MAX_IDS", "500"
+            )
+            self._idempotency_key_ttl = os.getenv("IDEMPOTENCY_KEY_TTL", "86400")
+            self._idempotency_lock_timeout = os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", "60")
+            self._idempotency_wait_timeout = os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", "10")
+            self._job_workers = os.getenv("JOB_WORKERS", "2")
+            self._job_stale_timeout = os.getenv("JOB_STALE_TIMEOUT", "600")
+            self._job_retry_delay = os.getenv("JOB_RETRY_DELAY", "30")
+            self._import_chunk_size = os.getenv("IMPORT_CHUNK_SIZE", "1000")
+            self._import_max_errors = os.getenv("IMPORT_MAX_ERRORS", "1000")
+            self._admission_control_enabled = os.getenv(
+                "ADMISSION_CONTROL_ENABLED", "true"
+            )
+            self._admission_limits = os.getenv(
+                "ADMISSION_LIMITS",
+                "auth=20:50:2,stock-items=40:200:5,users=10:50:5,export=2:4:10",
+            )
+            self._admission_retry_after = os.getenv("ADMISSION_RETRY_AFTER", "1")
+            self._request_coalescing_enabled = os.getenv(
+                "REQUEST_COALESCING_ENABLED", "false"
+            )
+            self._query_cache_backend = os.getenv("QUERY_CACHE_BACKEND", "none")
+            self._query_cache_redis_url = os.getenv(
+                "QUERY_CACHE_REDIS_URL", "redis://localhost:6379/0"
+            )
+            self._query_cache_max_bytes = os.getenv("QUERY_CACHE_MAX_BYTES", "67108864")
+            self._query_cache_ttl = os.getenv("QUERY_CACHE_TTL", "60")
+            self._max_page_sizes = os.getenv(
+                "MAX_PAGE_SIZES",
+                "stock-items=200,item-categories=100,users=100,roles=100",
+            )
+            self._query_cost_budget = os.getenv("QUERY_COST_BUDGET", "20000")
+            self._fuzzy_search_postings_budget = os.getenv(
+                "FUZZY_SEARCH_POSTINGS_BUDGET", "200000"
+            )
+            self._fuzzy_search_min_similarity = os.getenv(
+                "FUZZY_SEARCH_MIN_SIMILARITY", "0.3"
+            )
+            self._stock_item_read_model_enabled = os.getenv(
+                "STOCK_ITEM_READ_MODEL_ENABLED", "false"
+            )
+            self._stock_item_read_model_sync_interval = os.getenv(
+                "STOCK_ITEM_READ_MODEL_SYNC_INTERVAL", "1.0"
+            )
+            self._stock_forecast_short_window_days = os.getenv(
+                "STOCK_FORECAST_SHORT_WINDOW_DAYS", "7"
+            )
+            self._stock_forecast_long_window_days = os.getenv(
+                "STOCK_FORECAST_LONG_WINDOW_DAYS", "28"
+            )
+            self._stock_forecast_lead_time_days = os.getenv(
+                "STOCK_FORECAST_LEAD_TIME_DAYS", "7"
+            )
+            self._stock_forecast_coverage_days = os.getenv(
+                "STOCK_FORECAST_COVERAGE_DAYS", "28"
+            )
 
     @property
     def envirnoment(self):
@@ -172,3 +340,318 @@ class AppSettings:
             )
 
         return self._charset
+
+    @property
+    def fast_serialization(self):
+        """
+        Returns True if hot stock item endpoints should bypass Pydantic validation
+        and serialize projected rows directly with orjson.
+        """
+        return self._fast_serialization.lower() == "true"
+
+    @property
+    def compression_enabled(self):
+        """
+        Returns True if responses should be compressed with Brotli or gzip.
+        """
+        return self._compression_enabled.lower() == "true"
+
+    @property
+    def compression_minimum_size(self):
+        """
+        Returns the minimum response size in bytes that gets compressed.
+        """
+        return int(self._compression_minimum_size)
+
+    @property
+    def compression_level(self):
+        """
+        Returns the compression level, gzip uses 1-9, Brotli quality is capped at 11.
+        """
+        return int(self._compression_level)
+
+    @property
+    def compression_streaming(self):
+        """
+        Returns True if streaming responses should be compressed chunk by chunk.
+        """
+        return self._compression_streaming.lower() == "true"
+
+    @property
+    def stock_snapshot_interval(self):
+        """
+        Returns the number of stock movements per item between balance snapshots.
+        """
+        return int(self._stock_snapshot_interval)
+
+    @property
+    def event_backend(self):
+        """
+        Returns the change event backend, 'local' for a single worker or 'redis' to fan out across workers.
+        """
+        return self._event_backend
+
+    @property
+    def event_redis_url(self):
+        """
+        Returns the Redis URL used by the 'redis' event backend.
+        """
+        return self._event_redis_url
+
+    @property
+    def event_channel(self):
+        """
+        Returns the Redis channel change events are published on.
+        """
+        return self._event_channel
+
+    @property
+    def event_queue_size(self):
+        """
+        Returns the number of events buffered per subscriber before it is dropped as too slow.
+        """
+        return int(self._event_queue_size)
+
+    @property
+    def event_heartbeat_interval(self):
+        """
+        Returns the number of seconds between keep-alive comments on idle event streams.
+        """
+        return float(self._event_heartbeat_interval)
+
+    @property
+    def stock_item_batch_max_ids(self):
+        """
+        Returns the maximum number of IDs accepted by the stock item batch endpoints.
+        """
+        return int(self._stock_item_batch_max_ids)
+
+    @property
+    def idempotency_key_ttl(self):
+        """
+        Returns the number of seconds a stored idempotent response can be replayed.
+        """
+        return int(self._idempotency_key_ttl)
+
+    @property
+    def idempotency_lock_timeout(self):
+        """
+        Returns the number of seconds without renewal after which an unfinished idempotent request is
+        considered abandoned.
+        """
+        return int(self._idempotency_lock_timeout)
+
+    @property
+    def idempotency_wait_timeout(self):
+        """
+        Returns the number of seconds a duplicate request waits for the original one to finish.
+        """
+        return float(self._idempotency_wait_timeout)
+
+    @property
+    def job_workers(self):
+        """
+        Returns the number of background jobs run concurrently by each worker process.
+        """
+        return int(self._job_workers)
+
+    @property
+    def job_stale_timeout(self):
+        """
+        Returns the number of seconds without a heartbeat after which a running job is considered interrupted and
+        requeued.
+        """
+        return int(self._job_stale_timeout)
+
+    @property
+    def job_retry_delay(self):
+        """
+        Returns the number of seconds before the first retry of a failed job, doubled for every further attempt.
+        """
+        return int(self._job_retry_delay)
+
+    @property
+    def import_chunk_size(self):
+        """
+        Returns the number of CSV rows inserted and committed together by the stock item import.
+        """
+        return int(self._import_chunk_size)
+
+    @property
+    def import_max_errors(self):
+        """
+        Returns the maximum number of row errors listed in a stock item import report.
+        """
+        return int(self._import_max_errors)
+
+    @property
+    def admission_control_enabled(self):
+        """
+        Returns whether requests are capped per route group and shed with 503 when overloaded.
+        """
+        return self._admission_control_enabled.lower() == "true"
+
+    @property
+    def admission_limits(self):
+        """
+        Returns the in-flight cap, queue size and maximum queue wait in seconds of each route group,
+        parsed from group=max_in_flight:max_queue:max_wait entries separated by commas.
+        """
+        limits = {}
+        for entry in self._admission_limits.split(","):
+            if not entry.strip():
+                continue
+            group, _, values = entry.partition("=")
+            max_in_flight, max_queue, max_wait = values.split(":")
+            limits[group.strip()] = (
+                int(max_in_flight),
+                int(max_queue),
+                float(max_wait),
+            )
+        return limits
+
+    @property
+    def admission_retry_after(self):
+        """
+        Returns the number of seconds sent in the Retry-After header of shed requests.
+        """
+        return int(self._admission_retry_after)
+
+    @property
+    def request_coalescing_enabled(self):
+        """
+        Returns whether identical concurrent list requests share one query and serialized response.
+        """
+        return self._request_coalescing_enabled.lower() == "true"
+
+    @property
+    def query_cache_backend(self):
+        """
+        Returns the backend of the list query cache: memory (per process LRU, single worker only),
+        redis (shared by all workers) or none.
+        """
+        return self._query_cache_backend
+
+    @property
+    def query_cache_redis_url(self):
+        """
+        Returns the URL of the Redis server used by the redis query cache backend.
+        """
+        return self._query_cache_redis_url
+
+    @property
+    def query_cache_max_bytes(self):
+        """
+        Returns the maximum total size in bytes of the results cached by the memory query cache backend.
+        """
+        return int(self._query_cache_max_bytes)
+
+    @property
+    def query_cache_ttl(self):
+        """
+        Returns the number of seconds a list query result is cached.
+        """
+        return int(self._query_cache_ttl)
+
+    @property
+    def max_page_sizes(self):
+        """
+        Returns the maximum page size of each list endpoint, parsed from endpoint=max_page_size
+        entries separated by commas. Endpoints without an entry keep their default.
+        Raises InvalidSettingException if an entry names an unknown endpoint.
+        """
+        max_page_sizes = dict(DEFAULT_MAX_PAGE_SIZES)
+        for entry in self._max_page_sizes.split(","):
+            if not entry.strip():
+                continue
+            endpoint, _, max_page_size = entry.partition("=")
+            endpoint = endpoint.strip()
+            if endpoint not in DEFAULT_MAX_PAGE_SIZES:
+                raise InvalidSettingException(
+                    f"Unknown endpoint '{endpoint}' in max page sizes, expected one of: {', '.join(DEFAULT_MAX_PAGE_SIZES)}"
+                )
+            max_page_sizes[endpoint] = int(max_page_size)
+        return max_page_sizes
+
+    @property
+    def query_cost_budget(self):
+        """
+        Returns the maximum estimated number of rows a list query may read.
+        """
+        return int(self._query_cost_budget)
+
+    @property
+    def fuzzy_search_postings_budget(self):
+        """
+        Returns the maximum number of trigram index entries read by one fuzzy search.
+        """
+        return int(self._fuzzy_search_postings_budget)
+
+    @property
+    def fuzzy_search_min_similarity(self):
+        """
+        Returns the minimum trigram similarity, from 0 to 1, of fuzzy search matches.
+        """
+        return float(self._fuzzy_search_min_similarity)
+
+    @property
+    def stock_item_read_model_enabled(self):
+        """
+        Returns whether stock item lists are served from the in-memory read model.
+        """
+        return self._stock_item_read_model_enabled.lower() == "true"
+
+    @property
+    def stock_item_read_model_sync_interval(self):
+        """
+        Returns the seconds between reads of the stock item changes made by other processes
+        into the in-memory read model.
+        """
+        return float(self._stock_item_read_model_sync_interval)
+
+    @property
+    def stock_forecast_short_window_days(self):
+        """
+        Returns the number of days of the short term moving average of stock item consumption.
+        """
+        return int(self._stock_forecast_short_window_days)
+
+    @property
+    def stock_forecast_long_window_days(self):
+        """
+        Returns the number of days of the long term moving average of stock item consumption.
+        """
+        return int(self._stock_forecast_long_window_days)
+
+    @property
+    def stock_forecast_lead_time_days(self):
+        """
+        Returns the number of days between placing and receiving a reorder, covered by forecasts.
+        """
+        return int(self._stock_forecast_lead_time_days)
+
+    @property
+    def stock_forecast_coverage_days(self):
+        """
+        Returns the number of days of consumption a suggested reorder quantity covers after delivery.
+        """
+        return int(self._stock_forecast_coverage_days)
+
+
+_app_settings = None
+_app_settings_lock = threading.Lock()
+
+
+def get_app_settings() -> AppSettings:
+    """
+    Return the process wide application settings, loading the .env file and the
+    environment variables on first use only.
+    Returns:
+        AppSettings: The application settings.
+    """
+    global _app_settings
+    if _app_settings is None:
+        with _app_settings_lock:
+            if _app_settings is None:
+                _app_settings = AppSettings()
+    return _app_settings
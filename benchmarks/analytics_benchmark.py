@@ -0,0 +1,138 @@
+"""
+Benchmark of the inventory analytics over stock item quantities.
+
+Seeds an in-memory SQLite database with stock items and reports the median and 99th
+percentile latency of reading the grouped columns alone, of
+StockItemAnalyticsService.get_stock_item_analytics without the query cache and of
+reading its cached result. Runs with quantities typical of an inventory, many
+stock items sharing small quantities, and with a distinct quantity per stock item,
+the worst case of the grouped read.
+
+Run from the project root:
+    envirnoment=development python -m benchmarks.analytics_benchmark
+"""
+
+import os
+import random
+import statistics
+import time
+from datetime import datetime
+
+os.environ.setdefault("envirnoment", "development")
+
+from sqlalchemy import create_engine, insert, select, update  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from caching.cache_backends import LRUCacheBackend  # noqa: E402
+from caching.query_cache import QueryCache  # noqa: E402
+from database_settings import Base  # noqa: E402
+from models.entities import ItemCategory, StockItem  # noqa: E402
+from models.models import StockItemAnalyticsQuery  # noqa: E402
+from services.stock_item_analytics_service import (  # noqa: E402
+    StockItemAnalyticsService,
+)
+
+CATEGORY_COUNT = 100
+STOCK_ITEM_COUNT = 1_000_000
+ITERATIONS = 10
+CACHED_ITERATIONS = 1000
+START_DATE = datetime(2025, 1, 1)
+
+
+def create_session():
+    """
+    Create a session bound to a fresh in-memory database with seeded stock items,
+    a tenth of them out of stock and the rest with mostly small quantities.
+    Returns:
+        Session: SQLAlchemy session object.
+    """
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all(
+        ItemCategory(
+            name=f"Category {i}",
+            creation_date=START_DATE,
+            last_modification_date=START_DATE,
+        )
+        for i in range(CATEGORY_COUNT)
+    )
+    db.flush()
+    rng = random.Random(0)
+    for start in range(0, STOCK_ITEM_COUNT, 100_000):
+        db.execute(
+            insert(StockItem.__table__),
+            [
+                {
+                    "name": f"Item {i}",
+                    "quantity": (
+                        0 if rng.random() < 0.1 else int(rng.lognormvariate(3, 1.5))
+                    ),
+                    "category_id": rng.randrange(CATEGORY_COUNT) + 1,
+                    "creation_date": START_DATE,
+                    "last_modification_date": START_DATE,
+                    "version": 1,
+                }
+                for i in range(start, min(start + 100_000, STOCK_ITEM_COUNT))
+            ],
+        )
+    db.commit()
+    return db
+
+
+def report(name: str, latencies: list[float]):
+    print(
+        f"{name:<40} median {statistics.median(latencies) * 1e3:9.3f} ms  "
+        f"p99 {statistics.quantiles(latencies, n=100)[98] * 1e3:9.3f} ms"
+    )
+
+
+def measure(function, iterations: int) -> list[float]:
+    function()
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run(db, name: str):
+    service = StockItemAnalyticsService(db)
+    service.query_cache = QueryCache(None, 0)
+    analytics_query = StockItemAnalyticsQuery()
+    stock_items_query = select(StockItem.category_id, StockItem.quantity)
+    distinct_pairs = len(service._fetch_columns(stock_items_query)[0])
+    print(f"{name}: {distinct_pairs} distinct category and quantity pairs")
+    report(
+        f"{name} read columns",
+        measure(lambda: service._fetch_columns(stock_items_query), ITERATIONS),
+    )
+    report(
+        f"{name} uncached",
+        measure(lambda: service.get_stock_item_analytics(analytics_query), ITERATIONS),
+    )
+    service.query_cache = QueryCache(LRUCacheBackend(64 * 2**20), 3600)
+    report(
+        f"{name} cached",
+        measure(
+            lambda: service.get_stock_item_analytics(analytics_query),
+            CACHED_ITERATIONS,
+        ),
+    )
+
+
+def main():
+    db = create_session()
+    run(db, "typical")
+    db.execute(update(StockItem).values(quantity=StockItem.id))
+    db.commit()
+    run(db, "distinct")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
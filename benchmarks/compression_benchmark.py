@@ -0,0 +1,115 @@
+"""
+Measurement of CPU cost against bytes saved when compressing typical stock item pages.
+
+Builds PagedResult shaped JSON pages of several sizes and reports, for gzip and Brotli
+at a few levels, the compressed size, the share of bytes saved and the CPU time per page.
+
+Run from the project root:
+    envirnoment=development python -m benchmarks.compression_benchmark
+"""
+
+import os
+import time
+import zlib
+from datetime import datetime
+
+os.environ.setdefault("envirnoment", "development")
+
+import orjson  # noqa: E402
+
+from serialization.stock_item_serializer import stock_item_row_to_dict  # noqa: E402
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PAGE_SIZES = (10, 50, 100, 1000)
+GZIP_LEVELS = (1, 4, 6, 9)
+BROTLI_QUALITIES = (1, 4, 6, 11)
+ITERATIONS = 50
+
+
+def build_page(page_size: int) -> bytes:
+    """
+    Build an encoded stock item page with realistic names and dates.
+    Args:
+        page_size (int): Number of stock items on the page.
+    Returns:
+        bytes: JSON encoded page.
+    """
+    now = datetime.now()
+    rows = [
+        (
+            i,
+            f"Item {i:06d} {('bolt', 'nut', 'screw', 'washer', 'hinge')[i % 5]}",
+            f"Steel part number {i}, pack of {i % 12 + 1}",
+            i % 500,
+            now,
+            now,
+            i % 20 + 1,
+            f"Category {i % 20 + 1}",
+            now,
+            now,
+        )
+        for i in range(1, page_size + 1)
+    ]
+    return orjson.dumps(
+        {
+            "data": [stock_item_row_to_dict(row) for row in rows],
+            "current_page": 1,
+            "page_size": page_size,
+            "total_items": page_size * 100,
+            "total_pages": 100,
+        }
+    )
+
+
+def gzip_compress(body: bytes, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+def measure(compress, body: bytes, level: int):
+    """
+    Measure compressed size and CPU time per call.
+    Returns:
+        tuple[int, float]: Compressed size in bytes and CPU milliseconds per page.
+    """
+    start = time.process_time()
+    for _ in range(ITERATIONS):
+        compressed = compress(body, level)
+    elapsed = time.process_time() - start
+    return len(compressed), elapsed / ITERATIONS * 1000
+
+
+def main():
+    encoders = [("gzip", gzip_compress, GZIP_LEVELS)]
+    if brotli is not None:
+        encoders.append(
+            (
+                "br",
+                lambda body, level: brotli.compress(body, quality=level),
+                BROTLI_QUALITIES,
+            )
+        )
+    else:
+        print("brotli is not installed, only gzip is measured")
+
+    print(
+        f"{'rows':>5} {'raw B':>9} {'enc':>5} {'lvl':>4} {'comp B':>9} {'saved':>7} {'CPU ms':>8}"
+    )
+    for page_size in PAGE_SIZES:
+        body = build_page(page_size)
+        for name, compress, levels in encoders:
+            for level in levels:
+                size, cpu_ms = measure(compress, body, level)
+                saved = 1 - size / len(body)
+                print(
+                    f"{page_size:>5} {len(body):>9} {name:>5} {level:>4} "
+                    f"{size:>9} {saved:>7.1%} {cpu_ms:>8.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
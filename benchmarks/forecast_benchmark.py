@@ -0,0 +1,146 @@
+"""
+Benchmark of the batch computation of stock forecasts from stock movements.
+
+Seeds an in-memory SQLite database with stock items and a month of consumption and
+deliveries, then reports the duration of StockForecastService.compute_stock_forecasts
+for a full run over every stock item and for incremental runs after a share of the
+stock items got new movements.
+
+Run from the project root:
+    envirnoment=development python -m benchmarks.forecast_benchmark
+"""
+
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("envirnoment", "development")
+
+from sqlalchemy import create_engine, func, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from database_settings import Base  # noqa: E402
+from models.entities import (  # noqa: E402
+    ItemCategory,
+    StockForecast,
+    StockItem,
+    StockMovement,
+)
+from services.stock_forecast_service import StockForecastService  # noqa: E402
+
+STOCK_ITEM_COUNT = 100_000
+MOVEMENT_COUNT = 2_000_000
+HISTORY_DAYS = 35
+CHANGED_SHARES = (0.001, 0.01, 0.1)
+
+
+def create_session():
+    """
+    Create a session bound to a fresh in-memory database with seeded stock items and
+    movements spread over the last HISTORY_DAYS days, mostly consumption.
+    Returns:
+        Session: SQLAlchemy session object.
+    """
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    now = datetime.now()
+    db.add(ItemCategory(name="Category", creation_date=now, last_modification_date=now))
+    db.flush()
+    rng = random.Random(0)
+    db.execute(
+        insert(StockItem.__table__),
+        [
+            {
+                "name": f"Item {i}",
+                "quantity": rng.randrange(1000),
+                "category_id": 1,
+                "creation_date": now,
+                "last_modification_date": now,
+                "version": 1,
+            }
+            for i in range(STOCK_ITEM_COUNT)
+        ],
+    )
+    for start in range(0, MOVEMENT_COUNT, 100_000):
+        db.execute(
+            insert(StockMovement.__table__),
+            [
+                {
+                    "stock_item_id": rng.randrange(STOCK_ITEM_COUNT) + 1,
+                    "delta": (
+                        rng.randrange(1, 100)
+                        if rng.random() < 0.1
+                        else -rng.randrange(1, 10)
+                    ),
+                    "reason": "adjust",
+                    "creation_date": now
+                    - timedelta(days=HISTORY_DAYS) * (1 - i / MOVEMENT_COUNT),
+                }
+                for i in range(start, min(start + 100_000, MOVEMENT_COUNT))
+            ],
+        )
+    db.commit()
+    return db
+
+
+def record_movements(db, share: float):
+    """
+    Record one consumption movement for a random share of the stock items.
+    Args:
+        db (Session): SQLAlchemy session object.
+        share (float): Share of the stock items with a new movement.
+    """
+    rng = random.Random(share)
+    db.execute(
+        insert(StockMovement.__table__),
+        [
+            {
+                "stock_item_id": stock_item_id,
+                "delta": -1,
+                "reason": "adjust",
+                "creation_date": datetime.now(),
+            }
+            for stock_item_id in rng.sample(
+                range(1, STOCK_ITEM_COUNT + 1), int(STOCK_ITEM_COUNT * share)
+            )
+        ],
+    )
+    db.commit()
+
+
+def run(db, name: str, full: bool = False):
+    start = time.perf_counter()
+    result = StockForecastService(db).compute_stock_forecasts(full)
+    print(
+        f"{name:<40} {time.perf_counter() - start:8.3f} s  "
+        f"{result['computed']} forecasts computed"
+    )
+
+
+def main():
+    db = create_session()
+    print(
+        f"{STOCK_ITEM_COUNT} stock items, "
+        f"{db.query(func.count(StockMovement.id)).scalar()} movements"
+    )
+    run(db, "full", full=True)
+    for share in CHANGED_SHARES:
+        record_movements(db, share)
+        run(db, f"incremental, {share:.1%} changed")
+    run(db, "incremental, nothing changed")
+    consuming = (
+        db.query(func.count(StockForecast.stock_item_id))
+        .filter(StockForecast.long_term_daily_consumption > 0)
+        .scalar()
+    )
+    print(f"{consuming} stock items with consumption")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
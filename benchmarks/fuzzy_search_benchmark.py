@@ -0,0 +1,178 @@
+"""
+Benchmark of the trigram index behind the fuzzy stock item search.
+
+Seeds an in-memory SQLite database with stock items named like a hardware
+catalog, loads the trigram index and reports its load time and memory, the
+median and 99th percentile latency of searches for misspelled names and how
+often the misspelled item is among the returned matches. A name LIKE query for
+the same misspellings is timed for comparison, it finds nothing.
+
+Run from the project root:
+    envirnoment=development python -m benchmarks.fuzzy_search_benchmark
+"""
+
+import os
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime
+
+os.environ.setdefault("envirnoment", "development")
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app_settings import get_app_settings  # noqa: E402
+from database_settings import Base  # noqa: E402
+from models.entities import ItemCategory, StockItem  # noqa: E402
+from search.trigram_index import TrigramIndex  # noqa: E402
+
+STOCK_ITEM_COUNT = 1_000_000
+SEARCHES = 2_000
+DATABASE_SEARCHES = 5
+LIMIT = 10
+MATERIALS = ("steel", "brass", "zinc", "nylon", "copper", "aluminium", "stainless")
+KINDS = (
+    "bolt",
+    "screw",
+    "washer",
+    "hinge",
+    "bracket",
+    "anchor",
+    "rivet",
+    "spanner",
+    "screwdriver",
+    "chisel",
+    "hammer",
+    "padlock",
+)
+FINISHES = ("black", "galvanized", "polished", "matte", "painted")
+
+
+def catalog_name(rng: random.Random, i: int) -> str:
+    return (
+        f"{rng.choice(MATERIALS)} {rng.choice(KINDS)} M{rng.randint(3, 24)}x"
+        f"{rng.randint(1, 30) * 5} {rng.choice(FINISHES)} {i:07d}"
+    )
+
+
+def misspell(rng: random.Random, name: str) -> str:
+    """
+    Misspell a name by dropping, doubling or swapping a letter of two of its words.
+    """
+    words = name.split()
+    for position in rng.sample(range(len(words) - 1), 2):
+        word = words[position]
+        if len(word) < 4:
+            continue
+        i = rng.randrange(1, len(word) - 1)
+        words[position] = rng.choice(
+            (
+                word[:i] + word[i + 1 :],
+                word[:i] + word[i] + word[i:],
+                word[: i - 1] + word[i] + word[i - 1] + word[i + 1 :],
+            )
+        )
+    return " ".join(words)
+
+
+def create_session(names: list[str]):
+    """
+    Create a session bound to a fresh in-memory database with the stock items.
+    Args:
+        names (list[str]): Names of the stock items.
+    Returns:
+        Session: SQLAlchemy session object.
+    """
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    now = datetime.now()
+    db.add(ItemCategory(name="Hardware", creation_date=now, last_modification_date=now))
+    db.flush()
+    for start in range(0, len(names), 100_000):
+        db.execute(
+            insert(StockItem.__table__),
+            [
+                {
+                    "name": name,
+                    "quantity": 1,
+                    "category_id": 1,
+                    "creation_date": now,
+                    "last_modification_date": now,
+                    "version": 1,
+                }
+                for name in names[start : start + 100_000]
+            ],
+        )
+    db.commit()
+    return db
+
+
+def report(name: str, latencies: list[float]):
+    print(
+        f"{name:<24} median {statistics.median(latencies) * 1e3:8.2f} ms  "
+        f"p99 {statistics.quantiles(latencies, n=100)[98] * 1e3:8.2f} ms"
+    )
+
+
+def main():
+    rng = random.Random(0)
+    names = [catalog_name(rng, i) for i in range(STOCK_ITEM_COUNT)]
+    db = create_session(names)
+    app_settings = get_app_settings()
+    index = TrigramIndex(
+        app_settings.fuzzy_search_postings_budget,
+        app_settings.fuzzy_search_min_similarity,
+    )
+    start = time.perf_counter()
+    index.load(db)
+    load_time = time.perf_counter() - start
+    # Measured on a second load, tracing slows allocations down
+    tracemalloc.start()
+    traced_index = TrigramIndex(0, 0)
+    traced_index.load(db)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del traced_index
+    print(f"loaded {len(index)} names in {load_time:.1f} s, {size / 2**20:.0f} MiB")
+
+    # Search for the distinguishing part of the names, without the numbers
+    targets = rng.sample(range(STOCK_ITEM_COUNT), SEARCHES)
+    queries = [
+        misspell(rng, " ".join(names[i].split()[:2] + names[i].split()[3:4]))
+        for i in targets
+    ]
+    latencies = []
+    found = 0
+    for target, query in zip(targets, queries):
+        start = time.perf_counter()
+        matches = index.search(query, LIMIT)
+        latencies.append(time.perf_counter() - start)
+        target_words = names[target].split()
+        found += any(
+            match["name"].split()[:2] == target_words[:2]
+            and match["name"].split()[3] == target_words[3]
+            for match in matches
+        )
+    report("trigram index", latencies)
+    print(f"misspelled item kind found in top {LIMIT}: {found / SEARCHES:.1%}")
+    print(f"example: {queries[0]!r} -> {index.search(queries[0], 3)}")
+
+    latencies = []
+    for query in queries[:DATABASE_SEARCHES]:
+        start = time.perf_counter()
+        db.query(StockItem.id).filter(StockItem.name.like(f"%{query}%")).limit(
+            LIMIT
+        ).all()
+        latencies.append(time.perf_counter() - start)
+    report("name LIKE", latencies)
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
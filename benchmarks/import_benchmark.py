@@ -0,0 +1,129 @@
+"""
+Benchmark of the chunked CSV stock item import against row by row creation.
+
+Creates stock items in an in-memory SQLite database once through
+StockItemService.create_stock_item for a small sample and once through
+StockItemImportService for a large CSV file, reporting rows per second and the
+peak Python memory of the import for two file sizes.
+
+Run from the project root:
+    envirnoment=development python -m benchmarks.import_benchmark
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+os.environ.setdefault("envirnoment", "development")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from database_settings import Base  # noqa: E402
+from models.entities import ItemCategory  # noqa: E402
+from models.models import CreateStockItemDto  # noqa: E402
+from services.stock_item_import_service import StockItemImportService  # noqa: E402
+from services.stock_item_service import StockItemService  # noqa: E402
+
+CATEGORY_COUNT = 20
+SINGLE_ROWS = 2_000
+IMPORT_ROWS = (50_000, 200_000)
+
+
+def create_session():
+    """
+    Create a session bound to a fresh in-memory database with seeded categories.
+    Returns:
+        Session: SQLAlchemy session object.
+    """
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    now = datetime.now()
+    db.add_all(
+        ItemCategory(
+            name=f"Category {i}", creation_date=now, last_modification_date=now
+        )
+        for i in range(CATEGORY_COUNT)
+    )
+    db.commit()
+    return db
+
+
+def write_csv(row_count: int) -> str:
+    """
+    Write a CSV file of unique stock items.
+    Args:
+        row_count (int): Number of rows.
+    Returns:
+        str: Path of the file.
+    """
+    with tempfile.NamedTemporaryFile(
+        "w", suffix=".csv", delete=False, encoding="utf-8", newline=""
+    ) as csv_file:
+        csv_file.write("name,description,quantity,category\n")
+        for i in range(row_count):
+            csv_file.write(
+                f"Item {i},Description of item {i},{i % 97 + 1},Category {i % CATEGORY_COUNT}\n"
+            )
+    return csv_file.name
+
+
+def benchmark_single_rows():
+    db = create_session()
+    service = StockItemService(db)
+    start = time.perf_counter()
+    for i in range(SINGLE_ROWS):
+        service.create_stock_item(
+            CreateStockItemDto(
+                name=f"Item {i}",
+                description=f"Description of item {i}",
+                quantity=i % 97 + 1,
+                category_id=i % CATEGORY_COUNT + 1,
+            )
+        )
+    elapsed = time.perf_counter() - start
+    db.close()
+    print(
+        f"create_stock_item  {SINGLE_ROWS:>8} rows  {elapsed:7.2f} s  "
+        f"{SINGLE_ROWS / elapsed:9.0f} rows/s"
+    )
+
+
+def benchmark_import(row_count: int):
+    path = write_csv(row_count)
+    db = create_session()
+    service = StockItemImportService(db)
+    try:
+        tracemalloc.start()
+        start = time.perf_counter()
+        with open(path, "rb") as csv_file:
+            report = service.import_stock_items(csv_file)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        db.close()
+        os.remove(path)
+    assert report["imported"] == row_count, report
+    print(
+        f"import             {row_count:>8} rows  {elapsed:7.2f} s  "
+        f"{row_count / elapsed:9.0f} rows/s  peak {peak / 2**20:6.1f} MiB"
+    )
+
+
+def main():
+    benchmark_single_rows()
+    for row_count in IMPORT_ROWS:
+        benchmark_import(row_count)
+
+
+if __name__ == "__main__":
+    main()
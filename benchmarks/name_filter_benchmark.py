@@ -0,0 +1,191 @@
+"""
+Benchmark of the category_name and role_name filters of the stock item and user lists.
+
+Seeds an in-memory SQLite database with stock items spread over item categories and
+users spread over roles, then reports the median and 99th percentile latency of
+counting the matching rows and reading their first page with the name filter as:
+    correlated EXISTS   the former relationship has() filter, a subquery per row
+    IN subquery         the IDs selected by an uncorrelated subquery
+    resolved IDs        the IDs resolved by the service, including the lookup of the
+                        matching categories or roles, as done on a cache miss
+
+Run from the project root:
+    envirnoment=development python -m benchmarks.name_filter_benchmark
+"""
+
+import os
+import statistics
+import time
+from datetime import datetime
+
+os.environ.setdefault("envirnoment", "development")
+
+from sqlalchemy import create_engine, func, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from caching.query_cache import QueryCache  # noqa: E402
+from database_settings import Base  # noqa: E402
+from models.entities import ItemCategory, Role, StockItem, User  # noqa: E402
+from models.models import StockItemQuery, UserFilterQuery  # noqa: E402
+from services.item_category_service import ItemCategoryService  # noqa: E402
+from services.role_service import RoleService  # noqa: E402
+
+CATEGORY_COUNT = 500
+STOCK_ITEM_COUNT = 200_000
+ROLE_COUNT = 50
+USER_COUNT = 100_000
+PAGE_SIZE = 50
+ITERATIONS = 50
+# Matches "Category 17" and "Category 170" to "Category 179", 11 of 500 categories
+CATEGORY_NAME = "Category 17"
+# Matches "Role 7", 1 of 50 roles
+ROLE_NAME = "Role 7"
+
+
+def create_session():
+    """
+    Create a session bound to a fresh in-memory database with seeded stock items and users.
+    Returns:
+        Session: SQLAlchemy session object.
+    """
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    now = datetime.now()
+    db.add_all(
+        ItemCategory(
+            name=f"Category {i}", creation_date=now, last_modification_date=now
+        )
+        for i in range(CATEGORY_COUNT)
+    )
+    db.add_all(
+        Role(name=f"Role {i}", creation_date=now, last_modification_date=now)
+        for i in range(ROLE_COUNT)
+    )
+    db.flush()
+    db.execute(
+        insert(StockItem.__table__),
+        [
+            {
+                "name": f"Item {i}",
+                "description": None,
+                "quantity": i % 97,
+                "category_id": i % CATEGORY_COUNT + 1,
+                "creation_date": now,
+                "last_modification_date": now,
+                "version": 1,
+            }
+            for i in range(STOCK_ITEM_COUNT)
+        ],
+    )
+    db.execute(
+        insert(User.__table__),
+        [
+            {
+                "user_name": f"user{i}",
+                "hashed_password": "",
+                "first_name": "First",
+                "last_name": "Last",
+                "email": f"user{i}@example.com",
+                "is_active": True,
+                "creation_date": now,
+                "last_modification_date": now,
+                "role_id": i % ROLE_COUNT + 1,
+                "version": 1,
+            }
+            for i in range(USER_COUNT)
+        ],
+    )
+    db.commit()
+    return db
+
+
+def read_page(db, model, filter_query, name_filter) -> int:
+    """
+    Count the rows matching a filter query and read the IDs of its first page.
+    Args:
+        db (Session): SQLAlchemy session object.
+        model: StockItem or User.
+        filter_query: The filter query, only its sort is used.
+        name_filter: The name filter expression.
+    Returns:
+        int: Number of matching rows.
+    """
+    total_count = db.query(func.count(model.id)).filter(name_filter).scalar()
+    query = db.query(model.id).filter(name_filter).order_by(*filter_query.order_by)
+    query.limit(PAGE_SIZE).all()
+    return total_count
+
+
+def measure(function) -> tuple[list[float], int]:
+    total_count = function()
+    latencies = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - start)
+    return latencies, total_count
+
+
+def main():
+    db = create_session()
+    category_service = ItemCategoryService(db)
+    category_service.query_cache = QueryCache(None, 0)
+    role_service = RoleService(db)
+    role_service.query_cache = QueryCache(None, 0)
+
+    def resolved_stock_items():
+        filter_query = StockItemQuery(category_name=CATEGORY_NAME)
+        filter_query.resolve_category_name(
+            category_service.get_item_category_ids_by_name(CATEGORY_NAME)
+        )
+        return read_page(db, StockItem, filter_query, *filter_query.filter_list)
+
+    def resolved_users():
+        filter_query = UserFilterQuery(role_name=ROLE_NAME)
+        filter_query.resolve_role_name(role_service.get_role_ids_by_name(ROLE_NAME))
+        return read_page(db, User, filter_query, *filter_query.filter_list)
+
+    stock_item_query = StockItemQuery(category_name=CATEGORY_NAME)
+    user_query = UserFilterQuery(role_name=ROLE_NAME)
+    cases = {
+        "stock items": {
+            "correlated EXISTS": lambda: read_page(
+                db,
+                StockItem,
+                stock_item_query,
+                StockItem.category.has(ItemCategory.name.like(f"%{CATEGORY_NAME}%")),
+            ),
+            "IN subquery": lambda: read_page(
+                db, StockItem, stock_item_query, *stock_item_query.filter_list
+            ),
+            "resolved IDs": resolved_stock_items,
+        },
+        "users": {
+            "correlated EXISTS": lambda: read_page(
+                db, User, user_query, User.role.has(Role.name.like(f"%{ROLE_NAME}%"))
+            ),
+            "IN subquery": lambda: read_page(
+                db, User, user_query, *user_query.filter_list
+            ),
+            "resolved IDs": resolved_users,
+        },
+    }
+    for list_name, variants in cases.items():
+        for variant_name, function in variants.items():
+            latencies, total_count = measure(function)
+            print(
+                f"{list_name:<12} {variant_name:<18} {total_count:>6} rows  "
+                f"median {statistics.median(latencies) * 1e3:8.2f} ms  "
+                f"p99 {statistics.quantiles(latencies, n=100)[98] * 1e3:8.2f} ms"
+            )
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
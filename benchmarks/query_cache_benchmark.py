@@ -0,0 +1,119 @@
+"""
+Benchmark of the list query cache hit path against running the list queries.
+
+Seeds an in-memory SQLite database with stock items and reports the median and
+99th percentile latency of StockItemService.get_all_stock_items and
+get_all_stock_items_rows without a cache and on cache hits of the memory (LRU)
+and Redis backends, the latter through FakeRedisClient, so it measures the
+serialization and key overhead without the network round trips.
+
+Run from the project root:
+    envirnoment=development python -m benchmarks.query_cache_benchmark
+"""
+
+import os
+import statistics
+import time
+from datetime import datetime
+
+os.environ.setdefault("envirnoment", "development")
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from caching.cache_backends import (  # noqa: E402
+    FakeRedisClient,
+    LRUCacheBackend,
+    RedisCacheBackend,
+)
+from caching.query_cache import QueryCache  # noqa: E402
+from database_settings import Base  # noqa: E402
+from models.entities import ItemCategory, StockItem  # noqa: E402
+from models.models import StockItemQuery  # noqa: E402
+from services.stock_item_service import StockItemService  # noqa: E402
+
+CATEGORY_COUNT = 20
+STOCK_ITEM_COUNT = 20_000
+ITERATIONS = 2_000
+QUERIES = {
+    "first page": StockItemQuery(),
+    "category page": StockItemQuery(
+        category_name="Category 3", page_size=50, sort_by="name"
+    ),
+}
+
+
+def create_session():
+    """
+    Create a session bound to a fresh in-memory database with seeded stock items.
+    Returns:
+        Session: SQLAlchemy session object.
+    """
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    now = datetime.now()
+    db.add_all(
+        ItemCategory(
+            name=f"Category {i}", creation_date=now, last_modification_date=now
+        )
+        for i in range(CATEGORY_COUNT)
+    )
+    db.flush()
+    db.execute(
+        insert(StockItem.__table__),
+        [
+            {
+                "name": f"Item {i}",
+                "description": f"Description of item {i}",
+                "quantity": i % 97,
+                "category_id": i % CATEGORY_COUNT + 1,
+                "creation_date": now,
+                "last_modification_date": now,
+                "version": 1,
+            }
+            for i in range(STOCK_ITEM_COUNT)
+        ],
+    )
+    db.commit()
+    return db
+
+
+def measure(function, filter_query: StockItemQuery) -> list[float]:
+    function(filter_query)
+    latencies = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        function(filter_query)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    db = create_session()
+    service = StockItemService(db)
+    backends = {
+        "no cache": None,
+        "memory": LRUCacheBackend(64 * 2**20),
+        "redis (fake)": RedisCacheBackend(FakeRedisClient(), "benchmark"),
+    }
+    for query_name, filter_query in QUERIES.items():
+        for method_name in ("get_all_stock_items", "get_all_stock_items_rows"):
+            for backend_name, backend in backends.items():
+                service.query_cache = QueryCache(backend, 3600)
+                latencies = measure(getattr(service, method_name), filter_query)
+                print(
+                    f"{query_name:<14} {method_name:<25} {backend_name:<13} "
+                    f"median {statistics.median(latencies) * 1e6:8.1f} us  "
+                    f"p99 {statistics.quantiles(latencies, n=100)[98] * 1e6:8.1f} us"
+                )
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Benchmark of the stock item read model against the database list queries it replaces.
+
+Seeds an in-memory SQLite database with stock items, loads the read model and reports
+its load time and memory, the median and 99th percentile latency of
+StockItemService.get_all_stock_items_rows served by the read model and by the
+database, both without the query cache, and the latency of applying a write.
+
+Run from the project root:
+    envirnoment=development python -m benchmarks.read_model_benchmark
+"""
+
+import os
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+os.environ.setdefault("envirnoment", "development")
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from caching.query_cache import QueryCache  # noqa: E402
+from database_settings import Base  # noqa: E402
+from models.entities import ItemCategory, StockItem  # noqa: E402
+from models.models import StockItemQuery  # noqa: E402
+from read_models.stock_item_read_model import StockItemReadModel  # noqa: E402
+from services.stock_item_service import StockItemService  # noqa: E402
+
+CATEGORY_COUNT = 100
+STOCK_ITEM_COUNT = 1_000_000
+ITERATIONS = 200
+DATABASE_ITERATIONS = 20
+WRITES = 10_000
+WORDS = ("bolt", "nut", "screw", "washer", "hinge", "bracket", "anchor", "rivet")
+START_DATE = datetime(2025, 1, 1)
+QUERIES = {
+    "first page": StockItemQuery(),
+    "by name, page 20": StockItemQuery(sort="name", page=20, page_size=50),
+    "quantity range": StockItemQuery(quantity_min=10, quantity_max=12),
+    "category quantity range": StockItemQuery(
+        category_id=7, quantity_min=10, quantity_max=40
+    ),
+    "modified last day": StockItemQuery(
+        modified_after=START_DATE + timedelta(days=693)
+    ),
+    "category name": StockItemQuery(category_name="Category 42"),
+    "name contains": StockItemQuery(name="bolt M1"),
+}
+
+
+def create_session():
+    """
+    Create a session bound to a fresh in-memory database with seeded stock items.
+    Returns:
+        Session: SQLAlchemy session object.
+    """
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all(
+        ItemCategory(
+            name=f"Category {i}",
+            creation_date=START_DATE,
+            last_modification_date=START_DATE,
+        )
+        for i in range(CATEGORY_COUNT)
+    )
+    db.flush()
+    rng = random.Random(0)
+    for start in range(0, STOCK_ITEM_COUNT, 100_000):
+        db.execute(
+            insert(StockItem.__table__),
+            [
+                {
+                    "name": f"{rng.choice(WORDS)} M{i % 40} {i}",
+                    "quantity": rng.randrange(1000),
+                    "category_id": i % CATEGORY_COUNT + 1,
+                    "creation_date": START_DATE + timedelta(minutes=i),
+                    "last_modification_date": START_DATE
+                    + timedelta(minutes=rng.randrange(STOCK_ITEM_COUNT)),
+                    "version": 1,
+                }
+                for i in range(start, min(start + 100_000, STOCK_ITEM_COUNT))
+            ],
+        )
+    db.commit()
+    return db
+
+
+def report(name: str, latencies: list[float]):
+    print(
+        f"{name:<40} median {statistics.median(latencies) * 1e3:9.3f} ms  "
+        f"p99 {statistics.quantiles(latencies, n=100)[98] * 1e3:9.3f} ms"
+    )
+
+
+def measure(function, iterations: int) -> list[float]:
+    function()
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    db = create_session()
+    # Memory is measured on a separate load, tracing slows allocations down. It
+    # comes first, a later load would share the interned names of the timed one.
+    tracemalloc.start()
+    traced_read_model = StockItemReadModel(sync_interval=3600)
+    traced_read_model.load(db)
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del traced_read_model
+    read_model = StockItemReadModel(sync_interval=3600)
+    start = time.perf_counter()
+    read_model.load(db)
+    load_time = time.perf_counter() - start
+    print(
+        f"loaded {len(read_model)} stock items in {load_time:.1f} s, "
+        f"{size / 2**20:.0f} MiB retained, {peak / 2**20:.0f} MiB peak"
+    )
+
+    service = StockItemService(db)
+    service.query_cache = QueryCache(None, 0)
+    for query_name, filter_query in QUERIES.items():
+        for source, model, iterations in (
+            ("read model", read_model, ITERATIONS),
+            ("database", StockItemReadModel(sync_interval=3600), DATABASE_ITERATIONS),
+        ):
+            service.read_model = model
+            latencies = measure(
+                lambda: service.get_all_stock_items_rows(
+                    filter_query.model_copy(deep=True)
+                ),
+                iterations,
+            )
+            report(f"{query_name} ({source})", latencies)
+
+    rng = random.Random(1)
+    rows = db.query(
+        StockItem.id,
+        StockItem.name,
+        StockItem.quantity,
+        StockItem.category_id,
+        StockItem.creation_date,
+        StockItem.last_modification_date,
+        StockItem.version,
+        StockItem.reorder_threshold,
+    ).all()
+    latencies = []
+    for version, row in enumerate(rng.sample(rows, WRITES), start=2):
+        changed_row = (
+            *row[:2],
+            rng.randrange(1000),
+            row[3],
+            row[4],
+            START_DATE + timedelta(days=800, seconds=version),
+            row[6] + 1,
+            row[7],
+        )
+        start = time.perf_counter()
+        read_model.apply_rows([changed_row])
+        latencies.append(time.perf_counter() - start)
+    report("apply quantity change", latencies)
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark of list response serialization for 1,000-row stock item pages.
+
+Compares the default path (ORM objects validated through PagedResult[ReadStockItemDto]
+and dumped by Pydantic) with the fast path (projected rows mapped to dicts and encoded
+with orjson).
+
+Run from the project root:
+    envirnoment=development python -m benchmarks.serialization_benchmark
+"""
+
+import os
+import statistics
+import timeit
+from datetime import datetime
+
+os.environ.setdefault("envirnoment", "development")
+
+import orjson  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from models.entities import ItemCategory, StockItem  # noqa: E402
+from models.models import PagedResult, ReadStockItemDto  # noqa: E402
+from serialization.stock_item_serializer import stock_item_row_to_dict  # noqa: E402
+
+PAGE_SIZE = 1000
+REPEAT = 20
+
+
+def build_orm_page():
+    """
+    Build a page of transient ORM stock items with categories attached.
+    Returns:
+        list[StockItem]: Stock items for one page.
+    """
+    now = datetime.now()
+    categories = [
+        ItemCategory(
+            id=i, name=f"Category {i}", creation_date=now, last_modification_date=now
+        )
+        for i in range(1, 11)
+    ]
+    return [
+        StockItem(
+            id=i,
+            name=f"Item {i}",
+            description=f"Description of item {i}",
+            quantity=i % 97,
+            category_id=categories[i % 10].id,
+            category=categories[i % 10],
+            creation_date=now,
+            last_modification_date=now,
+        )
+        for i in range(1, PAGE_SIZE + 1)
+    ]
+
+
+def build_row_page(stock_items):
+    """
+    Build the projected rows the fast path selects for the same page.
+    Args:
+        stock_items (list[StockItem]): Stock items to project.
+    Returns:
+        list[tuple]: Rows ordered as STOCK_ITEM_ROW_COLUMNS.
+    """
+    return [
+        (
+            item.id,
+            item.name,
+            item.description,
+            item.quantity,
+            item.creation_date,
+            item.last_modification_date,
+            item.category.id,
+            item.category.name,
+            item.category.creation_date,
+            item.category.last_modification_date,
+        )
+        for item in stock_items
+    ]
+
+
+def main():
+    stock_items = build_orm_page()
+    rows = build_row_page(stock_items)
+    adapter = TypeAdapter(PagedResult[ReadStockItemDto])
+
+    def pydantic_path():
+        paged_result = PagedResult(
+            data=stock_items,
+            current_page=1,
+            page_size=PAGE_SIZE,
+            total_items=PAGE_SIZE,
+            total_pages=1,
+        )
+        validated = adapter.validate_python(paged_result, from_attributes=True)
+        return adapter.dump_json(validated)
+
+    def fast_path():
+        return orjson.dumps(
+            {
+                "data": [stock_item_row_to_dict(row) for row in rows],
+                "current_page": 1,
+                "page_size": PAGE_SIZE,
+                "total_items": PAGE_SIZE,
+                "total_pages": 1,
+            }
+        )
+
+    assert orjson.loads(pydantic_path()) == orjson.loads(fast_path())
+
+    for label, function in (("pydantic", pydantic_path), ("orjson rows", fast_path)):
+        timings = timeit.repeat(function, number=1, repeat=REPEAT)
+        print(
+            f"{label:<12} {PAGE_SIZE} rows: "
+            f"min {min(timings) * 1000:.2f} ms, "
+            f"median {statistics.median(timings) * 1000:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
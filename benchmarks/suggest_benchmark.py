@@ -0,0 +1,123 @@
+"""
+Benchmark of the name prefix index against the LIKE queries it replaces.
+
+Seeds an in-memory SQLite database with stock items, loads the name index and
+reports its load time, memory and the median and 99th percentile latency of
+prefix lookups, next to a name LIKE '%prefix%' page query with its COUNT as run
+by the list endpoint.
+
+Run from the project root:
+    envirnoment=development python -m benchmarks.suggest_benchmark
+"""
+
+import os
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime
+
+os.environ.setdefault("envirnoment", "development")
+
+from sqlalchemy import create_engine, func, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from database_settings import Base  # noqa: E402
+from models.entities import ItemCategory, StockItem  # noqa: E402
+from search.name_index import NamePrefixIndex  # noqa: E402
+
+CATEGORY_COUNT = 100
+STOCK_ITEM_COUNT = 1_000_000
+ITERATIONS = 10_000
+DATABASE_ITERATIONS = 5
+PREFIXES = ("b", "bo", "bolt", "bolt m12", "zzz")
+WORDS = ("bolt", "nut", "screw", "washer", "hinge", "bracket", "anchor", "rivet")
+
+
+def create_session():
+    """
+    Create a session bound to a fresh in-memory database with seeded stock items.
+    Returns:
+        Session: SQLAlchemy session object.
+    """
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    now = datetime.now()
+    db.add_all(
+        ItemCategory(
+            name=f"Category {i}", creation_date=now, last_modification_date=now
+        )
+        for i in range(CATEGORY_COUNT)
+    )
+    db.flush()
+    rng = random.Random(0)
+    for start in range(0, STOCK_ITEM_COUNT, 100_000):
+        db.execute(
+            insert(StockItem.__table__),
+            [
+                {
+                    "name": f"{rng.choice(WORDS)} M{i % 40} {i}",
+                    "quantity": i % 97,
+                    "category_id": i % CATEGORY_COUNT + 1,
+                    "creation_date": now,
+                    "last_modification_date": now,
+                    "version": 1,
+                }
+                for i in range(start, min(start + 100_000, STOCK_ITEM_COUNT))
+            ],
+        )
+    db.commit()
+    return db
+
+
+def report(name: str, latencies: list[float]):
+    print(
+        f"{name:<32} median {statistics.median(latencies) * 1e6:10.1f} us  "
+        f"p99 {statistics.quantiles(latencies, n=100)[98] * 1e6:10.1f} us"
+    )
+
+
+def main():
+    db = create_session()
+    index = NamePrefixIndex()
+    start = time.perf_counter()
+    index.load(db)
+    load_time = time.perf_counter() - start
+    # Measured on a second load, tracing slows allocations down
+    tracemalloc.start()
+    traced_index = NamePrefixIndex()
+    traced_index.load(db)
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del traced_index
+    print(
+        f"loaded {len(index)} names in {load_time:.2f} s, "
+        f"{size / 2**20:.1f} MiB retained, {peak / 2**20:.1f} MiB peak"
+    )
+    for prefix in PREFIXES:
+        latencies = []
+        for _ in range(ITERATIONS):
+            start = time.perf_counter()
+            index.search(prefix, 10)
+            latencies.append(time.perf_counter() - start)
+        report(f"index prefix={prefix!r}", latencies)
+    for prefix in PREFIXES:
+        latencies = []
+        for _ in range(DATABASE_ITERATIONS):
+            start = time.perf_counter()
+            condition = StockItem.name.like(f"%{prefix}%")
+            db.query(func.count(StockItem.id)).filter(condition).scalar()
+            db.query(StockItem.id, StockItem.name).filter(condition).order_by(
+                StockItem.id
+            ).limit(10).all()
+            latencies.append(time.perf_counter() - start)
+        report(f"LIKE '%{prefix}%' + COUNT", latencies)
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Backends storing cached query results and the versions of their invalidation tags.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:  # Redis is only needed by the redis backend
+    redis = None
+
+
+class LRUCacheBackend:
+    """
+    Keeps entries in the memory of the current process, evicting the least recently
+    used ones once their total size exceeds max_bytes. Tags are invalidated only in
+    the current process, so with several workers entries of other workers stay
+    stale until they expire.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Initialize LRUCacheBackend.
+        Args:
+            max_bytes (int): Maximum total size of the cached values in bytes.
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.tag_versions = {}
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        """
+        Return a cached value.
+        Args:
+            key (str): Key of the entry.
+        Returns:
+            bytes | None: The value, None if it is not cached or expired.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expiration_time, value = entry
+            if expiration_time <= time.monotonic():
+                self._remove(key)
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: int):
+        """
+        Cache a value.
+        Args:
+            key (str): Key of the entry.
+            value (bytes): The value.
+            ttl (int): Seconds the entry is kept.
+        """
+        if len(value) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+
+    def get_tag_versions(self, tags: list[str]) -> list[int]:
+        """
+        Return the current versions of tags.
+        Args:
+            tags (list[str]): The tags.
+        Returns:
+            list[int]: Version of every tag, 0 for tags never invalidated.
+        """
+        with self.lock:
+            return [self.tag_versions.get(tag, 0) for tag in tags]
+
+    def increment_tag_versions(self, tags: list[str]):
+        """
+        Invalidate all entries cached with any of the tags.
+        Args:
+            tags (list[str]): The tags.
+        """
+        with self.lock:
+            for tag in tags:
+                self.tag_versions[tag] = self.tag_versions.get(tag, 0) + 1
+
+    def _remove(self, key: str):
+        _, value = self.entries.pop(key)
+        self.size -= len(value)
+
+
+class RedisCacheBackend:
+    """
+    Keeps entries in a Redis compatible store shared by every worker, which also
+    shares tag invalidations. Entries expire through the TTL of the store.
+    """
+
+    def __init__(self, client, prefix: str):
+        """
+        Initialize RedisCacheBackend.
+        Args:
+            client: Redis client, or FakeRedisClient in tests.
+            prefix (str): Prefix of all keys written by the backend.
+        """
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str) -> "RedisCacheBackend":
+        """
+        Create a backend connected to a Redis server.
+        Args:
+            url (str): Redis connection URL.
+            prefix (str): Prefix of all keys written by the backend.
+        Returns:
+            RedisCacheBackend: The backend.
+        Raises:
+            RuntimeError: If the redis package is not installed.
+        """
+        if redis is None:
+            raise RuntimeError(
+                "The redis query cache backend requires the 'redis' package to be installed."
+            )
+        return cls(redis.Redis.from_url(url), prefix)
+
+    def get(self, key: str) -> bytes | None:
+        """
+        Return a cached value.
+        Args:
+            key (str): Key of the entry.
+        Returns:
+            bytes | None: The value, None if it is not cached or expired.
+        """
+        return self.client.get(f"{self.prefix}:entry:{key}")
+
+    def set(self, key: str, value: bytes, ttl: int):
+        """
+        Cache a value.
+        Args:
+            key (str): Key of the entry.
+            value (bytes): The value.
+            ttl (int): Seconds the entry is kept.
+        """
+        self.client.set(f"{self.prefix}:entry:{key}", value, ex=ttl)
+
+    def get_tag_versions(self, tags: list[str]) -> list[int]:
+        """
+        Return the current versions of tags.
+        Args:
+            tags (list[str]): The tags.
+        Returns:
+            list[int]: Version of every tag, 0 for tags never invalidated.
+        """
+        versions = self.client.mget([f"{self.prefix}:tag:{tag}" for tag in tags])
+        return [int(version or 0) for version in versions]
+
+    def increment_tag_versions(self, tags: list[str]):
+        """
+        Invalidate all entries cached with any of the tags, in every worker.
+        Args:
+            tags (list[str]): The tags.
+        """
+        for tag in tags:
+            self.client.incr(f"{self.prefix}:tag:{tag}")
+
+
+class FakeRedisClient:
+    """
+    In-process stand-in for the subset of the Redis client used by RedisCacheBackend,
+    for tests and benchmarks without a Redis server.
+    """
+
+    def __init__(self):
+        """
+        Initialize FakeRedisClient.
+        """
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def get(self, name: str) -> bytes | None:
+        with self.lock:
+            entry = self.values.get(name)
+            if entry is None:
+                return None
+            expiration_time, value = entry
+            if expiration_time is not None and expiration_time <= time.monotonic():
+                del self.values[name]
+                return None
+            return value
+
+    def set(self, name: str, value, ex: int | None = None):
+        with self.lock:
+            expiration_time = None if ex is None else time.monotonic() + ex
+            self.values[name] = (expiration_time, value)
+
+    def mget(self, names: list[str]) -> list:
+        return [self.get(name) for name in names]
+
+    def incr(self, name: str) -> int:
+        with self.lock:
+            _, value = self.values.get(name, (None, b"0"))
+            value = int(value) + 1
+            self.values[name] = (None, str(value).encode())
+            return value
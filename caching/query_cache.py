@@ -0,0 +1,114 @@
+"""
+Cache of list query results keyed by the normalized filter model and invalidated by tags.
+"""
+
+import hashlib
+import pickle
+import threading
+from typing import Callable, TypeVar
+
+from pydantic import BaseModel
+
+from app_settings import get_app_settings
+from caching.cache_backends import LRUCacheBackend, RedisCacheBackend
+
+T = TypeVar("T")
+
+
+class QueryCache:
+    """
+    Caches results of list queries under the normalized filter model. Every entry is
+    tagged with the tables its query reads; writing services invalidate a table's tag
+    after commit, which changes the keys of all entries tagged with it, so stale
+    entries are never read again and expire on their own.
+
+    Results are stored pickled, so every hit returns a fresh copy the caller may
+    modify. The cache store must therefore be trusted.
+
+    The memory backend and its tag versions live in one process, so invalidations
+    after a write do not reach other workers, which keep serving stale results until
+    they expire. It is only safe with a single worker, deployments with more workers
+    must use the redis backend or none, the production default.
+    """
+
+    def __init__(self, backend, ttl: int):
+        """
+        Initialize QueryCache.
+        Args:
+            backend: LRUCacheBackend, RedisCacheBackend or None to disable caching.
+            ttl (int): Seconds a result is cached.
+        """
+        self.backend = backend
+        self.ttl = ttl
+
+    def get_or_compute(
+        self,
+        namespace: str,
+        filter_query: BaseModel,
+        tags: list[str],
+        compute: Callable[[], T],
+    ) -> T:
+        """
+        Return the cached result of a query, computing and caching it on a miss.
+        Args:
+            namespace (str): Name of the query, distinguishing results of the same filter model.
+            filter_query (BaseModel): The filter model the result depends on.
+            tags (list[str]): Names of the tables read by the query.
+            compute (Callable[[], T]): Runs the query, the result must be picklable.
+        Returns:
+            T: The result of the query.
+        """
+        if self.backend is None:
+            return compute()
+        # Versions are read before the query, so a write committed while the query
+        # runs bumps them and the possibly stale result is stored under an old key
+        versions = self.backend.get_tag_versions(tags)
+        digest = hashlib.sha1(
+            filter_query.model_dump_json().encode(), usedforsecurity=False
+        ).hexdigest()
+        key = f"{namespace}:{digest}:{'.'.join(map(str, versions))}"
+        value = self.backend.get(key)
+        if value is not None:
+            return pickle.loads(value)
+        result = compute()
+        self.backend.set(
+            key, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), self.ttl
+        )
+        return result
+
+    def invalidate(self, *tags: str):
+        """
+        Invalidate all results of queries reading any of the tables.
+        Args:
+            *tags (str): Names of the changed tables.
+        """
+        if self.backend is not None:
+            self.backend.increment_tag_versions(list(tags))
+
+
+_query_cache = None
+_query_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> QueryCache:
+    """
+    Return the process wide query cache, creating it on first use with the backend
+    selected by QUERY_CACHE_BACKEND.
+    Returns:
+        QueryCache: The query cache.
+    """
+    global _query_cache
+    if _query_cache is None:
+        with _query_cache_lock:
+            if _query_cache is None:
+                app_settings = get_app_settings()
+                if app_settings.query_cache_backend == "redis":
+                    backend = RedisCacheBackend.from_url(
+                        app_settings.query_cache_redis_url, "stock-manager-query-cache"
+                    )
+                elif app_settings.query_cache_backend == "memory":
+                    backend = LRUCacheBackend(app_settings.query_cache_max_bytes)
+                else:
+                    backend = None
+                _query_cache = QueryCache(backend, app_settings.query_cache_ttl)
+    return _query_cache
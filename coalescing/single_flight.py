@@ -0,0 +1,95 @@
+"""
+Single-flight execution sharing one computation between identical concurrent requests.
+"""
+
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Hashable
+
+from starlette.concurrency import run_in_threadpool
+
+
+class SingleFlight:
+    """
+    Runs a blocking function in the threadpool once per key at a time. Calls made with
+    the same key while it is running wait for it and get its result, or its exception,
+    instead of running the function again. A caller going away does not cancel the
+    shared computation. Used from a single event loop.
+    """
+
+    def __init__(self):
+        """
+        Initialize SingleFlight.
+        """
+        self._calls = {}
+        self.executions_total = defaultdict(int)
+        self.coalesced_total = defaultdict(int)
+
+    async def run(self, route: str, key: Hashable, fn: Callable[..., Any], *args):
+        """
+        Run fn(*args) in the threadpool or join its running execution with the same key.
+        Args:
+            route (str): Name of the route, used in the metrics.
+            key (Hashable): Key of the computation, equal for requests with the same result.
+            fn (Callable[..., Any]): Blocking function computing the result.
+            *args: Arguments of fn.
+        Returns:
+            Any: The result of fn, shared by all callers with the same key.
+        """
+        call_key = (route, key)
+        task = self._calls.get(call_key)
+        if task is not None:
+            self.coalesced_total[route] += 1
+        else:
+            self.executions_total[route] += 1
+            task = asyncio.ensure_future(run_in_threadpool(fn, *args))
+            self._calls[call_key] = task
+            task.add_done_callback(lambda done: self._finish(call_key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, call_key: tuple, task: asyncio.Future):
+        self._calls.pop(call_key, None)
+        if not task.cancelled():
+            # Mark the exception as retrieved when every caller has gone away
+            task.exception()
+
+    def format_metrics(self) -> str:
+        """
+        Return the executions and saved executions of each route in the Prometheus text format.
+        Returns:
+            str: The metrics.
+        """
+        lines = [
+            "# HELP coalescing_executions_total Computations run for coalesced routes.",
+            "# TYPE coalescing_executions_total counter",
+        ]
+        for route, count in sorted(self.executions_total.items()):
+            lines.append(f'coalescing_executions_total{{route="{route}"}} {count}')
+        lines.append(
+            "# HELP coalescing_saved_executions_total Requests served by joining a running computation."
+        )
+        lines.append("# TYPE coalescing_saved_executions_total counter")
+        for route, count in sorted(self.coalesced_total.items()):
+            lines.append(
+                f'coalescing_saved_executions_total{{route="{route}"}} {count}'
+            )
+        return "\n".join(lines) + "\n"
+
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """
+    Return the process wide single-flight executor, creating it on first use.
+    Returns:
+        SingleFlight: The single-flight executor.
+    """
+    global _single_flight
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight()
+    return _single_flight
@@ -0,0 +1,36 @@
+"""
+Consistency check for the category stock summary table.
+
+Recomputes item counts and total quantities per category from stock items, reports
+categories whose stored totals were out of sync and rewrites the table.
+
+Run from the project root:
+    envirnoment=production python -m commands.rebuild_category_stock_summary
+"""
+
+from database_settings import SessionLocal
+from services.category_stock_summary_service import CategoryStockSummaryService
+
+
+def main():
+    db = SessionLocal()
+    try:
+        mismatches = CategoryStockSummaryService(db).rebuild_category_stock_summary()
+    finally:
+        db.close()
+    if not mismatches:
+        print("Category stock summary is consistent")
+        return
+    for mismatch in mismatches:
+        print(
+            f"Category id={mismatch['category_id']}: "
+            f"stored items={mismatch['stored_item_count']} "
+            f"quantity={mismatch['stored_total_quantity']}, "
+            f"actual items={mismatch['item_count']} "
+            f"quantity={mismatch['total_quantity']}"
+        )
+    print(f"Rebuilt summary, {len(mismatches)} categories were out of sync")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Helpers mapping entity versions to ETag and If-Match header values.
+"""
+
+from fastapi import HTTPException, status
+
+
+def format_etag(version: int) -> str:
+    """
+    Format an entity version as a strong ETag value.
+    Args:
+        version (int): The entity's version.
+    Returns:
+        str: Quoted ETag value.
+    """
+    return f'"{version}"'
+
+
+def parse_if_match(if_match: str | None) -> int | None:
+    """
+    Return the entity version required by an If-Match header value.
+    Args:
+        if_match (str | None): Value of the If-Match request header.
+    Returns:
+        int | None: Expected version, None when the header is absent or "*".
+    Raises:
+        HTTPException: 412 if the header does not hold a single version ETag.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    value = value.strip('"')
+    if not value.isdigit():
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"If-Match value {if_match} does not match any version",
+        )
+    return int(value)
@@ -6,9 +6,9 @@ Supports both SQLite for development and MariaDB for production environments.
 from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
-from app_settings import AppSettings
+from app_settings import get_app_settings
 
-app_settings = AppSettings()
+app_settings = get_app_settings()
 
 if app_settings.envirnoment == "development":
     db_name = app_settings.db_name
@@ -6,9 +6,17 @@ from sqlalchemy.orm import Session
 
 from database_settings import SessionLocal
 from services.auth_service import AuthService
+from services.category_stock_summary_service import CategoryStockSummaryService
 from services.item_category_service import ItemCategoryService
+from services.job_service import JobService
+from services.low_stock_service import LowStockService
 from services.role_service import RoleService
+from services.stock_forecast_service import StockForecastService
+from services.stock_item_analytics_service import StockItemAnalyticsService
+from services.stock_item_import_service import StockItemImportService
 from services.stock_item_service import StockItemService
+from services.stock_item_sync_service import StockItemSyncService
+from services.stock_movement_service import StockMovementService
 from services.user_service import UserService
 
 oauth2_bearer = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
@@ -36,6 +44,36 @@ async def get_stock_item_service(
     return service
 
 
+async def get_stock_movement_service(
+    db: Annotated[Session, Depends(get_db_session)],
+) -> StockMovementService:
+    """
+    Dependency that provides a StockMovementService instance using the database session.
+    """
+    service = StockMovementService(db)
+    return service
+
+
+async def get_stock_item_import_service(
+    db: Annotated[Session, Depends(get_db_session)],
+) -> StockItemImportService:
+    """
+    Dependency that provides a StockItemImportService instance using the database session.
+    """
+    service = StockItemImportService(db)
+    return service
+
+
+async def get_stock_item_sync_service(
+    db: Annotated[Session, Depends(get_db_session)],
+) -> StockItemSyncService:
+    """
+    Dependency that provides a StockItemSyncService instance using the database session.
+    """
+    service = StockItemSyncService(db)
+    return service
+
+
 async def get_item_category_service(
     db: Annotated[Session, Depends(get_db_session)],
 ) -> ItemCategoryService:
@@ -46,6 +84,56 @@ async def get_item_category_service(
     return service
 
 
+async def get_category_stock_summary_service(
+    db: Annotated[Session, Depends(get_db_session)],
+) -> CategoryStockSummaryService:
+    """
+    Dependency that provides a CategoryStockSummaryService instance using the database session.
+    """
+    service = CategoryStockSummaryService(db)
+    return service
+
+
+async def get_stock_item_analytics_service(
+    db: Annotated[Session, Depends(get_db_session)],
+) -> StockItemAnalyticsService:
+    """
+    Dependency that provides a StockItemAnalyticsService instance using the database session.
+    """
+    service = StockItemAnalyticsService(db)
+    return service
+
+
+async def get_low_stock_service(
+    db: Annotated[Session, Depends(get_db_session)],
+) -> LowStockService:
+    """
+    Dependency that provides a LowStockService instance using the database session.
+    """
+    service = LowStockService(db)
+    return service
+
+
+async def get_stock_forecast_service(
+    db: Annotated[Session, Depends(get_db_session)],
+) -> StockForecastService:
+    """
+    Dependency that provides a StockForecastService instance using the database session.
+    """
+    service = StockForecastService(db)
+    return service
+
+
+async def get_job_service(
+    db: Annotated[Session, Depends(get_db_session)],
+) -> JobService:
+    """
+    Dependency that provides a JobService instance using the database session.
+    """
+    service = JobService(db)
+    return service
+
+
 async def get_role_service(
     db: Annotated[Session, Depends(get_db_session)],
 ) -> RoleService:
@@ -85,3 +173,15 @@ async def get_current_user(
     Uses the AuthService to validate and return the user.
     """
     return service.get_current_user(token)
+
+
+async def get_streaming_user(
+    token: Annotated[str, Depends(oauth2_bearer)],
+):
+    """
+    Dependency that retrieves the current user like get_current_user for streaming responses.
+    The user is read in a session closed before the response starts, so open streams hold no
+    database connection.
+    """
+    with SessionLocal() as db:
+        return AuthService(db).get_current_user(token)
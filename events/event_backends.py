@@ -0,0 +1,105 @@
+"""
+Backends delivering published change events to the broadcasters of every worker.
+"""
+
+import json
+
+try:
+    import redis
+except ImportError:  # Redis is only needed by the redis backend
+    redis = None
+
+
+class LocalEventBackend:
+    """
+    Delivers events only to the broadcaster of the current process.
+    Suitable for a single worker and for tests.
+    """
+
+    def __init__(self):
+        """
+        Initialize LocalEventBackend.
+        """
+        self.dispatch = None
+
+    def start(self, dispatch):
+        """
+        Start delivering events.
+        Args:
+            dispatch: Callable receiving every published event.
+        """
+        self.dispatch = dispatch
+
+    def publish(self, event: dict):
+        """
+        Publish an event.
+        Args:
+            event (dict): The event to publish.
+        """
+        if self.dispatch is not None:
+            self.dispatch(event)
+
+    def stop(self):
+        """
+        Stop delivering events.
+        """
+        self.dispatch = None
+
+
+class RedisEventBackend:
+    """
+    Fans events out across workers through a Redis pub/sub channel.
+    Every worker subscribes to the channel on a background thread and
+    delivers received events to its own broadcaster.
+    """
+
+    def __init__(self, url: str, channel: str):
+        """
+        Initialize RedisEventBackend.
+        Args:
+            url (str): Redis connection URL.
+            channel (str): Pub/sub channel events are published on.
+        Raises:
+            RuntimeError: If the redis package is not installed.
+        """
+        if redis is None:
+            raise RuntimeError(
+                "The redis event backend requires the 'redis' package to be installed."
+            )
+        self.channel = channel
+        self.client = redis.Redis.from_url(url)
+        self.pubsub = None
+        self.listener = None
+
+    def start(self, dispatch):
+        """
+        Subscribe to the channel and start delivering events.
+        Args:
+            dispatch: Callable receiving every published event.
+        """
+
+        def handle_message(message):
+            dispatch(json.loads(message["data"]))
+
+        self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.subscribe(**{self.channel: handle_message})
+        self.listener = self.pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+    def publish(self, event: dict):
+        """
+        Publish an event to every worker, including the current one.
+        Args:
+            event (dict): The event to publish.
+        """
+        self.client.publish(self.channel, json.dumps(event, default=str))
+
+    def stop(self):
+        """
+        Stop the listener thread and close the subscription.
+        """
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        if self.pubsub is not None:
+            self.pubsub.close()
+            self.pubsub = None
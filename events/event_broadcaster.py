@@ -0,0 +1,140 @@
+"""
+In-process broadcaster fanning change events out to subscribers with bounded queues.
+"""
+
+import asyncio
+import threading
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from app_settings import get_app_settings
+from events.event_backends import LocalEventBackend, RedisEventBackend
+from logger.logger import logger
+
+
+class Subscription:
+    """
+    A subscriber's bounded queue of events, owned by the event loop it was created on.
+    A None item in the queue means the subscriber was dropped for being too slow.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_queue_size: int):
+        """
+        Initialize Subscription.
+        Args:
+            loop (asyncio.AbstractEventLoop): Event loop of the subscriber.
+            max_queue_size (int): Number of events buffered before the subscriber is dropped.
+        """
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=max_queue_size)
+        self.dropped = False
+
+
+class EventBroadcaster:
+    """
+    Publishes change events through a backend and delivers the events received from it
+    to every local subscriber. Publishing never blocks: a subscriber whose queue is full
+    is dropped instead of slowing down writers or other subscribers.
+    """
+
+    def __init__(self, backend, max_queue_size: int):
+        """
+        Initialize EventBroadcaster and start its backend.
+        Args:
+            backend: Backend delivering published events to the broadcasters of every worker.
+            max_queue_size (int): Number of events buffered per subscriber.
+        """
+        self.backend = backend
+        self.max_queue_size = max_queue_size
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+        self.backend.start(self._dispatch)
+
+    def publish(self, event_type: str, data: dict):
+        """
+        Publish a change event. Failures are logged and never raised, the change
+        itself is already committed when events are published.
+        Args:
+            event_type (str): Type of the event, e.g. "stock_item.updated".
+            data (dict): JSON serializable event data.
+        """
+        event = {
+            "type": event_type,
+            "data": data,
+            "date": datetime.now(ZoneInfo("Europe/Warsaw")).isoformat(),
+        }
+        try:
+            self.backend.publish(event)
+        except Exception:
+            logger.exception(f"Failed to publish {event_type} event")
+
+    def subscribe(self) -> Subscription:
+        """
+        Subscribe to events. Must be called from the event loop of the subscriber.
+        Returns:
+            Subscription: The new subscription.
+        """
+        subscription = Subscription(asyncio.get_running_loop(), self.max_queue_size)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """
+        Remove a subscription, does nothing if it was already removed.
+        Args:
+            subscription (Subscription): The subscription to remove.
+        """
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def _dispatch(self, event: dict):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    self._deliver, subscription, event
+                )
+            except RuntimeError:  # The subscriber's event loop is closed
+                self.unsubscribe(subscription)
+
+    def _deliver(self, subscription: Subscription, event: dict):
+        if subscription.dropped:
+            return
+        try:
+            subscription.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            subscription.dropped = True
+            self.unsubscribe(subscription)
+            while not subscription.queue.empty():
+                subscription.queue.get_nowait()
+            subscription.queue.put_nowait(None)
+
+
+_event_broadcaster = None
+_event_broadcaster_lock = threading.Lock()
+
+
+def get_event_broadcaster() -> EventBroadcaster:
+    """
+    Return the process wide event broadcaster, creating it on first use
+    with the backend selected by EVENT_BACKEND.
+    Returns:
+        EventBroadcaster: The event broadcaster.
+    """
+    global _event_broadcaster
+    if _event_broadcaster is None:
+        with _event_broadcaster_lock:
+            if _event_broadcaster is None:
+                app_settings = get_app_settings()
+                if app_settings.event_backend == "redis":
+                    backend = RedisEventBackend(
+                        app_settings.event_redis_url, app_settings.event_channel
+                    )
+                else:
+                    backend = LocalEventBackend()
+                _event_broadcaster = EventBroadcaster(
+                    backend, app_settings.event_queue_size
+                )
+    return _event_broadcaster
@@ -0,0 +1,58 @@
+"""
+Server-sent events formatting and streaming of broadcaster subscriptions.
+"""
+
+import asyncio
+import json
+
+from events.event_broadcaster import EventBroadcaster, Subscription
+
+
+def format_sse_event(event_type: str, data: dict) -> str:
+    """
+    Format an event as a server-sent events message.
+    Args:
+        event_type (str): Value of the event field.
+        data (dict): JSON serializable event data.
+    Returns:
+        str: The message, terminated by a blank line.
+    """
+    return f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def sse_event_stream(
+    request,
+    broadcaster: EventBroadcaster,
+    subscription: Subscription,
+    heartbeat_interval: float,
+):
+    """
+    Yield server-sent events messages for a subscription until the client disconnects
+    or is dropped for being too slow. Idle streams get a keep-alive comment every
+    heartbeat interval, which also detects disconnected clients.
+    Args:
+        request: The streaming request.
+        broadcaster (EventBroadcaster): Broadcaster owning the subscription.
+        subscription (Subscription): The subscription to stream.
+        heartbeat_interval (float): Seconds between keep-alive comments.
+    """
+    try:
+        yield ": connected\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(), heartbeat_interval
+                )
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+                continue
+            if event is None:
+                yield format_sse_event(
+                    "dropped", {"detail": "Subscriber was too slow and was dropped."}
+                )
+                break
+            yield format_sse_event(event["type"], event)
+    finally:
+        broadcaster.unsubscribe(subscription)
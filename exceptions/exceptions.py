@@ -1,3 +1,9 @@
+class VersionMismatchException(Exception):
+    """Exception raised when an update targets an outdated version of an entity."""
+
+    pass
+
+
 class CategoryNotFoundException(Exception):
     """Exception raised when a category is not found."""
 
@@ -16,12 +22,72 @@ class StockItemNotFoundException(Exception):
     pass
 
 
+class StockForecastNotFoundException(Exception):
+    """Exception raised when a stock item has no computed forecast."""
+
+    pass
+
+
 class StockItemAlreadyExistsException(Exception):
     """Exception raised when a stock item already exists."""
 
     pass
 
 
+class BatchSizeExceededException(Exception):
+    """Exception raised when a batch request has more entries than allowed."""
+
+    pass
+
+
+class QueryLimitExceededException(Exception):
+    """Exception raised when a list query exceeds the page size limit or the cost budget."""
+
+    pass
+
+
+class InvalidImportFileException(Exception):
+    """Exception raised when an import file cannot be read."""
+
+    pass
+
+
+class JobNotFoundException(Exception):
+    """Exception raised when a background job is not found."""
+
+    pass
+
+
+class UnknownJobTypeException(Exception):
+    """Exception raised when a background job has no registered handler."""
+
+    pass
+
+
+class InvalidJobStateException(Exception):
+    """Exception raised when a background job cannot change to the requested state."""
+
+    pass
+
+
+class JobCancelledException(Exception):
+    """Exception raised inside a job handler when cancellation of its job was requested."""
+
+    pass
+
+
+class InvalidSyncTokenException(Exception):
+    """Exception raised when a sync token cannot be decoded."""
+
+    pass
+
+
+class InsufficientStockException(Exception):
+    """Exception raised when a quantity adjustment would make stock negative."""
+
+    pass
+
+
 class RoleNotFoundException(Exception):
     """Exception raised when a role is not found."""
 
@@ -64,6 +130,10 @@ class NoEnvirnomentVariableException(Exception):
     pass
 
 
+class InvalidSettingException(Exception):
+    pass
+
+
 class InvalidRoleException(Exception):
     pass
 
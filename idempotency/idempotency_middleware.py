@@ -0,0 +1,392 @@
+"""
+ASGI middleware making POST endpoints safe to retry with an Idempotency-Key header.
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import tempfile
+import time
+import weakref
+
+import jwt
+from python_multipart import MultipartParser
+from python_multipart.multipart import MultipartParseError, parse_options_header
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+
+from app_settings import get_app_settings
+from database_settings import SessionLocal
+from logger.logger import logger
+from services.idempotency_service import IdempotencyService
+
+MAX_KEY_LENGTH = 255
+PURGE_INTERVAL = 60
+# Request bodies larger than this are spooled to a temporary file instead of memory
+SPOOL_MAX_SIZE = 1024 * 1024
+# Size of the body chunks passed to the endpoint
+REPLAY_CHUNK_SIZE = 64 * 1024
+
+
+class IdempotencyMiddleware:
+    """
+    Runs a POST request with an Idempotency-Key header once per user and key, stores
+    its response and replays it to retries without running the endpoint again.
+
+    Duplicates arriving while the first request is still running wait for it, in
+    process on a lock and across workers by polling the reservation, and get 409
+    when it does not finish within IDEMPOTENCY_WAIT_TIMEOUT. The running request
+    renews its reservation every third of IDEMPOTENCY_LOCK_TIMEOUT, so only the
+    reservation of a crashed request is taken over. Reusing a key with a
+    different request gets 422. Responses with a 5xx status are not stored, so the
+    request can be retried. Requests without a valid access token are passed through
+    and rejected by the endpoint itself. The request body is hashed while it is spooled
+    to a temporary file and streamed from it to the endpoint, so large uploads are not
+    held in memory. Multipart bodies are hashed by the name, file name and content of
+    their parts, so a retry whose form is encoded again with another boundary matches.
+    """
+
+    def __init__(self, app, paths: list[str]):
+        """
+        Initialize IdempotencyMiddleware.
+        Args:
+            app: The ASGI application to wrap.
+            paths (list[str]): Regular expressions of the POST paths honouring the header.
+        """
+        self.app = app
+        self.paths = [re.compile(path) for path in paths]
+        self.app_settings = get_app_settings()
+        self._locks = weakref.WeakValueDictionary()
+        self._last_purge = 0.0
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not any(path.fullmatch(scope["path"]) for path in self.paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        key = headers.get(b"idempotency-key")
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        key = key.decode("latin-1").strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await JSONResponse(
+                {
+                    "detail": f"Idempotency-Key must have between 1 and {MAX_KEY_LENGTH} characters"
+                },
+                status_code=400,
+            )(scope, receive, send)
+            return
+        user_id = self._get_user_id(headers.get(b"authorization"))
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        request_hasher = hashlib.sha256(
+            b"\n".join(
+                [
+                    scope["method"].encode(),
+                    scope["path"].encode(),
+                    scope.get("query_string", b""),
+                    b"",
+                ]
+            )
+        )
+        content_type, options = parse_options_header(headers.get(b"content-type", b""))
+        body_hasher = request_hasher
+        if content_type == b"multipart/form-data" and options.get(b"boundary"):
+            body_hasher = MultipartBodyHasher(options[b"boundary"])
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as body:
+            await self._spool_body(receive, body, body_hasher)
+            if body_hasher is not request_hasher:
+                request_hasher.update(body_hasher.digest())
+            request_hash = request_hasher.hexdigest()
+            deadline = time.monotonic() + self.app_settings.idempotency_wait_timeout
+            lock = self._locks.setdefault((user_id, key), asyncio.Lock())
+            try:
+                await asyncio.wait_for(lock.acquire(), deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                await _in_progress_response(scope, receive, send)
+                return
+            try:
+                acquired, record = await self._wait_for_key(
+                    user_id, key, request_hash, deadline
+                )
+                if acquired:
+                    await self._run_and_store(scope, receive, send, body, user_id, key)
+                    return
+                if record is None:
+                    await _in_progress_response(scope, receive, send)
+                    return
+                if record["request_hash"] != request_hash:
+                    await JSONResponse(
+                        {
+                            "detail": "Idempotency-Key was already used with a different request"
+                        },
+                        status_code=422,
+                    )(scope, receive, send)
+                    return
+                await self._replay(send, record)
+            finally:
+                lock.release()
+
+    async def _wait_for_key(
+        self, user_id: int, key: str, request_hash: str, deadline: float
+    ) -> tuple[bool, dict | None]:
+        # Returns whether the key was reserved, otherwise the completed record
+        # or None when the running request did not finish by the deadline
+        while True:
+            record = await run_in_threadpool(
+                self._acquire_key, user_id, key, request_hash
+            )
+            if record is None:
+                return True, None
+            if record["status_code"] is not None:
+                return False, record
+            if time.monotonic() >= deadline:
+                return False, None
+            await asyncio.sleep(0.1)
+
+    async def _run_and_store(self, scope, receive, send, body, user_id, key):
+        start_message = None
+        body_parts = []
+        body_sent = False
+        body.seek(0)
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                chunk = await _run_file_io(body, body.read, REPLAY_CHUNK_SIZE)
+                body_sent = len(chunk) < REPLAY_CHUNK_SIZE
+                return {
+                    "type": "http.request",
+                    "body": chunk,
+                    "more_body": not body_sent,
+                }
+            return await receive()
+
+        async def capture_send(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+            elif message["type"] == "http.response.body":
+                body_parts.append(message.get("body", b""))
+            await send(message)
+
+        renewal = asyncio.create_task(self._keep_key_reserved(user_id, key))
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except BaseException:
+            renewal.cancel()
+            await run_in_threadpool(self._release_key, user_id, key)
+            raise
+        renewal.cancel()
+        if start_message is None or start_message["status"] >= 500:
+            await run_in_threadpool(self._release_key, user_id, key)
+            return
+        stored_headers = json.dumps(
+            [
+                [name.decode("latin-1"), value.decode("latin-1")]
+                for name, value in start_message.get("headers", [])
+            ]
+        )
+        await run_in_threadpool(
+            self._store_response,
+            user_id,
+            key,
+            start_message["status"],
+            stored_headers,
+            b"".join(body_parts),
+        )
+
+    async def _keep_key_reserved(self, user_id: int, key: str):
+        interval = self.app_settings.idempotency_lock_timeout / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await run_in_threadpool(self._renew_key, user_id, key)
+            except Exception:
+                logger.exception(
+                    f"Failed to renew Idempotency-Key of user id={user_id}"
+                )
+
+    async def _replay(self, send, record: dict):
+        headers = [
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in json.loads(record["headers"])
+        ]
+        headers.append((b"idempotent-replayed", b"true"))
+        await send(
+            {
+                "type": "http.response.start",
+                "status": record["status_code"],
+                "headers": headers,
+            }
+        )
+        await send({"type": "http.response.body", "body": record["body"]})
+
+    def _get_user_id(self, authorization: bytes | None) -> int | None:
+        if authorization is None:
+            return None
+        scheme, _, token = authorization.decode("latin-1").partition(" ")
+        if scheme.lower() != "bearer":
+            return None
+        try:
+            payload = jwt.decode(
+                token,
+                self.app_settings.secret_key,
+                algorithms=[self.app_settings.token_algorithm],
+            )
+        except jwt.PyJWTError:
+            return None
+        if payload.get("token_type") == "refresh":
+            return None
+        return payload.get("id")
+
+    @staticmethod
+    async def _spool_body(receive, body, body_hasher):
+        while True:
+            message = await receive()
+            chunk = message.get("body", b"")
+            if chunk:
+                body_hasher.update(chunk)
+                await _run_file_io(body, body.write, chunk)
+            if not message.get("more_body", False):
+                return
+
+    def _acquire_key(self, user_id: int, key: str, request_hash: str):
+        with SessionLocal() as db:
+            service = IdempotencyService(db)
+            if time.monotonic() - self._last_purge >= PURGE_INTERVAL:
+                self._last_purge = time.monotonic()
+                service.purge_expired_keys()
+            record = service.acquire_key(user_id, key, request_hash)
+            if record is None:
+                return None
+            return {
+                "request_hash": record.request_hash,
+                "status_code": record.status_code,
+                "headers": record.headers,
+                "body": record.body,
+            }
+
+    def _store_response(self, user_id, key, status_code, headers, body):
+        with SessionLocal() as db:
+            IdempotencyService(db).store_response(
+                user_id, key, status_code, headers, body
+            )
+
+    def _renew_key(self, user_id: int, key: str):
+        with SessionLocal() as db:
+            IdempotencyService(db).renew_key(user_id, key)
+
+    def _release_key(self, user_id: int, key: str):
+        with SessionLocal() as db:
+            IdempotencyService(db).release_key(user_id, key)
+
+
+class MultipartBodyHasher:
+    """
+    Hashes a multipart/form-data body by its parts instead of its bytes, so the boundary
+    and the part headers other than the field and file names do not change the hash.
+    Bodies that are not valid multipart are hashed by their bytes.
+    """
+
+    def __init__(self, boundary: bytes):
+        """
+        Initialize MultipartBodyHasher.
+        Args:
+            boundary (bytes): Boundary of the multipart body.
+        """
+        self._parts_hasher = hashlib.sha256(b"multipart\n")
+        self._bytes_hasher = hashlib.sha256()
+        self._part_hasher = None
+        self._header_field = b""
+        self._header_value = b""
+        self._content_disposition = b""
+        self._valid = True
+        self._parser = MultipartParser(
+            boundary,
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+            },
+        )
+
+    def update(self, chunk: bytes):
+        """
+        Hash the next chunk of the body.
+        Args:
+            chunk (bytes): The chunk.
+        """
+        self._bytes_hasher.update(chunk)
+        if self._valid:
+            try:
+                self._parser.write(chunk)
+            except MultipartParseError:
+                self._valid = False
+
+    def digest(self) -> bytes:
+        """
+        Returns the digest of the parts, or of the bytes if the body is not valid multipart.
+        """
+        if self._valid:
+            try:
+                self._parser.finalize()
+            except MultipartParseError:
+                self._valid = False
+        if not self._valid:
+            return self._bytes_hasher.digest()
+        return self._parts_hasher.digest()
+
+    def _on_part_begin(self):
+        self._part_hasher = hashlib.sha256()
+        self._content_disposition = b""
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        if self._header_field.lower() == b"content-disposition":
+            self._content_disposition = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        self._part_hasher.update(data[start:end])
+
+    def _on_part_end(self):
+        _, options = parse_options_header(self._content_disposition)
+        for value in (
+            options.get(b"name", b""),
+            options.get(b"filename", b""),
+            self._part_hasher.digest(),
+        ):
+            # Length prefixes keep values from running into each other
+            self._parts_hasher.update(len(value).to_bytes(8, "big") + value)
+
+
+async def _in_progress_response(scope, receive, send):
+    await JSONResponse(
+        {"detail": "A request with this Idempotency-Key is in progress"},
+        status_code=409,
+    )(scope, receive, send)
+
+
+async def _run_file_io(spooled_file, method, *args):
+    # Files rolled over to disk are read and written in the threadpool, like UploadFile
+    if getattr(spooled_file, "_rolled", True):
+        return await run_in_threadpool(method, *args)
+    return method(*args)
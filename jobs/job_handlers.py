@@ -0,0 +1,89 @@
+"""
+Handlers of background job types. A handler receives its own database session, the job
+parameters and a JobContext, and returns a JSON serializable result.
+"""
+
+from sqlalchemy.orm import Session
+
+from exceptions.exceptions import JobCancelledException
+from services.category_stock_summary_service import CategoryStockSummaryService
+from services.idempotency_service import IdempotencyService
+from services.stock_forecast_service import StockForecastService
+from services.stock_item_import_service import StockItemImportService
+
+
+def rebuild_category_stock_summary(db: Session, parameters: dict, context) -> dict:
+    """
+    Recompute the category stock summary table from stock items.
+    Args:
+        db (Session): SQLAlchemy session object.
+        parameters (dict): Not used.
+        context (JobContext): Progress reporting and cancellation of the job.
+    Returns:
+        dict: Categories whose stored totals were out of sync.
+    """
+    context.report_progress(0, 1)
+    mismatches = CategoryStockSummaryService(db).rebuild_category_stock_summary()
+    context.report_progress(1, 1)
+    return {"mismatches": mismatches}
+
+
+def purge_idempotency_keys(db: Session, parameters: dict, context) -> dict:
+    """
+    Delete expired idempotency keys.
+    Args:
+        db (Session): SQLAlchemy session object.
+        parameters (dict): Not used.
+        context (JobContext): Progress reporting and cancellation of the job.
+    Returns:
+        dict: Number of deleted keys.
+    """
+    return {"deleted": IdempotencyService(db).purge_expired_keys()}
+
+
+def import_stock_items(db: Session, parameters: dict, context) -> dict:
+    """
+    Import stock items from a CSV file saved by StockItemImportService.save_import_file.
+    The file is removed once the import succeeds or is cancelled, and kept for retries
+    after a failure.
+    Args:
+        db (Session): SQLAlchemy session object.
+        parameters (dict): "file_name" of the saved file and "user_id" of the importing user.
+        context (JobContext): Progress reporting and cancellation of the job.
+    Returns:
+        dict: The import report.
+    """
+    path = StockItemImportService.get_import_file_path(parameters["file_name"])
+    try:
+        with path.open("rb") as csv_file:
+            report = StockItemImportService(db).import_stock_items(
+                csv_file, parameters.get("user_id"), context.report_progress
+            )
+    except JobCancelledException:
+        path.unlink(missing_ok=True)
+        raise
+    path.unlink(missing_ok=True)
+    return report
+
+
+def compute_stock_forecasts(db: Session, parameters: dict, context) -> dict:
+    """
+    Compute the consumption forecasts of stock items changed since the last run.
+    Args:
+        db (Session): SQLAlchemy session object.
+        parameters (dict): "full" to recompute every stock item.
+        context (JobContext): Progress reporting and cancellation of the job.
+    Returns:
+        dict: Whether the run was full and the number of computed forecasts.
+    """
+    return StockForecastService(db).compute_stock_forecasts(
+        bool(parameters.get("full", False)), context.report_progress
+    )
+
+
+JOB_HANDLERS = {
+    "rebuild_category_stock_summary": rebuild_category_stock_summary,
+    "purge_idempotency_keys": purge_idempotency_keys,
+    "import_stock_items": import_stock_items,
+    "compute_stock_forecasts": compute_stock_forecasts,
+}
@@ -0,0 +1,186 @@
+"""
+Local worker pool running background jobs with bounded concurrency.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app_settings import get_app_settings
+from database_settings import SessionLocal
+from exceptions.exceptions import JobCancelledException
+from jobs.job_handlers import JOB_HANDLERS
+from logger.logger import logger
+from services.job_service import JobService
+
+PROGRESS_INTERVAL = 1.0
+MAX_RETRY_DELAY = 3600
+
+
+class JobContext:
+    """
+    Passed to job handlers to report progress and observe cancellation requests.
+    Progress is written in its own session, so the handler's transaction is not committed.
+    """
+
+    def __init__(self, job_id: int):
+        """
+        Initialize JobContext.
+        Args:
+            job_id (int): ID of the running job.
+        """
+        self.job_id = job_id
+        self._last_report = 0.0
+
+    def report_progress(self, progress_current: int, progress_total: int | None = None):
+        """
+        Store the progress of the job, at most once per second unless the job is done.
+        Args:
+            progress_current (int): Number of processed units of work.
+            progress_total (int | None): Total number of units of work, if known.
+        Raises:
+            JobCancelledException: If cancellation of the job was requested.
+        """
+        now = time.monotonic()
+        if (
+            now - self._last_report < PROGRESS_INTERVAL
+            and progress_current != progress_total
+        ):
+            return
+        self._last_report = now
+        with SessionLocal() as db:
+            cancel_requested = JobService(db).report_progress(
+                self.job_id, progress_current, progress_total
+            )
+        if cancel_requested:
+            raise JobCancelledException(f"Job with id={self.job_id} was cancelled")
+
+
+class JobRunner:
+    """
+    Runs queued jobs on a thread pool of JOB_WORKERS threads. Failed attempts are
+    queued again until the job runs out of attempts and submitted after
+    JOB_RETRY_DELAY seconds, doubled for every further attempt up to an hour.
+
+    A heartbeat thread marks the running jobs as alive every third of
+    JOB_STALE_TIMEOUT, however rarely their handlers report progress, so only jobs
+    of a stopped process are requeued as interrupted.
+    """
+
+    def __init__(self, max_workers: int, heartbeat_interval: float, retry_delay: float):
+        """
+        Initialize JobRunner.
+        Args:
+            max_workers (int): Number of jobs run concurrently.
+            heartbeat_interval (float): Seconds between heartbeats of the running jobs.
+            retry_delay (float): Seconds before the first retry of a failed job.
+        """
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="job"
+        )
+        self.heartbeat_interval = heartbeat_interval
+        self.retry_delay = retry_delay
+        self._running_job_ids = set()
+        self._lock = threading.Lock()
+        self._heartbeat_thread = None
+
+    def submit(self, job_id: int):
+        """
+        Schedule a queued job to run on the pool.
+        Args:
+            job_id (int): The job's ID.
+        """
+        self.executor.submit(self._run, job_id)
+
+    def resume_jobs(self):
+        """
+        Submit jobs left queued or interrupted by a previous process.
+        """
+        with SessionLocal() as db:
+            job_ids = JobService(db).get_jobs_to_resume()
+        for job_id in job_ids:
+            self.submit(job_id)
+
+    def _run(self, job_id: int):
+        with SessionLocal() as db:
+            job = JobService(db).start_job(job_id)
+            if job is None:
+                return
+            handler = JOB_HANDLERS[job.job_type]
+            parameters = json.loads(job.parameters)
+            attempts = job.attempts
+        self._start_heartbeat(job_id)
+        try:
+            with SessionLocal() as db:
+                result = handler(db, parameters, JobContext(job_id))
+        except JobCancelledException:
+            with SessionLocal() as db:
+                JobService(db).cancel_running_job(job_id)
+            return
+        except Exception as e:
+            logger.exception(f"Job with id={job_id} failed")
+            with SessionLocal() as db:
+                requeued = JobService(db).fail_job(job_id, f"{type(e).__name__}: {e}")
+            if requeued:
+                self._submit_later(job_id, attempts)
+            return
+        finally:
+            self._stop_heartbeat(job_id)
+        with SessionLocal() as db:
+            JobService(db).finish_job(job_id, result)
+
+    def _submit_later(self, job_id: int, attempts: int):
+        delay = min(self.retry_delay * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+        timer = threading.Timer(delay, self.submit, [job_id])
+        timer.daemon = True
+        timer.start()
+
+    def _start_heartbeat(self, job_id: int):
+        with self._lock:
+            self._running_job_ids.add(job_id)
+            if self._heartbeat_thread is None:
+                self._heartbeat_thread = threading.Thread(
+                    target=self._send_heartbeats, name="job-heartbeat", daemon=True
+                )
+                self._heartbeat_thread.start()
+
+    def _stop_heartbeat(self, job_id: int):
+        with self._lock:
+            self._running_job_ids.discard(job_id)
+
+    def _send_heartbeats(self):
+        while True:
+            time.sleep(self.heartbeat_interval)
+            with self._lock:
+                job_ids = list(self._running_job_ids)
+            if not job_ids:
+                continue
+            try:
+                with SessionLocal() as db:
+                    JobService(db).record_heartbeat(job_ids)
+            except Exception:
+                logger.exception("Failed to record the heartbeat of running jobs")
+
+
+_job_runner = None
+_job_runner_lock = threading.Lock()
+
+
+def get_job_runner() -> JobRunner:
+    """
+    Return the process wide job runner, creating it on first use.
+    Returns:
+        JobRunner: The job runner.
+    """
+    global _job_runner
+    if _job_runner is None:
+        with _job_runner_lock:
+            if _job_runner is None:
+                app_settings = get_app_settings()
+                _job_runner = JobRunner(
+                    app_settings.job_workers,
+                    app_settings.job_stale_timeout / 3,
+                    app_settings.job_retry_delay,
+                )
+    return _job_runner
@@ -1,17 +1,30 @@
 from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from admission.admission_controller import get_admission_controller
+from admission.admission_middleware import AdmissionControlMiddleware
 from app_initializer.app_initializer import AppInitializer
+from app_settings import get_app_settings
+from coalescing.single_flight import get_single_flight
 from database_settings import engine
+from idempotency.idempotency_middleware import IdempotencyMiddleware
+from jobs.job_runner import get_job_runner
 from logger.logger import logger, logging_middleware
 from models.entities import Base
+from response_compression.compression_middleware import CompressionMiddleware
 from routers import (
     auth_router,
+    event_router,
+    job_router,
     item_category_router,
     role_router,
     stock_item_router,
     user_router,
 )
+from read_models.stock_item_read_model import get_stock_item_read_model
+from search.name_index import get_name_index
+from search.trigram_index import get_trigram_index
 
 app = FastAPI()
 logger.info("Starting application...")
@@ -19,6 +32,27 @@ logger.info("Starting application...")
 # Add middlewares
 app.middleware("http")(logging_middleware)
 
+# Replay responses of retried POST requests with an Idempotency-Key header
+app.add_middleware(
+    IdempotencyMiddleware,
+    paths=[
+        r"/api/v1/stock-items",
+        r"/api/v1/stock-items/\d+/adjust",
+        r"/api/v1/stock-items/import",
+    ],
+)
+
+app_settings = get_app_settings()
+# Reject unknown endpoints in the max page sizes before serving instead of on list requests
+app_settings.max_page_sizes
+
+# Cap in-flight requests per route group and shed the excess with 503
+if app_settings.admission_control_enabled:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        controller=get_admission_controller(),
+        retry_after=app_settings.admission_retry_after,
+    )
 
 # Configure CORS
 app.add_middleware(
@@ -29,11 +63,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Configure response compression
+if app_settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=app_settings.compression_minimum_size,
+        compression_level=app_settings.compression_level,
+        compress_streaming=app_settings.compression_streaming,
+    )
+
 Base.metadata.create_all(bind=engine)
 
 app_initializer = AppInitializer()
 app_initializer.initialize()
 
+# Resume background jobs left queued or interrupted by a previous process
+get_job_runner().resume_jobs()
+
+# Load the stock item and category names served by the suggest and search endpoints,
+# the trigram index takes longer and is loaded while the application starts serving
+get_name_index().load()
+get_trigram_index().load_in_background()
+if app_settings.stock_item_read_model_enabled:
+    get_stock_item_read_model().load_in_background()
+
 main_router = APIRouter(prefix="/api/v1")
 
 main_router.include_router(stock_item_router.router)
@@ -41,6 +94,8 @@ main_router.include_router(item_category_router.router)
 main_router.include_router(user_router.router)
 main_router.include_router(role_router.router)
 main_router.include_router(auth_router.router)
+main_router.include_router(event_router.router)
+main_router.include_router(job_router.router)
 
 app.include_router(main_router)
 
@@ -48,3 +103,15 @@ app.include_router(main_router)
 @app.get("/")
 async def root():
     return {"message": "App is running"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Export in-flight requests, queue depth and shed requests of each route group
+    and the executions saved by request coalescing in the Prometheus text format.
+    """
+    return (
+        get_admission_controller().format_metrics()
+        + get_single_flight().format_metrics()
+    )
@@ -4,9 +4,11 @@ from typing import List, Optional
 from sqlalchemy import (
     Boolean,
     DateTime,
+    Float,
     ForeignKeyConstraint,
     Index,
     Integer,
+    LargeBinary,
     String,
     Text,
 )
@@ -24,20 +26,25 @@ class ItemCategory(Base):
         name (str): Name of the category.
         creation_date (datetime): Date of creation.
         last_modification_date (datetime): Date of last modification.
+        version (int): Row version used for optimistic concurrency control.
         stock_item (List[StockItem]): List of stock items in this category.
     """
 
     __tablename__ = "item_category"
+    __table_args__ = (Index("ix_ItemCategory_name", "name"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(50))
     creation_date: Mapped[datetime.datetime] = mapped_column(DateTime)
     last_modification_date: Mapped[datetime.datetime] = mapped_column(DateTime)
+    version: Mapped[int] = mapped_column(Integer, server_default="1")
 
     stock_item: Mapped[List["StockItem"]] = relationship(
         "StockItem", back_populates="category"
     )
 
+    __mapper_args__ = {"version_id_col": version}
+
 
 class Role(Base):
     """
@@ -48,18 +55,23 @@ class Role(Base):
         name (str): Name of the role.
         creation_date (datetime): Date of creation.
         last_modification_date (datetime): Date of last modification.
+        version (int): Row version used for optimistic concurrency control.
         role_users (list[User]): Users assigned to this role.
     """
 
     __tablename__ = "role"
+    __table_args__ = (Index("ix_Role_name", "name"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(50))
     creation_date: Mapped[datetime.datetime] = mapped_column(DateTime)
     last_modification_date: Mapped[datetime.datetime] = mapped_column(DateTime)
+    version: Mapped[int] = mapped_column(Integer, server_default="1")
 
     role_users: Mapped[list["User"]] = relationship("User", back_populates="role")
 
+    __mapper_args__ = {"version_id_col": version}
+
 
 class User(Base):
     """
@@ -76,6 +88,7 @@ class User(Base):
         creation_date (datetime): Date of creation.
         last_modification_date (datetime): Date of last modification.
         role_id (int): Foreign key to Role.
+        version (int): Row version used for optimistic concurrency control.
         role (Role): Role relationship.
     """
 
@@ -83,6 +96,8 @@ class User(Base):
     __table_args__ = (
         ForeignKeyConstraint(["role_id"], ["role.id"], name="fk_User_Role_id"),
         Index("fk_User_Role_id", "role_id"),
+        Index("ix_User_user_name", "user_name"),
+        Index("ix_User_email", "email"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -95,8 +110,11 @@ class User(Base):
     creation_date: Mapped[datetime.datetime] = mapped_column(DateTime)
     last_modification_date: Mapped[datetime.datetime] = mapped_column(DateTime)
     role_id: Mapped[int] = mapped_column(Integer)
+    version: Mapped[int] = mapped_column(Integer, server_default="1")
     role: Mapped["Role"] = relationship("Role", back_populates="role_users")
 
+    __mapper_args__ = {"version_id_col": version}
+
 
 class StockItem(Base):
     """
@@ -106,10 +124,14 @@ class StockItem(Base):
         id (int): Primary key.
         name (str): Name of the item.
         quantity (int): Quantity in stock.
+        reorder_threshold (int): Quantity below which the item is low on stock, 0 for none.
         category_id (int): Foreign key to ItemCategory.
         creation_date (datetime): Date of creation.
         last_modification_date (datetime): Date of last modification.
-        description (Optional[str]): Description of the item.
+        description (Optional[str]): Description of the item, deferred until accessed.
+        version (int): Row version used for optimistic concurrency control.
+        movement_count (int): Number of stock movements of the item, spacing its balance snapshots.
+        change_sequence (int): Number of the last write to the item, ordering changes for sync.
         category (ItemCategory): Category relationship.
     """
 
@@ -119,16 +141,304 @@ class StockItem(Base):
             ["category_id"], ["item_category.id"], name="fk_StockItem_category_id"
         ),
         Index("fk_StockItem_category_id", "category_id"),
+        Index("ix_StockItem_last_modification_date_id", "last_modification_date", "id"),
+        Index("ix_StockItem_change_sequence_id", "change_sequence", "id"),
+        Index("ix_StockItem_name_category_id", "name", "category_id"),
+        Index("ix_StockItem_category_id_quantity", "category_id", "quantity"),
+        Index("ix_StockItem_quantity", "quantity"),
+        Index("ix_StockItem_creation_date", "creation_date"),
+        Index("ix_StockItem_name", "name"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(50))
     quantity: Mapped[int] = mapped_column(Integer)
+    reorder_threshold: Mapped[int] = mapped_column(Integer, server_default="0")
     category_id: Mapped[int] = mapped_column(Integer)
     creation_date: Mapped[datetime.datetime] = mapped_column(DateTime)
     last_modification_date: Mapped[datetime.datetime] = mapped_column(DateTime)
-    description: Mapped[Optional[str]] = mapped_column(Text)
+    description: Mapped[Optional[str]] = mapped_column(Text, deferred=True)
+    version: Mapped[int] = mapped_column(Integer, server_default="1")
+    movement_count: Mapped[int] = mapped_column(Integer, server_default="0")
+    change_sequence: Mapped[int] = mapped_column(Integer, server_default="0")
 
     category: Mapped["ItemCategory"] = relationship(
         "ItemCategory", back_populates="stock_item"
     )
+
+    __mapper_args__ = {"version_id_col": version}
+
+
+class CategoryStockSummary(Base):
+    """
+    Represents per-category stock totals, maintained incrementally by stock item writes.
+
+    Attributes:
+        category_id (int): Primary key and foreign key to ItemCategory.
+        item_count (int): Number of stock items in the category.
+        total_quantity (int): Sum of quantities of stock items in the category.
+        last_modification_date (datetime): Date of last modification.
+    """
+
+    __tablename__ = "category_stock_summary"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["category_id"],
+            ["item_category.id"],
+            name="fk_CategoryStockSummary_category_id",
+        ),
+    )
+
+    category_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    item_count: Mapped[int] = mapped_column(Integer, default=0)
+    total_quantity: Mapped[int] = mapped_column(Integer, default=0)
+    last_modification_date: Mapped[datetime.datetime] = mapped_column(DateTime)
+
+
+class LowStockItem(Base):
+    """
+    Represents a stock item whose quantity is below its reorder threshold, maintained
+    incrementally by stock item writes.
+
+    Attributes:
+        stock_item_id (int): Primary key and foreign key to StockItem.
+        low_since (datetime): Date the quantity fell below the reorder threshold.
+    """
+
+    __tablename__ = "low_stock_item"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["stock_item_id"],
+            ["stock_item.id"],
+            name="fk_LowStockItem_stock_item_id",
+        ),
+    )
+
+    stock_item_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    low_since: Mapped[datetime.datetime] = mapped_column(DateTime)
+
+
+class StockMovement(Base):
+    """
+    Represents an append-only record of a stock item quantity change.
+
+    Attributes:
+        id (int): Primary key.
+        stock_item_id (int): ID of the stock item, kept after the item is deleted.
+        delta (int): Quantity change, negative for stock going out.
+        reason (str): Reason of the change.
+        user_id (Optional[int]): ID of the user who made the change.
+        creation_date (datetime): Date of the change.
+    """
+
+    __tablename__ = "stock_movement"
+    __table_args__ = (
+        Index("ix_StockMovement_stock_item_id_id", "stock_item_id", "id"),
+        Index("ix_StockMovement_creation_date", "creation_date"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    stock_item_id: Mapped[int] = mapped_column(Integer)
+    delta: Mapped[int] = mapped_column(Integer)
+    reason: Mapped[str] = mapped_column(String(50))
+    user_id: Mapped[Optional[int]] = mapped_column(Integer)
+    creation_date: Mapped[datetime.datetime] = mapped_column(DateTime)
+
+
+class StockBalanceSnapshot(Base):
+    """
+    Represents the balance of a stock item after a given movement.
+    Written periodically so point-in-time balances never need a full history scan.
+
+    Attributes:
+        id (int): Primary key.
+        stock_item_id (int): ID of the stock item.
+        movement_id (int): ID of the last movement included in the balance.
+        balance (int): Quantity in stock after that movement.
+        snapshot_date (datetime): Date of that movement.
+    """
+
+    __tablename__ = "stock_balance_snapshot"
+    __table_args__ = (
+        Index(
+            "ix_StockBalanceSnapshot_stock_item_id_snapshot_date",
+            "stock_item_id",
+            "snapshot_date",
+        ),
+        Index(
+            "ix_StockBalanceSnapshot_stock_item_id_movement_id",
+            "stock_item_id",
+            "movement_id",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    stock_item_id: Mapped[int] = mapped_column(Integer)
+    movement_id: Mapped[int] = mapped_column(Integer)
+    balance: Mapped[int] = mapped_column(Integer)
+    snapshot_date: Mapped[datetime.datetime] = mapped_column(DateTime)
+
+
+class StockForecast(Base):
+    """
+    Represents the consumption forecast of a stock item, computed in batch from its
+    stock movements by the compute_stock_forecasts job.
+
+    Attributes:
+        stock_item_id (int): Primary key, ID of the stock item.
+        short_term_daily_consumption (float): Mean daily consumption over the short window.
+        long_term_daily_consumption (float): Mean daily consumption over the long window.
+        days_until_stockout (Optional[float]): Days until the quantity runs out at the
+            higher of both rates, None without consumption.
+        suggested_reorder_quantity (int): Quantity to reorder to cover the lead time and
+            the coverage period at the higher of both rates.
+        movement_id (int): ID of the last stock movement recorded when computed.
+        computation_date (datetime): Date of computation.
+    """
+
+    __tablename__ = "stock_forecast"
+
+    stock_item_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    short_term_daily_consumption: Mapped[float] = mapped_column(Float)
+    long_term_daily_consumption: Mapped[float] = mapped_column(Float)
+    days_until_stockout: Mapped[Optional[float]] = mapped_column(Float)
+    suggested_reorder_quantity: Mapped[int] = mapped_column(Integer)
+    movement_id: Mapped[int] = mapped_column(Integer)
+    computation_date: Mapped[datetime.datetime] = mapped_column(DateTime)
+
+
+class StockForecastRun(Base):
+    """
+    Represents a completed computation of stock forecasts, the next run recomputes
+    stock items with movements after the latest one.
+
+    Attributes:
+        id (int): Primary key.
+        movement_id (int): ID of the last stock movement recorded when the run started.
+        full (bool): Whether every stock item was recomputed.
+        computed (int): Number of computed forecasts.
+        computation_date (datetime): Date the run started.
+    """
+
+    __tablename__ = "stock_forecast_run"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    movement_id: Mapped[int] = mapped_column(Integer)
+    full: Mapped[bool] = mapped_column(Boolean)
+    computed: Mapped[int] = mapped_column(Integer)
+    computation_date: Mapped[datetime.datetime] = mapped_column(DateTime)
+
+
+class StockItemTombstone(Base):
+    """
+    Represents a deleted stock item, so mirroring clients can learn about deletions.
+
+    Attributes:
+        id (int): Primary key, increasing with every deletion.
+        stock_item_id (int): ID of the deleted stock item.
+        deletion_date (datetime): Date of deletion.
+        change_sequence (int): Number of the write that deleted the item, ordering changes for sync.
+    """
+
+    __tablename__ = "stock_item_tombstone"
+    __table_args__ = (
+        Index("ix_StockItemTombstone_change_sequence_id", "change_sequence", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    stock_item_id: Mapped[int] = mapped_column(Integer)
+    deletion_date: Mapped[datetime.datetime] = mapped_column(DateTime)
+    change_sequence: Mapped[int] = mapped_column(Integer, server_default="0")
+
+
+class StockItemChangeSequence(Base):
+    """
+    Represents the counter numbering stock item writes in commit order. The single row is
+    locked by every numbered write until it commits, so a higher number is never visible
+    before a lower one.
+
+    Attributes:
+        id (int): Primary key, always 1.
+        value (int): Number of the last write.
+    """
+
+    __tablename__ = "stock_item_change_sequence"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    value: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class IdempotencyKey(Base):
+    """
+    Represents a request made with an Idempotency-Key header and its stored response.
+    A row without a status code is a reservation of a request that is still running,
+    renewed by it until the response is stored.
+
+    Attributes:
+        user_id (int): ID of the user who made the request, part of the primary key.
+        key (str): Value of the Idempotency-Key header, part of the primary key.
+        request_hash (str): SHA-256 of the method, path and body of the request.
+        status_code (Optional[int]): Status code of the stored response.
+        headers (Optional[str]): JSON encoded headers of the stored response.
+        body (Optional[bytes]): Body of the stored response.
+        creation_date (datetime): Date of the first request.
+        expiration_date (datetime): Date after which the key can be reused, or a reservation
+            not renewed until then taken over.
+    """
+
+    __tablename__ = "idempotency_key"
+    __table_args__ = (Index("ix_IdempotencyKey_expiration_date", "expiration_date"),)
+
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    request_hash: Mapped[str] = mapped_column(String(64))
+    status_code: Mapped[Optional[int]] = mapped_column(Integer)
+    headers: Mapped[Optional[str]] = mapped_column(Text)
+    body: Mapped[Optional[bytes]] = mapped_column(LargeBinary(length=2**24))
+    creation_date: Mapped[datetime.datetime] = mapped_column(DateTime)
+    expiration_date: Mapped[datetime.datetime] = mapped_column(DateTime)
+
+
+class Job(Base):
+    """
+    Represents a background job run outside of the request that created it.
+
+    Attributes:
+        id (int): Primary key.
+        job_type (str): Name of the job handler.
+        status (str): One of queued, running, succeeded, failed or cancelled.
+        parameters (str): JSON encoded parameters of the handler.
+        result (Optional[str]): JSON encoded result of a succeeded job.
+        error (Optional[str]): Error of the last failed attempt.
+        progress_current (int): Number of processed units of work.
+        progress_total (Optional[int]): Total number of units of work, if known.
+        attempts (int): Number of started attempts.
+        max_attempts (int): Number of attempts before the job is marked as failed.
+        cancel_requested (bool): Whether cancellation of a running job was requested.
+        user_id (Optional[int]): ID of the user who created the job.
+        creation_date (datetime): Date of creation.
+        start_date (Optional[datetime]): Start date of the last attempt.
+        finish_date (Optional[datetime]): Date the job succeeded, failed or was cancelled.
+        last_modification_date (datetime): Date of the last status or progress change, or
+            of the last heartbeat of a running job.
+    """
+
+    __tablename__ = "job"
+    __table_args__ = (Index("ix_Job_status", "status"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    job_type: Mapped[str] = mapped_column(String(50))
+    status: Mapped[str] = mapped_column(String(20))
+    parameters: Mapped[str] = mapped_column(Text)
+    result: Mapped[Optional[str]] = mapped_column(Text)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    progress_current: Mapped[int] = mapped_column(Integer, default=0)
+    progress_total: Mapped[Optional[int]] = mapped_column(Integer)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=1)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, default=False)
+    user_id: Mapped[Optional[int]] = mapped_column(Integer)
+    creation_date: Mapped[datetime.datetime] = mapped_column(DateTime)
+    start_date: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime)
+    finish_date: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime)
+    last_modification_date: Mapped[datetime.datetime] = mapped_column(DateTime)
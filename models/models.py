@@ -1,8 +1,18 @@
+import json
 from datetime import datetime
 from enum import Enum
-from typing import Generic, List, Optional, TypeVar
-
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Any, ClassVar, Dict, Generic, List, Optional, TypeVar
+from zoneinfo import ZoneInfo
+
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+    field_validator,
+    model_validator,
+)
+from sqlalchemy import select
 
 from models.entities import ItemCategory, Role, StockItem, User
 
@@ -35,6 +45,7 @@ class ReadStockItemDto(BaseModel):
         name (str): Name of the stock item.
         description (Optional[str]): Description of the stock item.
         quantity (int): Quantity in stock.
+        reorder_threshold (int): Quantity below which the item is low on stock, 0 for none.
         creation_date (datetime): Date the item was created.
         last_modification_date (datetime): Date the item was last modified.
         category (ReadItemCategoryDto): Category of the stock item.
@@ -46,11 +57,59 @@ class ReadStockItemDto(BaseModel):
     name: str
     description: Optional[str] = None
     quantity: int
+    reorder_threshold: int
     creation_date: datetime
     last_modification_date: datetime
     category: ReadItemCategoryDto
 
 
+class ReadStockItemListDto(BaseModel):
+    """
+    Data transfer object for reading stock items on list endpoints.
+    Only the fields requested with the fields query parameter are returned.
+
+    Attributes:
+        id (int): Unique identifier of the stock item.
+        name (Optional[str]): Name of the stock item.
+        description (Optional[str]): Description of the stock item.
+        quantity (Optional[int]): Quantity in stock.
+        reorder_threshold (Optional[int]): Quantity below which the item is low on stock.
+        creation_date (Optional[datetime]): Date the item was created.
+        last_modification_date (Optional[datetime]): Date the item was last modified.
+        category (Optional[ReadItemCategoryDto]): Category of the stock item.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: Optional[str] = None
+    description: Optional[str] = None
+    quantity: Optional[int] = None
+    reorder_threshold: Optional[int] = None
+    creation_date: Optional[datetime] = None
+    last_modification_date: Optional[datetime] = None
+    category: Optional[ReadItemCategoryDto] = None
+
+
+class ReadCategoryStockSummaryDto(BaseModel):
+    """
+    Data transfer object for reading per-category stock totals.
+
+    Attributes:
+        category_id (int): Unique identifier of the category.
+        category_name (str): Name of the category.
+        item_count (int): Number of stock items in the category.
+        total_quantity (int): Sum of quantities of stock items in the category.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    category_id: int
+    category_name: str
+    item_count: int
+    total_quantity: int
+
+
 class CreateItemCategoryDto(BaseModel):
     """
     Data transfer object for creating a new item category.
@@ -85,6 +144,8 @@ class CreateStockItemDto(BaseModel):
         name (str): Name of the stock item.
         description (Optional[str]): Description of the stock item.
         quantity (int): Quantity in stock.
+        reorder_threshold (int): Quantity below which the item is low on stock
+            (default: 0, never low).
         category_id (int): ID of the category the item belongs to.
     """
 
@@ -93,6 +154,7 @@ class CreateStockItemDto(BaseModel):
     name: str = Field(..., min_length=1, max_length=50)
     description: Optional[str] = None
     quantity: int = Field(..., gt=0)
+    reorder_threshold: int = Field(0, ge=0)
     category_id: int = Field(..., gt=0)
 
 
@@ -104,6 +166,7 @@ class UpdateStockItemDto(BaseModel):
         name (Optional[str]): New name for the stock item.
         description (Optional[str]): New description.
         quantity (Optional[int]): New quantity.
+        reorder_threshold (Optional[int]): New reorder threshold, 0 to never be low.
         category_id (Optional[int]): New category ID.
     """
 
@@ -112,9 +175,461 @@ class UpdateStockItemDto(BaseModel):
     name: str | None = Field(None, max_length=50)
     description: Optional[str] = None
     quantity: int | None = Field(None, gt=0)
+    reorder_threshold: int | None = Field(None, ge=0)
     category_id: int | None = Field(None, gt=0)
 
 
+class AdjustStockItemQuantityDto(BaseModel):
+    """
+    Data transfer object for adjusting the quantity of a stock item by a delta.
+
+    Attributes:
+        delta (int): Quantity change, negative for stock going out.
+        reason (str): Reason of the change.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    delta: int
+    reason: str = Field(..., min_length=1, max_length=50)
+
+    @field_validator("delta")
+    def validate_delta(cls, value):
+        if value == 0:
+            raise ValueError("Delta must not be zero.")
+        return value
+
+
+class ReadStockMovementDto(BaseModel):
+    """
+    Data transfer object for reading stock movement information.
+
+    Attributes:
+        id (int): Unique identifier of the movement.
+        stock_item_id (int): ID of the stock item.
+        delta (int): Quantity change.
+        reason (str): Reason of the change.
+        user_id (Optional[int]): ID of the user who made the change.
+        creation_date (datetime): Date of the change.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    stock_item_id: int
+    delta: int
+    reason: str
+    user_id: Optional[int] = None
+    creation_date: datetime
+
+
+class StockMovementPageDto(BaseModel):
+    """
+    Data transfer object for a keyset paginated page of stock movements, newest first.
+
+    Attributes:
+        data (List[ReadStockMovementDto]): Movements on the current page.
+        next_before_id (Optional[int]): Cursor for the next page, None on the last page.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    data: List[ReadStockMovementDto]
+    next_before_id: Optional[int] = None
+
+
+class ReadLowStockItemDto(BaseModel):
+    """
+    Data transfer object for reading a stock item low on stock.
+
+    Attributes:
+        stock_item_id (int): ID of the stock item.
+        name (str): Name of the stock item.
+        category_id (int): ID of the category of the stock item.
+        quantity (int): Quantity in stock.
+        reorder_threshold (int): Quantity below which the item is low on stock.
+        low_since (datetime): Date the quantity fell below the reorder threshold.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    stock_item_id: int
+    name: str
+    category_id: int
+    quantity: int
+    reorder_threshold: int
+    low_since: datetime
+
+
+class LowStockPageDto(BaseModel):
+    """
+    Data transfer object for a keyset paginated page of stock items low on stock,
+    ordered by stock item ID.
+
+    Attributes:
+        data (List[ReadLowStockItemDto]): Stock items on the current page.
+        next_after_id (Optional[int]): Cursor for the next page, None on the last page.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    data: List[ReadLowStockItemDto]
+    next_after_id: Optional[int] = None
+
+
+class ReadStockForecastDto(BaseModel):
+    """
+    Data transfer object for reading the consumption forecast of a stock item.
+
+    Attributes:
+        stock_item_id (int): ID of the stock item.
+        short_term_daily_consumption (float): Mean daily consumption over the short window.
+        long_term_daily_consumption (float): Mean daily consumption over the long window.
+        days_until_stockout (Optional[float]): Days until the quantity runs out, None
+            without consumption.
+        suggested_reorder_quantity (int): Quantity to reorder to cover the lead time and
+            the coverage period.
+        computation_date (datetime): Date the forecast was computed.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    stock_item_id: int
+    short_term_daily_consumption: float
+    long_term_daily_consumption: float
+    days_until_stockout: Optional[float] = None
+    suggested_reorder_quantity: int
+    computation_date: datetime
+
+
+class StockBalanceDto(BaseModel):
+    """
+    Data transfer object for the balance of a stock item at a point in time.
+
+    Attributes:
+        stock_item_id (int): ID of the stock item.
+        at (datetime): Point in time of the balance.
+        balance (int): Quantity in stock at that time.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    stock_item_id: int
+    at: datetime
+    balance: int
+
+
+class StockItemBatchDto(BaseModel):
+    """
+    Data transfer object for fetching several stock items by ID.
+    IDs may also be given as a comma separated string, e.g. "3,1,2".
+
+    Attributes:
+        ids (List[int]): IDs of the stock items, in the order they are returned.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    ids: List[int] = Field(min_length=1)
+
+    @field_validator("ids", mode="before")
+    def split_ids(cls, value):
+        if isinstance(value, str):
+            return value.split(",")
+        if isinstance(value, list):
+            return [
+                part
+                for item in value
+                for part in (item.split(",") if isinstance(item, str) else [item])
+            ]
+        return value
+
+    @field_validator("ids")
+    def validate_ids(cls, value):
+        if any(stock_item_id <= 0 for stock_item_id in value):
+            raise ValueError("IDs must be positive integers.")
+        return value
+
+
+class StockItemBatchResultDto(BaseModel):
+    """
+    Data transfer object for stock items fetched by ID.
+
+    Attributes:
+        data (List[ReadStockItemDto]): Found stock items, in the requested order.
+        missing_ids (List[int]): Requested IDs without a stock item.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    data: List[ReadStockItemDto]
+    missing_ids: List[int]
+
+
+class NameSuggestionDto(BaseModel):
+    """
+    Data transfer object for a stock item or item category name suggestion.
+
+    Attributes:
+        type (str): "stock_item" or "category".
+        id (int): ID of the stock item or category.
+        name (str): The name.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    type: str
+    id: int
+    name: str
+
+
+class NameSuggestionListDto(BaseModel):
+    """
+    Data transfer object for name suggestions.
+
+    Attributes:
+        data (List[NameSuggestionDto]): Names starting with the prefix, in alphabetical order.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    data: List[NameSuggestionDto]
+
+
+class StockItemMatchDto(BaseModel):
+    """
+    Data transfer object for a stock item found by fuzzy search.
+
+    Attributes:
+        id (int): ID of the stock item.
+        name (str): Name of the stock item.
+        similarity (float): Trigram similarity of the name to the searched name, 0 to 1.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    similarity: float
+
+
+class StockItemMatchListDto(BaseModel):
+    """
+    Data transfer object for the results of a fuzzy search.
+
+    Attributes:
+        data (List[StockItemMatchDto]): Matching stock items, most similar first.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    data: List[StockItemMatchDto]
+
+
+class QuantityBucketDto(BaseModel):
+    """
+    Data transfer object for the number of stock items in a range of quantities.
+
+    Attributes:
+        min_quantity (int): Lowest quantity of the range.
+        max_quantity (Optional[int]): Highest quantity of the range, None if unbounded.
+        item_count (int): Number of stock items with a quantity in the range.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    min_quantity: int
+    max_quantity: Optional[int]
+    item_count: int
+
+
+class QuantityStatisticsDto(BaseModel):
+    """
+    Data transfer object for statistics of stock item quantities.
+
+    Attributes:
+        item_count (int): Number of stock items.
+        total_quantity (int): Sum of quantities of the stock items.
+        zero_stock_count (int): Number of stock items with quantity 0.
+        min_quantity (Optional[int]): Lowest quantity, None if there are no stock items.
+        max_quantity (Optional[int]): Highest quantity, None if there are no stock items.
+        mean_quantity (Optional[float]): Mean quantity, None if there are no stock items.
+        percentiles (Dict[str, float]): Quantity percentiles by name, e.g. "p50" for the
+            median, linearly interpolated. Empty if there are no stock items.
+        distribution (List[QuantityBucketDto]): Number of stock items per range of quantities.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    item_count: int
+    total_quantity: int
+    zero_stock_count: int
+    min_quantity: Optional[int]
+    max_quantity: Optional[int]
+    mean_quantity: Optional[float]
+    percentiles: Dict[str, float]
+    distribution: List[QuantityBucketDto]
+
+
+class CategoryQuantityStatisticsDto(QuantityStatisticsDto):
+    """
+    Data transfer object for statistics of the stock item quantities of a category.
+
+    Attributes:
+        category_id (int): Unique identifier of the category.
+        category_name (str): Name of the category.
+    """
+
+    category_id: int
+    category_name: str
+
+
+class StockItemAnalyticsDto(BaseModel):
+    """
+    Data transfer object for the inventory analytics.
+
+    Attributes:
+        total (QuantityStatisticsDto): Statistics of all analysed stock items.
+        categories (List[CategoryQuantityStatisticsDto]): Statistics per category,
+            ordered by category ID.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    total: QuantityStatisticsDto
+    categories: List[CategoryQuantityStatisticsDto]
+
+
+class StockItemImportErrorDto(BaseModel):
+    """
+    Data transfer object for the errors of a rejected import row.
+
+    Attributes:
+        row (int): Line of the row in the CSV file, the header is line 1.
+        errors (List[str]): Reasons the row was rejected.
+    """
+
+    row: int
+    errors: List[str]
+
+
+class StockItemImportReportDto(BaseModel):
+    """
+    Data transfer object for the result of a stock item import.
+
+    Attributes:
+        total_rows (int): Number of processed rows.
+        imported (int): Number of imported stock items.
+        failed (int): Number of rejected rows.
+        errors (List[StockItemImportErrorDto]): Errors of rejected rows, possibly truncated.
+    """
+
+    total_rows: int
+    imported: int
+    failed: int
+    errors: List[StockItemImportErrorDto]
+
+
+class JobStatus(str, Enum):
+    """
+    Enumeration for background job status values.
+
+    Values:
+        queued: Waiting for a worker.
+        running: Being run by a worker.
+        succeeded: Finished with a result.
+        failed: Failed on its last attempt.
+        cancelled: Cancelled before it finished.
+    """
+
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+    cancelled = "cancelled"
+
+
+class CreateJobDto(BaseModel):
+    """
+    Data transfer object for creating a background job.
+
+    Attributes:
+        job_type (str): Name of the job handler.
+        parameters (Dict[str, Any]): Parameters of the handler.
+        max_attempts (int): Number of attempts before the job is marked as failed (1-10).
+    """
+
+    job_type: str = Field(min_length=1, max_length=50)
+    parameters: Dict[str, Any] = Field(default_factory=dict)
+    max_attempts: int = Field(1, ge=1, le=10)
+
+
+class ReadJobDto(BaseModel):
+    """
+    Data transfer object for reading background job data.
+
+    Attributes:
+        id (int): Job ID.
+        job_type (str): Name of the job handler.
+        status (JobStatus): Status of the job.
+        parameters (Dict[str, Any]): Parameters of the handler.
+        result (Optional[Any]): Result of a succeeded job.
+        error (Optional[str]): Error of the last failed attempt.
+        progress_current (int): Number of processed units of work.
+        progress_total (Optional[int]): Total number of units of work, if known.
+        attempts (int): Number of started attempts.
+        max_attempts (int): Number of attempts before the job is marked as failed.
+        cancel_requested (bool): Whether cancellation was requested.
+        user_id (Optional[int]): ID of the user who created the job.
+        creation_date (datetime): Date of creation.
+        start_date (Optional[datetime]): Start date of the last attempt.
+        finish_date (Optional[datetime]): Date the job finished.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    job_type: str
+    status: JobStatus
+    parameters: Dict[str, Any]
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    progress_current: int
+    progress_total: Optional[int] = None
+    attempts: int
+    max_attempts: int
+    cancel_requested: bool
+    user_id: Optional[int] = None
+    creation_date: datetime
+    start_date: Optional[datetime] = None
+    finish_date: Optional[datetime] = None
+
+    @field_validator("parameters", "result", mode="before")
+    def decode_json(cls, value):
+        if isinstance(value, str):
+            return json.loads(value)
+        return value
+
+
+class StockItemChangesDto(BaseModel):
+    """
+    Data transfer object for stock items changed since a sync token.
+
+    Attributes:
+        changed (List[ReadStockItemDto]): Stock items created or modified since the token.
+        deleted (List[int]): IDs of stock items deleted since the token.
+        next_since (str): Token to pass as `since` in the next request.
+        has_more (bool): Whether more changes are available right away.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    changed: List[ReadStockItemDto]
+    deleted: List[int]
+    next_since: str
+    has_more: bool
+
+
 class ReadRoleDto(BaseModel):
     """
     Data transfer object for reading role information.
@@ -322,17 +837,144 @@ class BaseQuery(BaseModel):
     Attributes:
         page (int): The current page number (default: 1).
         page_size (int): The number of items per page (default: 10).
-        sort_by (Optional[str]): Field to sort by.
-        sort_direction (SortDirection): Sorting direction (asc or desc).
+        sort (Optional[str]): Comma separated fields to sort by, each descending when
+            prefixed with "-", e.g. "category_id,quantity" or "-last_modification_date".
+        sort_by (Optional[str]): Field to sort by, used when sort is not given.
+        sort_direction (SortDirection): Sorting direction of sort_by (asc or desc).
+
+    Sorts must be a leading part of one of SORT_KEYS, or one of UNINDEXED_SORTS alone,
+    kept from before the indexed sorts. id is always appended as the last sort field in
+    the direction of the one before it, so pages are stable. Sorts in one direction on
+    a leading part of SORT_KEYS are read in index order, mixed directions and
+    UNINDEXED_SORTS are sorted by the database and cost more.
+
+    estimate_cost estimates the rows a list query reads, list endpoints reject
+    queries whose estimate is over QUERY_COST_BUDGET.
     """
 
     model_config = ConfigDict(from_attributes=True)
 
+    # Sortable fields and their columns, including "id", and the indexed field
+    # sequences, defined by the query models of each entity
+    SORT_COLUMNS: ClassVar[dict] = {}
+    SORT_KEYS: ClassVar[tuple[tuple[str, ...], ...]] = ()
+    # Sortable fields no index serves, accepted only as the single sort field
+    UNINDEXED_SORTS: ClassVar[tuple[str, ...]] = ()
+    # Fields filtered by a substring match, which no index can serve
+    SUBSTRING_FILTERS: ClassVar[tuple[str, ...]] = ()
+    # Rows read per returned row for every condition not served by the read index
+    SCAN_COST_FACTOR: ClassVar[int] = 10
+
     page: int = Field(1, gt=0)
     page_size: int = Field(10, gt=0)
+    sort: Optional[str] = Field(None, max_length=255)
     sort_by: Optional[str] = Field(None, max_length=50)
     sort_direction: SortDirection = Field(SortDirection.asc)
 
+    @property
+    def sort_terms(self) -> list[tuple[str, bool]]:
+        """
+        Returns the requested sort fields with whether each is descending.
+        Returns:
+            list[tuple[str, bool]]: Field names and descending flags.
+        """
+        if self.sort:
+            return [
+                (term.strip().removeprefix("-"), term.strip().startswith("-"))
+                for term in self.sort.split(",")
+                if term.strip()
+            ]
+        if self.sort_by:
+            return [(self.sort_by, self.sort_direction == SortDirection.desc)]
+        return self.default_sort_terms
+
+    @property
+    def default_sort_terms(self) -> list[tuple[str, bool]]:
+        """
+        Returns the sort used when none is requested, by id only by default.
+        Returns:
+            list[tuple[str, bool]]: Field names and descending flags.
+        """
+        return []
+
+    @property
+    def sorted_by_index(self) -> bool:
+        """
+        Returns whether the requested sort is a leading part of one of SORT_KEYS in one
+        direction, so rows are read in index order without being sorted.
+        Returns:
+            bool: True if the sort is served by an index.
+        """
+        terms = self.sort_terms
+        fields = tuple(field for field, _ in terms if field != "id")
+        return len({descending for _, descending in terms}) <= 1 and (
+            not fields or any(key[: len(fields)] == fields for key in self.SORT_KEYS)
+        )
+
+    @model_validator(mode="after")
+    def validate_sort(self):
+        terms = self.sort_terms
+        for field, _ in terms:
+            if field not in self.SORT_COLUMNS:
+                raise ValueError(
+                    f"Cannot sort by '{field}', allowed fields are: {', '.join(self.SORT_COLUMNS)}."
+                )
+        fields = tuple(field for field, _ in terms)
+        if fields and fields[-1] == "id":
+            fields = fields[:-1]
+        if any(field in self.UNINDEXED_SORTS for field in fields):
+            if len(fields) > 1:
+                raise ValueError(
+                    f"Sorting by {', '.join(self.UNINDEXED_SORTS)} is only supported "
+                    f"as the single sort field."
+                )
+        elif fields and not any(key[: len(fields)] == fields for key in self.SORT_KEYS):
+            raise ValueError(
+                f"Sorting by {','.join(fields)} is not supported, allowed sorts are: "
+                f"{'; '.join(','.join(key) for key in self.SORT_KEYS)} "
+                f"or a leading part of them."
+            )
+        return self
+
+    @property
+    def order_by(self) -> list:
+        """
+        Constructs the SQLAlchemy order by clauses of the requested sort, ending with id.
+        Returns:
+            list: List of order by clauses.
+        """
+        terms = self.sort_terms
+        descending = terms[-1][1] if terms else False
+        order_by = [
+            self.SORT_COLUMNS[field].desc() if desc else self.SORT_COLUMNS[field].asc()
+            for field, desc in terms
+            if field != "id"
+        ]
+        id_column = self.SORT_COLUMNS["id"]
+        order_by.append(id_column.desc() if descending else id_column.asc())
+        return order_by
+
+    def estimate_cost(self) -> int:
+        """
+        Estimates the number of rows read to return the requested page. The rows of
+        the previous pages are read and skipped, every substring filter and a sort
+        differing from the order of a range filter reject rows of the read index, and a
+        sort no index serves sorts them, each multiplying the rows read by
+        SCAN_COST_FACTOR.
+        Returns:
+            int: The estimated number of rows read.
+        """
+        conditions = sum(
+            1 for field in self.SUBSTRING_FILTERS if getattr(self, field) is not None
+        )
+        default_fields = [field for field, _ in self.default_sort_terms]
+        sort_fields = [field for field, _ in self.sort_terms if field != "id"]
+        if not self.sorted_by_index or (
+            default_fields and sort_fields != default_fields
+        ):
+            conditions += 1
+        return self.page * self.page_size * self.SCAN_COST_FACTOR**conditions
+
 
 class UserFilterQuery(BaseQuery):
     """
@@ -341,6 +983,7 @@ class UserFilterQuery(BaseQuery):
     Inherits pagination and sorting parameters from BaseQuery:
         page (int): The current page number (default: 1).
         page_size (int): The number of items per page (default: 10).
+        sort (Optional[str]): Comma separated fields to sort by, "-" prefixed for descending.
         sort_by (Optional[str]): Field to sort by.
         sort_direction (SortDirection): Sorting direction (asc or desc).
 
@@ -351,10 +994,36 @@ class UserFilterQuery(BaseQuery):
         email (Optional[str]): Filter by email.
         is_active (Optional[bool]): Filter by active status.
         role_name (Optional[str]): Filter by role name.
+
+    role_name is filtered on the indexed role_id with the IDs of the matching roles,
+    set by resolve_role_name, or else selected by an uncorrelated subquery.
     """
 
     model_config = ConfigDict(from_attributes=True)
 
+    SORT_COLUMNS: ClassVar[dict] = {
+        "id": User.id,
+        "user_name": User.user_name,
+        "email": User.email,
+        "role_id": User.role_id,
+        "role": select(Role.name)
+        .where(Role.id == User.role_id)
+        .correlate_except(Role)
+        .scalar_subquery(),
+    }
+    SORT_KEYS: ClassVar[tuple[tuple[str, ...], ...]] = (
+        ("user_name",),
+        ("email",),
+        ("role_id",),
+    )
+    UNINDEXED_SORTS: ClassVar[tuple[str, ...]] = ("role",)
+    SUBSTRING_FILTERS: ClassVar[tuple[str, ...]] = (
+        "user_name",
+        "first_name",
+        "last_name",
+        "email",
+    )
+
     user_name: Optional[str] = Field(None, max_length=50)
     first_name: Optional[str] = Field(None, max_length=50)
     last_name: Optional[str] = Field(None, max_length=50)
@@ -362,6 +1031,16 @@ class UserFilterQuery(BaseQuery):
     is_active: Optional[bool] = None
     role_name: Optional[str] = Field(None, max_length=50)
 
+    _role_ids: Optional[list[int]] = PrivateAttr(None)
+
+    def resolve_role_name(self, role_ids: list[int]):
+        """
+        Sets the IDs of the roles whose name contains role_name.
+        Args:
+            role_ids (list[int]): IDs of the matching roles.
+        """
+        self._role_ids = role_ids
+
     @property
     def filter_list(self):
         """
@@ -381,10 +1060,28 @@ class UserFilterQuery(BaseQuery):
         if self.is_active is not None:
             filter_list.append(User.is_active == self.is_active)
         if self.role_name:
-            filter_list.append(User.role.has(Role.name.like(f"%{self.role_name}%")))
+            role_ids = self._role_ids
+            if role_ids is None:
+                role_ids = select(Role.id).where(Role.name.like(f"%{self.role_name}%"))
+            filter_list.append(User.role_id.in_(role_ids))
         return filter_list
 
 
+STOCK_ITEM_FIELDS = (
+    "id",
+    "name",
+    "description",
+    "quantity",
+    "reorder_threshold",
+    "creation_date",
+    "last_modification_date",
+    "category",
+)
+DEFAULT_STOCK_ITEM_LIST_FIELDS = tuple(
+    field for field in STOCK_ITEM_FIELDS if field != "description"
+)
+
+
 class StockItemQuery(BaseQuery):
     """
     Query model for filtering stock items with various criteria.
@@ -392,6 +1089,7 @@ class StockItemQuery(BaseQuery):
     Inherits pagination and sorting parameters from BaseQuery:
         page (int): The current page number (default: 1).
         page_size (int): The number of items per page (default: 10).
+        sort (Optional[str]): Comma separated fields to sort by, "-" prefixed for descending.
         sort_by (Optional[str]): Field to sort by.
         sort_direction (SortDirection): Sorting direction (asc or desc).
 
@@ -399,15 +1097,106 @@ class StockItemQuery(BaseQuery):
         name (Optional[str]): Filter by item name.
         description (Optional[str]): Filter by description.
         quantity (Optional[int]): Filter by quantity.
+        quantity_min (Optional[int]): Filter by quantity greater than or equal to the value.
+        quantity_max (Optional[int]): Filter by quantity less than or equal to the value.
+        category_id (Optional[int]): Filter by category ID.
         category_name (Optional[str]): Filter by category name.
+        created_after (Optional[datetime]): Filter by creation date at or after the value.
+        created_before (Optional[datetime]): Filter by creation date before the value.
+        modified_after (Optional[datetime]): Filter by last modification date at or after the value.
+        modified_before (Optional[datetime]): Filter by last modification date before the value.
+        fields (Optional[str]): Comma separated list of fields to return,
+            description is left out unless requested.
+
+    Dates without a time zone are taken as Europe/Warsaw times, like the stored dates.
+    category_name is filtered on the indexed category_id with the IDs of the matching
+    categories, set by resolve_category_name, or else selected by an uncorrelated subquery.
+    Without a requested sort, items filtered by a range are sorted by the ranged field,
+    so the page is read from the index of the range instead of the primary key.
     """
 
     model_config = ConfigDict(from_attributes=True)
 
+    SORT_COLUMNS: ClassVar[dict] = {
+        "id": StockItem.id,
+        "name": StockItem.name,
+        "quantity": StockItem.quantity,
+        "category_id": StockItem.category_id,
+        "creation_date": StockItem.creation_date,
+        "last_modification_date": StockItem.last_modification_date,
+        "category": select(ItemCategory.name)
+        .where(ItemCategory.id == StockItem.category_id)
+        .correlate_except(ItemCategory)
+        .scalar_subquery(),
+    }
+    SORT_KEYS: ClassVar[tuple[tuple[str, ...], ...]] = (
+        ("name",),
+        ("quantity",),
+        ("category_id", "quantity"),
+        ("creation_date",),
+        ("last_modification_date",),
+    )
+    UNINDEXED_SORTS: ClassVar[tuple[str, ...]] = ("category",)
+    SUBSTRING_FILTERS: ClassVar[tuple[str, ...]] = (
+        "name",
+        "description",
+    )
+
     name: Optional[str] = Field(None, max_length=50)
     description: Optional[str] = Field(None, max_length=255)
     quantity: Optional[int] = None
+    quantity_min: Optional[int] = Field(None, ge=0)
+    quantity_max: Optional[int] = Field(None, ge=0)
+    category_id: Optional[int] = Field(None, gt=0)
     category_name: Optional[str] = Field(None, max_length=50)
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    modified_after: Optional[datetime] = None
+    modified_before: Optional[datetime] = None
+    fields: Optional[str] = Field(None, max_length=255)
+
+    _category_ids: Optional[list[int]] = PrivateAttr(None)
+
+    def resolve_category_name(self, category_ids: list[int]):
+        """
+        Sets the IDs of the categories whose name contains category_name.
+        Args:
+            category_ids (list[int]): IDs of the matching categories.
+        """
+        self._category_ids = category_ids
+
+    @property
+    def resolved_category_ids(self) -> Optional[list[int]]:
+        """
+        Returns the IDs set by resolve_category_name, None if not resolved.
+        Returns:
+            Optional[list[int]]: IDs of the categories matching category_name.
+        """
+        return self._category_ids
+
+    @field_validator("fields", mode="before")
+    def validate_fields(cls, value):
+        if value is None or value == "":
+            return None
+        for field in value.split(","):
+            if field.strip() not in STOCK_ITEM_FIELDS:
+                raise ValueError(
+                    f"Unknown field '{field.strip()}', allowed fields are: {', '.join(STOCK_ITEM_FIELDS)}."
+                )
+        return value
+
+    @property
+    def selected_fields(self):
+        """
+        Returns the fields to return on list responses, in DTO order, always including id.
+        Returns:
+            tuple: Selected field names.
+        """
+        if self.fields is None:
+            return DEFAULT_STOCK_ITEM_LIST_FIELDS
+        requested = {field.strip() for field in self.fields.split(",")}
+        requested.add("id")
+        return tuple(field for field in STOCK_ITEM_FIELDS if field in requested)
 
     @field_validator("quantity", mode="before")
     def validate_quantity(cls, value):
@@ -421,6 +1210,48 @@ class StockItemQuery(BaseQuery):
         except ValueError:
             raise ValueError("Quantity must be a valid non-negative integer.")
 
+    @field_validator(
+        "created_after", "created_before", "modified_after", "modified_before"
+    )
+    def validate_date(cls, value):
+        # Dates are stored as naive Europe/Warsaw times
+        if value is None or value.tzinfo is None:
+            return value
+        return value.astimezone(ZoneInfo("Europe/Warsaw")).replace(tzinfo=None)
+
+    @model_validator(mode="after")
+    def validate_ranges(self):
+        if (
+            self.quantity_min is not None
+            and self.quantity_max is not None
+            and self.quantity_min > self.quantity_max
+        ):
+            raise ValueError("quantity_min must not be greater than quantity_max.")
+        for name, after, before in (
+            ("created", self.created_after, self.created_before),
+            ("modified", self.modified_after, self.modified_before),
+        ):
+            if after is not None and before is not None and after >= before:
+                raise ValueError(f"{name}_after must be earlier than {name}_before.")
+        return self
+
+    @property
+    def default_sort_terms(self) -> list[tuple[str, bool]]:
+        """
+        Returns the sort by the field of the range filter, if any.
+        Returns:
+            list[tuple[str, bool]]: Field names and descending flags.
+        """
+        if self.modified_after is not None or self.modified_before is not None:
+            return [("last_modification_date", False)]
+        if self.created_after is not None or self.created_before is not None:
+            return [("creation_date", False)]
+        if self.quantity_min is not None or self.quantity_max is not None:
+            if self.category_id is not None:
+                return [("category_id", False), ("quantity", False)]
+            return [("quantity", False)]
+        return []
+
     @property
     def filter_list(self):
         filter_list = []
@@ -430,12 +1261,27 @@ class StockItemQuery(BaseQuery):
             filter_list.append(StockItem.description.like(f"%{self.description}%"))
         if self.quantity is not None:
             filter_list.append(StockItem.quantity == self.quantity)
+        if self.quantity_min is not None:
+            filter_list.append(StockItem.quantity >= self.quantity_min)
+        if self.quantity_max is not None:
+            filter_list.append(StockItem.quantity <= self.quantity_max)
+        if self.category_id is not None:
+            filter_list.append(StockItem.category_id == self.category_id)
+        if self.created_after is not None:
+            filter_list.append(StockItem.creation_date >= self.created_after)
+        if self.created_before is not None:
+            filter_list.append(StockItem.creation_date < self.created_before)
+        if self.modified_after is not None:
+            filter_list.append(StockItem.last_modification_date >= self.modified_after)
+        if self.modified_before is not None:
+            filter_list.append(StockItem.last_modification_date < self.modified_before)
         if self.category_name:
-            filter_list.append(
-                StockItem.category.has(
+            category_ids = self._category_ids
+            if category_ids is None:
+                category_ids = select(ItemCategory.id).where(
                     ItemCategory.name.like(f"%{self.category_name}%")
                 )
-            )
+            filter_list.append(StockItem.category_id.in_(category_ids))
         return filter_list
 
 
@@ -446,6 +1292,7 @@ class RoleFilterQuery(BaseQuery):
     Inherits pagination and sorting parameters from BaseQuery:
         page (int): The current page number (default: 1).
         page_size (int): The number of items per page (default: 10).
+        sort (Optional[str]): Comma separated fields to sort by, "-" prefixed for descending.
         sort_by (Optional[str]): Field to sort by.
         sort_direction (SortDirection): Sorting direction (asc or desc).
 
@@ -455,6 +1302,10 @@ class RoleFilterQuery(BaseQuery):
 
     model_config = ConfigDict(from_attributes=True)
 
+    SORT_COLUMNS: ClassVar[dict] = {"id": Role.id, "name": Role.name}
+    SORT_KEYS: ClassVar[tuple[tuple[str, ...], ...]] = (("name",),)
+    SUBSTRING_FILTERS: ClassVar[tuple[str, ...]] = ("name",)
+
     name: Optional[str] = Field(None, max_length=50)
 
     @property
@@ -472,6 +1323,7 @@ class ItemCategoryFilterQuery(BaseQuery):
     Inherits pagination and sorting parameters from BaseQuery:
         page (int): The current page number (default: 1).
         page_size (int): The number of items per page (default: 10).
+        sort (Optional[str]): Comma separated fields to sort by, "-" prefixed for descending.
         sort_by (Optional[str]): Field to sort by.
         sort_direction (SortDirection): Sorting direction (asc or desc).
 
@@ -481,6 +1333,10 @@ class ItemCategoryFilterQuery(BaseQuery):
 
     model_config = ConfigDict(from_attributes=True)
 
+    SORT_COLUMNS: ClassVar[dict] = {"id": ItemCategory.id, "name": ItemCategory.name}
+    SORT_KEYS: ClassVar[tuple[tuple[str, ...], ...]] = (("name",),)
+    SUBSTRING_FILTERS: ClassVar[tuple[str, ...]] = ("name",)
+
     name: Optional[str] = Field(None, max_length=50)
 
     @property
@@ -489,3 +1345,93 @@ class ItemCategoryFilterQuery(BaseQuery):
         if self.name:
             filter_list.append(ItemCategory.name.like(f"%{self.name}%"))
         return filter_list
+
+
+class StockMovementHistoryQuery(BaseModel):
+    """
+    Query model for keyset pagination of stock movement history, newest first.
+
+    Attributes:
+        before_id (Optional[int]): Return movements with an ID lower than this cursor.
+        limit (int): The number of movements per page (default: 50).
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    before_id: Optional[int] = Field(None, gt=0)
+    limit: int = Field(50, gt=0, le=500)
+
+
+class LowStockQuery(BaseModel):
+    """
+    Query model for keyset pagination of stock items low on stock, ordered by stock item ID.
+
+    Attributes:
+        after_id (Optional[int]): Return stock items with an ID greater than this cursor.
+        category_id (Optional[int]): Return only stock items of this category.
+        limit (int): The number of stock items per page (default: 50).
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    after_id: Optional[int] = Field(None, gt=0)
+    category_id: Optional[int] = Field(None, gt=0)
+    limit: int = Field(50, gt=0, le=500)
+
+
+class NameSuggestionQuery(BaseModel):
+    """
+    Query model for stock item and item category name suggestions.
+
+    Attributes:
+        prefix (str): Beginning of the name, case is ignored.
+        limit (int): The maximum number of suggestions (default: 10).
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    prefix: str = Field(min_length=1, max_length=50, pattern=r"^[^\x00]+$")
+    limit: int = Field(10, gt=0, le=50)
+
+
+class FuzzySearchQuery(BaseModel):
+    """
+    Query model for the typo tolerant search of stock items by name.
+
+    Attributes:
+        name (str): The searched name, possibly misspelled.
+        limit (int): The maximum number of matches (default: 10).
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    name: str = Field(min_length=1, max_length=50)
+    limit: int = Field(10, gt=0, le=50)
+
+
+class StockItemAnalyticsQuery(BaseModel):
+    """
+    Query model for the inventory analytics.
+
+    Attributes:
+        category_id (Optional[int]): Analyse only the stock items of this category.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    category_id: Optional[int] = Field(None, gt=0)
+
+
+class StockItemChangesQuery(BaseModel):
+    """
+    Query model for the stock item delta sync.
+
+    Attributes:
+        since (Optional[str]): Token returned by the previous sync, omitted for a full sync.
+        limit (int): The maximum number of changed and of deleted items (default: 500).
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    since: Optional[str] = None
+    limit: int = Field(500, gt=0, le=1000)
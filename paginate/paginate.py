@@ -0,0 +1,85 @@
+"""
+Pagination utility for handling paged results in the StockManagerAPI.
+"""
+
+from math import ceil
+
+from exceptions.exceptions import QueryLimitExceededException
+from models.models import BaseQuery, PagedResult
+
+
+def paginate(data, current_page, page_size, total_items):
+    """
+    Paginate the provided data and return a PagedResult object.
+
+    Args:
+        data (list): The list of items for the current page.
+        current_page (int): The current page number (1-based).
+        page_size (int): The number of items per page.
+        total_items (int): The total number of items across all pages.
+
+    Returns:
+        PagedResult: An object containing paginated data and metadata.
+    """
+    return PagedResult(
+        data=data,
+        current_page=current_page,
+        page_size=page_size,
+        total_items=total_items,
+        total_pages=int(ceil(total_items / page_size)),
+    )
+
+
+def paginate_dict(data, current_page, page_size, total_items):
+    """
+    Paginate the provided data and return a plain dict with the PagedResult shape.
+    Used by the fast serialization path, which skips Pydantic validation.
+
+    Args:
+        data (list): The list of already serialized items for the current page.
+        current_page (int): The current page number (1-based).
+        page_size (int): The number of items per page.
+        total_items (int): The total number of items across all pages.
+
+    Returns:
+        dict: Paginated data and metadata.
+    """
+    return {
+        "data": data,
+        "current_page": current_page,
+        "page_size": page_size,
+        "total_items": total_items,
+        "total_pages": int(ceil(total_items / page_size)),
+    }
+
+
+def check_query_limits(
+    filter_query: BaseQuery,
+    max_page_size: int,
+    cost_budget: int,
+    alternative: str | None = None,
+):
+    """
+    Check that a list query is within the page size limit of its endpoint and the
+    query cost budget.
+
+    Args:
+        filter_query (BaseQuery): The list query.
+        max_page_size (int): Maximum page size of the endpoint.
+        cost_budget (int): Maximum estimated number of rows the query may read.
+        alternative (str | None): Hint added to the error message, e.g. an export endpoint.
+
+    Raises:
+        QueryLimitExceededException: If the page size or the estimated cost is too big.
+    """
+    hint = f" {alternative}" if alternative else ""
+    if filter_query.page_size > max_page_size:
+        raise QueryLimitExceededException(
+            f"page_size must be at most {max_page_size}, got {filter_query.page_size}.{hint}"
+        )
+    cost = filter_query.estimate_cost()
+    if cost > cost_budget:
+        raise QueryLimitExceededException(
+            f"The query would read about {cost} rows, at most {cost_budget} are allowed. "
+            f"Request an earlier page, use more selective filters or an indexed sort.{hint}"
+        )
@@ -0,0 +1,798 @@
+"""
+In-process column oriented read model of stock items serving the stock item list.
+"""
+
+import heapq
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from itertools import chain, islice
+from typing import Iterable
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app_settings import get_app_settings
+from database_settings import SessionLocal
+from logger.logger import logger
+from models.entities import ItemCategory, StockItem, StockItemTombstone
+from models.models import StockItemQuery
+from services.stock_item_sync_service import (
+    get_change_sequence,
+    get_tombstone_watermark,
+)
+
+# Columns of a stock item row, in the order of the row tuples
+ROW_COLUMNS = (
+    StockItem.id,
+    StockItem.name,
+    StockItem.quantity,
+    StockItem.category_id,
+    StockItem.creation_date,
+    StockItem.last_modification_date,
+    StockItem.version,
+    StockItem.reorder_threshold,
+)
+CATEGORY_COLUMNS = (
+    ItemCategory.id,
+    ItemCategory.name,
+    ItemCategory.creation_date,
+    ItemCategory.last_modification_date,
+)
+DATE_FIELDS = ("creation_date", "last_modification_date")
+# Dates are stored as microseconds since EPOCH
+EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+# Sorts kept as position orders: the leading parts of the sort keys, () is the id order
+ORDER_KEYS = tuple(
+    dict.fromkeys(
+        [
+            (),
+            *(
+                key[:length]
+                for key in StockItemQuery.SORT_KEYS
+                for length in range(1, len(key) + 1)
+            ),
+        ]
+    )
+)
+CATCH_UP_BATCH_SIZE = 1000
+# Rows a name filter checks at most, larger scans are left to the database
+NAME_SCAN_LIMIT = 100_000
+# Characters with a special meaning in LIKE patterns, filters with them are left to the
+# database
+LIKE_SPECIAL_CHARACTERS = frozenset("%_\\")
+
+
+def _micros(value: datetime) -> int:
+    # Dates are stored as naive Europe/Warsaw times, written ones may carry the zone
+    return (value.replace(tzinfo=None) - EPOCH) // ONE_MICROSECOND
+
+
+class StockItemColumns:
+    """
+    Stock item rows stored column by column in arrays, names in a list of interned
+    strings. A row keeps its position until the columns are rebuilt, a deleted row is
+    only left out of the orders.
+
+    Every order is an array of the positions of all rows sorted by the fields of its
+    key and the id, like the index serving that sort in the database, so filters on
+    the leading fields of a sort are a contiguous run found by bisection. The id order
+    also finds the position of a stock item.
+    """
+
+    def __init__(self):
+        """
+        Initialize empty StockItemColumns.
+        """
+        self.ids = array("I")
+        self.names = []
+        self.quantities = array("q")
+        self.category_ids = array("I")
+        self.creation_dates = array("q")
+        self.modification_dates = array("q")
+        self.versions = array("I")
+        self.reorder_thresholds = array("q")
+        self.columns = {
+            "id": self.ids,
+            "name": self.names,
+            "quantity": self.quantities,
+            "reorder_threshold": self.reorder_thresholds,
+            "category_id": self.category_ids,
+            "creation_date": self.creation_dates,
+            "last_modification_date": self.modification_dates,
+        }
+        self.orders = {key: array("I") for key in ORDER_KEYS}
+
+    def build(self, rows: Iterable[tuple]):
+        """
+        Fill empty columns with rows and sort the orders.
+        Args:
+            rows (Iterable[tuple]): Stock item rows ordered by id, values as ROW_COLUMNS.
+        """
+        for row in rows:
+            self._append(row)
+        for key in ORDER_KEYS:
+            # Stable sorts from the last field keep the id order of equal values
+            order = list(range(len(self.ids)))
+            for field in reversed(key):
+                order.sort(key=self.columns[field].__getitem__)
+            self.orders[key] = array("I", order)
+
+    def find(self, stock_item_id: int) -> int | None:
+        """
+        Return the position of a stock item.
+        Args:
+            stock_item_id (int): ID of the stock item.
+        Returns:
+            int | None: The position, None if the stock item is not held.
+        """
+        order = self.orders[()]
+        index = bisect_left(order, stock_item_id, key=self.ids.__getitem__)
+        if index < len(order) and self.ids[order[index]] == stock_item_id:
+            return order[index]
+        return None
+
+    def insert(self, row: tuple):
+        """
+        Add a stock item that is not held.
+        Args:
+            row (tuple): Stock item row, values as ROW_COLUMNS.
+        """
+        position = self._append(row)
+        for key, order in self.orders.items():
+            insort(order, position, key=self.sort_key(key))
+
+    def update(self, position: int, row: tuple):
+        """
+        Replace the values of a held stock item, moving it in the orders of changed fields.
+        Args:
+            position (int): Position of the stock item.
+            row (tuple): Stock item row, values as ROW_COLUMNS.
+        """
+        (
+            _,
+            name,
+            quantity,
+            category_id,
+            creation_date,
+            modification_date,
+            version,
+            reorder_threshold,
+        ) = row
+        values = {
+            "name": sys.intern(name),
+            "quantity": quantity,
+            "reorder_threshold": reorder_threshold,
+            "category_id": category_id,
+            "creation_date": _micros(creation_date),
+            "last_modification_date": _micros(modification_date),
+        }
+        changed = {
+            field
+            for field, value in values.items()
+            if self.columns[field][position] != value
+        }
+        moved = [key for key in ORDER_KEYS if changed.intersection(key)]
+        for key in moved:
+            self._remove_from_order(key, position)
+        for field in changed:
+            self.columns[field][position] = values[field]
+        self.versions[position] = version
+        for key in moved:
+            insort(self.orders[key], position, key=self.sort_key(key))
+
+    def delete(self, position: int):
+        """
+        Remove a held stock item from the orders.
+        Args:
+            position (int): Position of the stock item.
+        """
+        for key in ORDER_KEYS:
+            self._remove_from_order(key, position)
+        self.names[position] = None
+
+    def sort_key(self, key: tuple[str, ...], length: int | None = None):
+        """
+        Return the function mapping a position to its sort values in an order.
+        Args:
+            key (tuple[str, ...]): Fields of the order, the id is appended.
+            length (int | None): Number of leading values returned, all if not given.
+        Returns:
+            Callable[[int], tuple]: The sort key function.
+        """
+        columns = [self.columns[field] for field in (*key, "id")][:length]
+        return lambda position: tuple(column[position] for column in columns)
+
+    def __len__(self) -> int:
+        return len(self.orders[()])
+
+    def _append(self, row: tuple) -> int:
+        stock_item_id, name, quantity, category_id, creation_date, modification_date = (
+            row[:6]
+        )
+        self.ids.append(stock_item_id)
+        self.names.append(sys.intern(name))
+        self.quantities.append(quantity)
+        self.category_ids.append(category_id)
+        self.creation_dates.append(_micros(creation_date))
+        self.modification_dates.append(_micros(modification_date))
+        self.versions.append(row[6])
+        self.reorder_thresholds.append(row[7])
+        return len(self.ids) - 1
+
+    def _remove_from_order(self, key: tuple[str, ...], position: int):
+        sort_key = self.sort_key(key)
+        order = self.orders[key]
+        del order[bisect_left(order, sort_key(position), key=sort_key)]
+
+
+class StockItemReadModel:
+    """
+    Serves stock item list queries from StockItemColumns instead of the database.
+    Filters on the leading fields of the requested sort are a run of its order found by
+    bisection, the other filters are checked on the rows of that run, so queries are
+    answered like the database answers them with the sort indexes. Descriptions are
+    not held, queries filtering or returning them are left to the database, as are
+    sorts no index serves. Names are sorted by code point like the binary collation of
+    SQLite.
+
+    StockItemService and ItemCategoryService apply their writes after commit. Changes
+    made by other processes are read at most every sync_interval seconds from the
+    (change_sequence, id) indexes of the stock items and the tombstones, like the delta
+    sync does, and the item categories are read again whole. Rows read again are not
+    newer than the held versions and change nothing.
+    A write whose version does not follow the held version shows a change was missed,
+    the model is then reloaded from the database in the background.
+
+    Every million stock items retain about 161 MiB and take about 17 s to load from
+    SQLite, memory peaks at about 241 MiB while loading. Every worker process holds its
+    own model.
+    """
+
+    def __init__(self, sync_interval: float):
+        """
+        Initialize an empty StockItemReadModel.
+        Args:
+            sync_interval (float): Seconds between reads of changes made by other processes.
+        """
+        self.sync_interval = sync_interval
+        self._columns = None
+        self._categories = {}
+        # Change sequence and id of the last stock item and tombstone read
+        self._watermark = (0, 0, 0, 0)
+        self._next_sync = 0.0
+        # Changes made while the model is loading, applied to the loaded model
+        self._pending_changes = None
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        """
+        Returns whether the model has been loaded.
+        """
+        return self._columns is not None
+
+    def load(self, db: Session | None = None):
+        """
+        Replace the model with all stock items and item categories. Changes applied
+        while the rows are read are applied to the loaded model.
+        Args:
+            db (Session | None): SQLAlchemy session, a new session is used if not given.
+        """
+        if db is None:
+            with SessionLocal() as db:
+                return self.load(db)
+        with self._lock:
+            self._pending_changes = []
+        try:
+            # Read first, rows changed while loading are read again by the catch up
+            change_sequence = get_change_sequence(db)
+            tombstone_watermark = get_tombstone_watermark(db, change_sequence)
+            categories = {
+                row[0]: _category_dict(row) for row in db.query(*CATEGORY_COLUMNS)
+            }
+            columns = StockItemColumns()
+            columns.build(
+                db.query(*ROW_COLUMNS).order_by(StockItem.id).yield_per(10_000)
+            )
+        except Exception:
+            with self._lock:
+                self._pending_changes = None
+            raise
+        with self._lock:
+            self._columns = columns
+            self._categories = categories
+            self._watermark = (change_sequence, 0, *tombstone_watermark)
+            pending_changes, self._pending_changes = self._pending_changes, None
+            for change in pending_changes:
+                self._apply_change(*change)
+
+    def load_in_background(self):
+        """
+        Load the model in a daemon thread, lists are read from the database until it is
+        loaded. Does nothing while a load is running.
+        """
+        with self._lock:
+            if self._pending_changes is not None:
+                return
+        threading.Thread(
+            target=self._load_logging_errors,
+            name="stock-item-read-model-load",
+            daemon=True,
+        ).start()
+
+    def apply(self, stock_item: StockItem):
+        """
+        Apply a committed stock item.
+        Args:
+            stock_item (StockItem): The stock item, refreshed after the commit.
+        """
+        self.apply_rows(
+            [tuple(getattr(stock_item, column.key) for column in ROW_COLUMNS)]
+        )
+
+    def apply_rows(self, rows: Iterable[tuple]):
+        """
+        Apply committed stock items, reloading the model in the background if a version
+        does not follow the held version.
+        Args:
+            rows (Iterable[tuple]): Stock item rows, values as ROW_COLUMNS.
+        """
+        mismatch = False
+        with self._lock:
+            if self._columns is None and self._pending_changes is None:
+                return
+            for row in rows:
+                mismatch |= self._apply_change("row", row, True)
+        if mismatch:
+            logger.warning("Stock item read model missed a change, reloading it")
+            self.load_in_background()
+
+    def remove(self, stock_item_id: int):
+        """
+        Remove a deleted stock item.
+        Args:
+            stock_item_id (int): ID of the stock item.
+        """
+        with self._lock:
+            self._apply_change("deleted", stock_item_id)
+
+    def apply_category(self, item_category: ItemCategory):
+        """
+        Apply a committed item category.
+        Args:
+            item_category (ItemCategory): The item category, refreshed after the commit.
+        """
+        with self._lock:
+            self._apply_change(
+                "category",
+                tuple(
+                    getattr(item_category, column.key) for column in CATEGORY_COLUMNS
+                ),
+            )
+
+    def remove_category(self, category_id: int):
+        """
+        Remove a deleted item category.
+        Args:
+            category_id (int): ID of the item category.
+        """
+        with self._lock:
+            self._apply_change("deleted_category", category_id)
+
+    def query(
+        self, db: Session, filter_query: StockItemQuery
+    ) -> tuple[list[dict], int] | None:
+        """
+        Return a page of stock items matching the filter query, reading the changes made
+        by other processes first when sync_interval has passed.
+        Args:
+            db (Session): SQLAlchemy session used to read the changes.
+            filter_query (StockItemQuery): Filtering, field selection and pagination
+                options, with category_name resolved.
+        Returns:
+            tuple[list[dict], int] | None: Stock item dicts with the selected fields and
+                the number of matching stock items, None if the query is left to the
+                database.
+        """
+        fields = filter_query.selected_fields
+        if (
+            self._columns is None
+            or not filter_query.sorted_by_index
+            or filter_query.description
+            or "description" in fields
+            or (
+                filter_query.category_name
+                and filter_query.resolved_category_ids is None
+            )
+        ):
+            return None
+        if time.monotonic() >= self._next_sync:
+            self._catch_up(db)
+        with self._lock:
+            columns = self._columns
+            selection = _select(columns, filter_query)
+            if selection is None:
+                return None
+            positions, total_count = selection
+            stock_items = []
+            for position in positions:
+                stock_item = {}
+                for field in fields:
+                    if field == "category":
+                        category = self._categories.get(columns.category_ids[position])
+                        if category is None:
+                            return None
+                        stock_item["category"] = category
+                    elif field in DATE_FIELDS:
+                        stock_item[field] = EPOCH + (
+                            columns.columns[field][position] * ONE_MICROSECOND
+                        )
+                    else:
+                        stock_item[field] = columns.columns[field][position]
+                stock_items.append(stock_item)
+        return stock_items, total_count
+
+    def __len__(self) -> int:
+        return len(self._columns) if self._columns is not None else 0
+
+    def _load_logging_errors(self):
+        try:
+            self.load()
+        except Exception:
+            logger.exception("Failed to load the stock item read model")
+
+    def _apply_change(self, kind: str, value, check_version: bool = False) -> bool:
+        # Called with the lock held, returns whether a version mismatch was found
+        if self._pending_changes is not None:
+            self._pending_changes.append((kind, value))
+        columns = self._columns
+        if kind == "category":
+            self._categories[value[0]] = _category_dict(value)
+        elif kind == "deleted_category":
+            self._categories.pop(value, None)
+        elif columns is None:
+            return False
+        elif kind == "deleted":
+            position = columns.find(value)
+            if position is not None:
+                columns.delete(position)
+        else:
+            position = columns.find(value[0])
+            if position is None:
+                columns.insert(value)
+            elif columns.versions[position] < value[6]:
+                mismatch = check_version and columns.versions[position] < value[6] - 1
+                columns.update(position, value)
+                return mismatch
+        return False
+
+    def _catch_up(self, db: Session):
+        """
+        Apply the stock items changed and deleted since the watermark and read the item
+        categories again. Skipped while another thread or a load is running it.
+        Args:
+            db (Session): SQLAlchemy session object.
+        """
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            if self._pending_changes is not None:
+                return
+            change_sequence, stock_item_id, tombstone_sequence, tombstone_id = (
+                self._watermark
+            )
+            while True:
+                rows = (
+                    db.query(*ROW_COLUMNS, StockItem.change_sequence)
+                    .filter(
+                        or_(
+                            StockItem.change_sequence > change_sequence,
+                            and_(
+                                StockItem.change_sequence == change_sequence,
+                                StockItem.id > stock_item_id,
+                            ),
+                        )
+                    )
+                    .order_by(StockItem.change_sequence, StockItem.id)
+                    .limit(CATCH_UP_BATCH_SIZE)
+                    .all()
+                )
+                with self._lock:
+                    for row in rows:
+                        self._apply_change("row", tuple(row)[: len(ROW_COLUMNS)])
+                if rows:
+                    change_sequence = rows[-1].change_sequence
+                    stock_item_id = rows[-1].id
+                if len(rows) < CATCH_UP_BATCH_SIZE:
+                    break
+            tombstones = (
+                db.query(
+                    StockItemTombstone.id,
+                    StockItemTombstone.stock_item_id,
+                    StockItemTombstone.change_sequence,
+                )
+                .filter(
+                    or_(
+                        StockItemTombstone.change_sequence > tombstone_sequence,
+                        and_(
+                            StockItemTombstone.change_sequence == tombstone_sequence,
+                            StockItemTombstone.id > tombstone_id,
+                        ),
+                    )
+                )
+                .order_by(StockItemTombstone.change_sequence, StockItemTombstone.id)
+                .all()
+            )
+            categories = {
+                row[0]: _category_dict(row) for row in db.query(*CATEGORY_COLUMNS)
+            }
+            with self._lock:
+                for tombstone in tombstones:
+                    self._apply_change("deleted", tombstone.stock_item_id)
+                if tombstones:
+                    tombstone_sequence = tombstones[-1].change_sequence
+                    tombstone_id = tombstones[-1].id
+                self._categories = categories
+                self._watermark = (
+                    change_sequence,
+                    stock_item_id,
+                    tombstone_sequence,
+                    tombstone_id,
+                )
+        finally:
+            self._next_sync = time.monotonic() + self.sync_interval
+            self._sync_lock.release()
+
+
+def _category_dict(row: tuple) -> dict:
+    return dict(zip(("id", "name", "creation_date", "last_modification_date"), row))
+
+
+def _select(
+    columns: StockItemColumns, filter_query: StockItemQuery
+) -> tuple[list[int], int] | None:
+    """
+    Select the positions of a page of stock items matching the filter query. The rows
+    read are the run of the sort order bounded by the filters on its leading fields or,
+    when fewer, the runs of the matching categories.
+    Args:
+        columns (StockItemColumns): The stock item columns.
+        filter_query (StockItemQuery): Filtering, sorting and pagination options.
+    Returns:
+        tuple[list[int], int] | None: Positions of the page and the number of matching
+            stock items, None if a name filter would check more than NAME_SCAN_LIMIT rows
+            or compare text outside ASCII.
+    """
+    # Lower bound, upper bound and whether the upper bound is inclusive of each field
+    conditions = {}
+    if filter_query.quantity is not None:
+        conditions["quantity"] = (filter_query.quantity, filter_query.quantity, True)
+    elif filter_query.quantity_min is not None or filter_query.quantity_max is not None:
+        conditions["quantity"] = (
+            filter_query.quantity_min,
+            filter_query.quantity_max,
+            True,
+        )
+    for field, after, before in (
+        ("creation_date", filter_query.created_after, filter_query.created_before),
+        (
+            "last_modification_date",
+            filter_query.modified_after,
+            filter_query.modified_before,
+        ),
+    ):
+        if after is not None or before is not None:
+            conditions[field] = (
+                _micros(after) if after is not None else None,
+                _micros(before) if before is not None else None,
+                False,
+            )
+    predicates = []
+    if filter_query.quantity is not None and (
+        filter_query.quantity_min is not None or filter_query.quantity_max is not None
+    ):
+        predicates.append(
+            _predicate(
+                columns.quantities,
+                filter_query.quantity_min,
+                filter_query.quantity_max,
+                True,
+            )
+        )
+    category_ids = None
+    if filter_query.category_name:
+        category_ids = set(filter_query.resolved_category_ids)
+    if filter_query.category_id is not None:
+        category_ids = {filter_query.category_id} & (
+            category_ids if category_ids is not None else {filter_query.category_id}
+        )
+
+    terms = filter_query.sort_terms
+    descending = terms[-1][1] if terms else False
+    key = tuple(field for field, _ in terms if field != "id")
+    order = columns.orders[key]
+    # Conditions on the leading fields of the sort bound runs of its order, one per
+    # category when the sort starts with the category
+    bound_conditions = []
+    for field in key[1:] if key[:1] == ("category_id",) else key:
+        if field not in conditions:
+            break
+        bound_conditions.append((field, *conditions.pop(field)))
+        if bound_conditions[-1][1] != bound_conditions[-1][2]:
+            break
+    if key[:1] == ("category_id",) and category_ids is not None:
+        run_order = order
+        runs = [
+            _bounds(
+                columns,
+                key,
+                [("category_id", category_id, category_id, True)] + bound_conditions,
+            )
+            for category_id in sorted(category_ids)
+        ]
+    elif key[:1] == ("category_id",):
+        run_order = order
+        runs = [(0, len(order))]
+        for field, lower, upper, upper_inclusive in bound_conditions:
+            predicates.append(
+                _predicate(columns.columns[field], lower, upper, upper_inclusive)
+            )
+    else:
+        run_order = order
+        runs = [_bounds(columns, key, bound_conditions)]
+        if category_ids is not None:
+            category_runs = [
+                _bounds(
+                    columns,
+                    ("category_id",),
+                    [("category_id", category_id, category_id, True)],
+                )
+                for category_id in sorted(category_ids)
+            ]
+            if _run_length(category_runs) < _run_length(runs):
+                run_order = columns.orders[("category_id",)]
+                runs = category_runs
+                for field, lower, upper, upper_inclusive in bound_conditions:
+                    predicates.append(
+                        _predicate(
+                            columns.columns[field], lower, upper, upper_inclusive
+                        )
+                    )
+            else:
+                predicates.append(
+                    lambda position: columns.category_ids[position] in category_ids
+                )
+    for field, (lower, upper, upper_inclusive) in conditions.items():
+        predicates.append(
+            _predicate(columns.columns[field], lower, upper, upper_inclusive)
+        )
+    candidate_count = _run_length(runs)
+    if filter_query.name:
+        # Matched like LIKE '%name%', folding ASCII case only as SQLite does. Folding of
+        # other characters depends on the database collation, so filters or names
+        # outside ASCII are left to the database
+        if (
+            candidate_count > NAME_SCAN_LIMIT
+            or not filter_query.name.isascii()
+            or not LIKE_SPECIAL_CHARACTERS.isdisjoint(filter_query.name)
+        ):
+            return None
+        names = columns.names
+        if not all(
+            names[position].isascii()
+            for start, end in runs
+            for position in run_order[start:end]
+        ):
+            return None
+        text = filter_query.name.lower()
+        predicates.append(lambda position: text in names[position].lower())
+
+    offset = (filter_query.page - 1) * filter_query.page_size
+    page_size = filter_query.page_size
+    if len(runs) == 1 and run_order is order and not predicates:
+        start, end = runs[0]
+        if descending:
+            page_end = max(end - offset, start)
+            page = order[max(page_end - page_size, start) : page_end][::-1]
+        else:
+            page_start = min(start + offset, end)
+            page = order[page_start : min(page_start + page_size, end)]
+        return list(page), end - start
+    slices = [run_order[start:end] for start, end in runs]
+    if run_order is order:
+        # Runs of the sort order are in sort order
+        matches = chain.from_iterable(slices)
+    elif key:
+        matches = sorted(chain.from_iterable(slices), key=columns.sort_key(key))
+    else:
+        # Runs of one category are in id order
+        matches = heapq.merge(*slices, key=columns.ids.__getitem__)
+    if descending:
+        matches = reversed(list(matches))
+    for predicate in predicates:
+        matches = filter(predicate, matches)
+    if not predicates:
+        return list(islice(matches, offset, offset + page_size)), candidate_count
+    matches = list(matches)
+    return matches[offset : offset + page_size], len(matches)
+
+
+def _bounds(
+    columns: StockItemColumns, key: tuple[str, ...], conditions: list[tuple]
+) -> tuple[int, int]:
+    """
+    Find the run of an order matching conditions on the leading fields of its key.
+    Args:
+        columns (StockItemColumns): The stock item columns.
+        key (tuple[str, ...]): Fields of the order.
+        conditions (list[tuple]): Field, lower bound, upper bound and whether the upper
+            bound is inclusive of each leading field. All but the last are equalities,
+            with both bounds equal and inclusive.
+    Returns:
+        tuple[int, int]: Start and end of the run.
+    """
+    order = columns.orders[key]
+    if not conditions:
+        return 0, len(order)
+    prefix = [lower for _, lower, _, _ in conditions[:-1]]
+    _, lower, upper, upper_inclusive = conditions[-1]
+    prefix_key = columns.sort_key(key, len(prefix))
+    field_key = columns.sort_key(key, len(prefix) + 1)
+    if lower is not None:
+        start = bisect_left(order, (*prefix, lower), key=field_key)
+    elif prefix:
+        start = bisect_left(order, tuple(prefix), key=prefix_key)
+    else:
+        start = 0
+    if upper is not None:
+        find_end = bisect_right if upper_inclusive else bisect_left
+        end = find_end(order, (*prefix, upper), key=field_key)
+    elif prefix:
+        end = bisect_right(order, tuple(prefix), key=prefix_key)
+    else:
+        end = len(order)
+    return start, max(start, end)
+
+
+def _run_length(runs: list[tuple[int, int]]) -> int:
+    return sum(end - start for start, end in runs)
+
+
+def _predicate(column, lower, upper, upper_inclusive: bool):
+    if lower is not None and upper is not None:
+        if upper_inclusive:
+            return lambda position: lower <= column[position] <= upper
+        return lambda position: lower <= column[position] < upper
+    if lower is not None:
+        return lambda position: column[position] >= lower
+    if upper_inclusive:
+        return lambda position: column[position] <= upper
+    return lambda position: column[position] < upper
+
+
+_stock_item_read_model = None
+_stock_item_read_model_lock = threading.Lock()
+
+
+def get_stock_item_read_model() -> StockItemReadModel:
+    """
+    Return the process wide stock item read model, creating it empty on first use with
+    the interval set by STOCK_ITEM_READ_MODEL_SYNC_INTERVAL. It stays empty and is not
+    used unless loaded, which main does when STOCK_ITEM_READ_MODEL_ENABLED is true.
+    Returns:
+        StockItemReadModel: The stock item read model.
+    """
+    global _stock_item_read_model
+    if _stock_item_read_model is None:
+        with _stock_item_read_model_lock:
+            if _stock_item_read_model is None:
+                _stock_item_read_model = StockItemReadModel(
+                    get_app_settings().stock_item_read_model_sync_interval
+                )
+    return _stock_item_read_model
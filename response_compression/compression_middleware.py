@@ -0,0 +1,221 @@
+"""
+ASGI middleware compressing responses with Brotli or gzip, based on the Accept-Encoding header.
+"""
+
+import zlib
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional, gzip is always available
+    brotli = None
+
+
+def select_encoding(accept_encoding: str, brotli_available: bool) -> str | None:
+    """
+    Select the best supported encoding from an Accept-Encoding header value.
+    Brotli wins ties with gzip, encodings with q=0 are never selected.
+    Args:
+        accept_encoding (str): Value of the Accept-Encoding request header.
+        brotli_available (bool): Whether the brotli package is installed.
+    Returns:
+        str | None: "br", "gzip" or None when no supported encoding is accepted.
+    """
+    supported = ["br", "gzip"] if brotli_available else ["gzip"]
+    weights = {}
+    for part in accept_encoding.split(","):
+        encoding, _, params = part.strip().partition(";")
+        encoding = encoding.strip().lower()
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        if encoding == "*":
+            for name in supported:
+                weights.setdefault(name, weight)
+        elif encoding in supported:
+            weights[encoding] = weight
+    candidates = [name for name in supported if weights.get(name, 0.0) > 0.0]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda name: weights[name])
+
+
+class CompressionMiddleware:
+    """
+    Compresses response bodies larger than a minimum size with Brotli or gzip.
+
+    Responses that already have a Content-Encoding and server-sent event streams,
+    which must reach clients event by event, are left untouched. Responses
+    with a Content-Length are buffered and compressed in one go. Streaming
+    responses (no Content-Length, sent in several body messages) are passed
+    through unless chunked compression is enabled, in which case every chunk is
+    compressed and flushed as it is sent.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        compression_level: int = 6,
+        compress_streaming: bool = False,
+    ):
+        """
+        Initialize CompressionMiddleware.
+        Args:
+            app: The ASGI application to wrap.
+            minimum_size (int): Bodies smaller than this number of bytes are sent uncompressed.
+            compression_level (int): gzip level (1-9), Brotli quality is the same value capped at 11.
+            compress_streaming (bool): Whether streaming responses are compressed chunk by chunk.
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compression_level = compression_level
+        self.compress_streaming = compress_streaming
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = select_encoding(accept_encoding, brotli is not None)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """
+    Wraps the ASGI send callable of a single response and compresses its body.
+    """
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.downstream_send = send
+        self.start_message = None
+        self.passthrough = False
+        self.compressor = None
+        self.buffered_body = None
+
+    async def send(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            return
+        if message_type != "http.response.body":
+            await self.downstream_send(message)
+            return
+        if self.passthrough:
+            await self.downstream_send(message)
+            return
+        if self.compressor is not None:
+            await self._send_compressed_chunk(message)
+            return
+
+        headers = dict(self.start_message.get("headers", []))
+        more_body = message.get("more_body", False)
+        if self.buffered_body is None:
+            if b"content-encoding" in headers or headers.get(
+                b"content-type", b""
+            ).startswith(b"text/event-stream"):
+                await self._start_passthrough(message)
+                return
+            if more_body and b"content-length" not in headers:
+                # A real stream, its size is unknown up front
+                if not self.middleware.compress_streaming:
+                    await self._start_passthrough(message)
+                    return
+                self.compressor = _StreamCompressor(
+                    self.encoding, self.middleware.compression_level
+                )
+                self._set_encoding_headers(None)
+                await self.downstream_send(self.start_message)
+                await self._send_compressed_chunk(message)
+                return
+            self.buffered_body = bytearray()
+
+        # A sized body, possibly split into several messages by inner middlewares
+        self.buffered_body += message.get("body", b"")
+        if more_body:
+            return
+        body = bytes(self.buffered_body)
+        if len(body) < self.middleware.minimum_size:
+            await self.downstream_send(self.start_message)
+            await self.downstream_send({"type": "http.response.body", "body": body})
+            return
+        compressed_body = self._compress(body)
+        self._set_encoding_headers(len(compressed_body))
+        await self.downstream_send(self.start_message)
+        await self.downstream_send(
+            {"type": "http.response.body", "body": compressed_body}
+        )
+
+    async def _start_passthrough(self, message):
+        self.passthrough = True
+        await self.downstream_send(self.start_message)
+        await self.downstream_send(message)
+
+    async def _send_compressed_chunk(self, message):
+        more_body = message.get("more_body", False)
+        chunk = self.compressor.compress(message.get("body", b""), final=not more_body)
+        await self.downstream_send(
+            {"type": "http.response.body", "body": chunk, "more_body": more_body}
+        )
+
+    def _compress(self, body: bytes) -> bytes:
+        if self.encoding == "br":
+            return brotli.compress(
+                body, quality=min(self.middleware.compression_level, 11)
+            )
+        compressor = zlib.compressobj(
+            self.middleware.compression_level, zlib.DEFLATED, 31
+        )
+        return compressor.compress(body) + compressor.flush()
+
+    def _set_encoding_headers(self, content_length: int | None):
+        vary = b"Accept-Encoding"
+        headers = []
+        for name, value in self.start_message.get("headers", []):
+            if name == b"vary":
+                vary = value + b", " + vary
+            elif name not in (b"content-length", b"content-encoding"):
+                headers.append((name, value))
+        headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+        headers.append((b"vary", vary))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode("latin-1")))
+        self.start_message["headers"] = headers
+
+
+class _StreamCompressor:
+    """
+    Incremental compressor that flushes after every chunk so clients can decode
+    streamed responses as they arrive.
+    """
+
+    def __init__(self, encoding: str, compression_level: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self.compressor = brotli.Compressor(quality=min(compression_level, 11))
+        else:
+            self.compressor = zlib.compressobj(compression_level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            data = self.compressor.process(chunk)
+            return data + (
+                self.compressor.finish() if final else self.compressor.flush()
+            )
+        data = self.compressor.compress(chunk)
+        return data + self.compressor.flush(
+            zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+        )
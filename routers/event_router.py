@@ -0,0 +1,41 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Request, status
+from fastapi.responses import StreamingResponse
+
+from app_settings import get_app_settings
+from dependencies.dependencies import get_streaming_user
+from events.event_broadcaster import get_event_broadcaster
+from events.sse import sse_event_stream
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+user_dependency = Annotated[dict, Depends(get_streaming_user)]
+
+app_settings = get_app_settings()
+
+
+@router.get("/stream", status_code=status.HTTP_200_OK)
+async def stream_events(user: user_dependency, request: Request):
+    """
+    Stream stock item and item category change events as server-sent events.
+    Clients dropped for being too slow receive a "dropped" event and should
+    resynchronize through the stock item changes endpoint before reconnecting.
+    Args:
+        user: Current user dependency.
+        request (Request): The incoming request.
+    Returns:
+        StreamingResponse: The text/event-stream response.
+    """
+    broadcaster = get_event_broadcaster()
+    subscription = broadcaster.subscribe()
+    return StreamingResponse(
+        sse_event_stream(
+            request,
+            broadcaster,
+            subscription,
+            app_settings.event_heartbeat_interval,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,38 +1,86 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+    status,
+)
 
-from dependencies.dependencies import get_current_user, get_item_category_service
+from app_settings import get_app_settings
+from coalescing.single_flight import get_single_flight
+from concurrency.etag import format_etag, parse_if_match
+from dependencies.dependencies import (
+    get_category_stock_summary_service,
+    get_current_user,
+    get_item_category_service,
+)
 from exceptions.exceptions import (
     CategoryAlreadyExistsException,
     CategoryNotFoundException,
+    QueryLimitExceededException,
+    VersionMismatchException,
 )
 from models.models import (
     CreateItemCategoryDto,
     ItemCategoryFilterQuery,
     PagedResult,
+    ReadCategoryStockSummaryDto,
     ReadItemCategoryDto,
     UpdateItemCategoryDto,
 )
+from services.category_stock_summary_service import CategoryStockSummaryService
 from services.item_category_service import ItemCategoryService
 
 router = APIRouter(prefix="/item-categories", tags=["item-categories"])
 
 service_dependency = Annotated[ItemCategoryService, Depends(get_item_category_service)]
 user_dependency = Annotated[dict, Depends(get_current_user)]
+summary_service_dependency = Annotated[
+    CategoryStockSummaryService, Depends(get_category_stock_summary_service)
+]
+
+app_settings = get_app_settings()
+
+
+@router.get(
+    "/summary",
+    response_model=list[ReadCategoryStockSummaryDto],
+    status_code=status.HTTP_200_OK,
+)
+async def read_item_categories_summary(
+    user: user_dependency, service: summary_service_dependency
+):
+    """
+    Return item count and total quantity per item category.
+    Served from the category stock summary table, stock items are not scanned.
+    Args:
+        user: Current user dependency.
+        service: Category stock summary service dependency.
+    Returns:
+        list[ReadCategoryStockSummaryDto]: Stock totals per category.
+    """
+    return service.get_category_stock_summary()
 
 
 @router.get("/{item_category_id}", response_model=ReadItemCategoryDto, status_code=200)
 async def read_item_category(
     user: user_dependency,
     service: service_dependency,
+    response: Response,
     item_category_id: int = Path(gt=0),
 ):
     """
-    Return an item category by ID.
+    Return an item category by ID with its version in the ETag header.
     Args:
         user: Current user dependency.
         service: Item category service dependency.
+        response (Response): Response used to set the ETag header.
         item_category_id (int): ID of the item category to return.
     Returns:
         ReadItemCategoryDto: Item category data.
@@ -46,6 +94,7 @@ async def read_item_category(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e),
         )
+    response.headers["ETag"] = format_etag(item_category.version)
     return item_category
 
 
@@ -54,20 +103,58 @@ async def read_all_item_categories(
     filter_query: Annotated[ItemCategoryFilterQuery, Query()],
     user: user_dependency,
     service: service_dependency,
+    request: Request,
 ):
     """
     Return a paginated list of item categories with optional filtering.
+    Identical concurrent requests of users with the same role share one query and
+    serialized response.
     Args:
         filter_query (ItemCategoryFilterQuery): Filtering and pagination options.
         user: Current user dependency.
         service: Item category service dependency.
+        request (Request): The incoming request.
     Returns:
         PagedResult[ReadItemCategoryDto]: Paginated item category data.
+    Raises:
+        HTTPException: If the page size or the estimated cost of the query is too big.
     """
-    item_categories = service.get_all_item_categories(filter_query)
+    try:
+        if app_settings.request_coalescing_enabled:
+            # Return the connection used to authenticate the user to the pool, so requests
+            # waiting for a shared execution do not hold connections
+            service.db.close()
+            body = await get_single_flight().run(
+                "item-categories",
+                (
+                    request.url.path,
+                    filter_query.model_dump_json(),
+                    user["role"]["name"],
+                ),
+                _serialize_item_categories_page,
+                service,
+                filter_query,
+            )
+            return Response(body, media_type="application/json")
+        item_categories = service.get_all_item_categories(filter_query)
+    except QueryLimitExceededException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     return item_categories
 
 
+def _serialize_item_categories_page(
+    service: ItemCategoryService, filter_query: ItemCategoryFilterQuery
+) -> bytes:
+    return (
+        PagedResult[ReadItemCategoryDto]
+        .model_validate(
+            service.get_all_item_categories(filter_query), from_attributes=True
+        )
+        .model_dump_json()
+        .encode()
+    )
+
+
 @router.post("", status_code=status.HTTP_201_CREATED)
 async def create_item_category(
     user: user_dependency,
@@ -98,6 +185,7 @@ async def update_item_category(
     service: service_dependency,
     item_category: UpdateItemCategoryDto,
     item_category_id: int = Path(gt=0),
+    if_match: Annotated[str | None, Header()] = None,
 ):
     """
     Update an existing item category.
@@ -106,17 +194,25 @@ async def update_item_category(
         service: Item category service dependency.
         item_category (UpdateItemCategoryDto): Data to update.
         item_category_id (int): ID of the item category to update.
+        if_match (str | None): Optional ETag the item category is expected to have.
     Returns:
         str: Update confirmation message.
     Raises:
-        HTTPException: If item category not found or already exists.
+        HTTPException: If item category not found, already exists
+            or was modified since the given ETag.
     """
     try:
-        service.update_category(item_category_id, item_category)
+        service.update_category(
+            item_category_id, item_category, parse_if_match(if_match)
+        )
     except CategoryNotFoundException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except CategoryAlreadyExistsException as e:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except VersionMismatchException as e:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED, detail=str(e)
+        )
     return f"Item category with id={item_category_id} updated."
 
 
@@ -135,10 +231,12 @@ async def delete_item_category(
     Returns:
         str: Deletion confirmation message.
     Raises:
-        HTTPException: If item category not found.
+        HTTPException: If item category not found or was modified while being deleted.
     """
     try:
         service.delete_category(item_category_id)
     except CategoryNotFoundException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except VersionMismatchException as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     return f"Item category with id={item_category_id} deleted."
@@ -0,0 +1,116 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Path, status
+
+from dependencies.dependencies import get_current_user, get_job_service
+from exceptions.exceptions import (
+    InvalidJobStateException,
+    JobNotFoundException,
+    UnknownJobTypeException,
+)
+from jobs.job_runner import get_job_runner
+from models.models import CreateJobDto, ReadJobDto
+from services.job_service import JobService
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+service_dependency = Annotated[JobService, Depends(get_job_service)]
+user_dependency = Annotated[dict, Depends(get_current_user)]
+
+
+@router.post("", response_model=ReadJobDto, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(
+    user: user_dependency, service: service_dependency, create_job: CreateJobDto
+):
+    """
+    Create a background job and queue it on the job runner.
+    Args:
+        user: Current user dependency.
+        service: Job service dependency.
+        create_job (CreateJobDto): Job type, parameters and number of attempts.
+    Returns:
+        ReadJobDto: The queued job, poll GET /jobs/{job_id} for its progress.
+    Raises:
+        HTTPException: If the job type is unknown.
+    """
+    try:
+        job = service.create_job(create_job, user["id"])
+    except UnknownJobTypeException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    get_job_runner().submit(job.id)
+    return job
+
+
+@router.get("/{job_id}", response_model=ReadJobDto, status_code=status.HTTP_200_OK)
+async def read_job(
+    user: user_dependency, service: service_dependency, job_id: int = Path(gt=0)
+):
+    """
+    Return a background job by ID with its status, progress and result.
+    Args:
+        user: Current user dependency.
+        service: Job service dependency.
+        job_id (int): ID of the job to return.
+    Returns:
+        ReadJobDto: Job data.
+    Raises:
+        HTTPException: If job is not found.
+    """
+    try:
+        job = service.get_job_by_id(job_id)
+    except JobNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return job
+
+
+@router.post(
+    "/{job_id}/cancel", response_model=ReadJobDto, status_code=status.HTTP_200_OK
+)
+async def cancel_job(
+    user: user_dependency, service: service_dependency, job_id: int = Path(gt=0)
+):
+    """
+    Cancel a queued job or request cancellation of a running one.
+    Args:
+        user: Current user dependency.
+        service: Job service dependency.
+        job_id (int): ID of the job to cancel.
+    Returns:
+        ReadJobDto: Job data.
+    Raises:
+        HTTPException: If job is not found or has already finished.
+    """
+    try:
+        job = service.cancel_job(job_id)
+    except JobNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except InvalidJobStateException as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return job
+
+
+@router.post(
+    "/{job_id}/retry", response_model=ReadJobDto, status_code=status.HTTP_202_ACCEPTED
+)
+async def retry_job(
+    user: user_dependency, service: service_dependency, job_id: int = Path(gt=0)
+):
+    """
+    Queue a failed or cancelled job again.
+    Args:
+        user: Current user dependency.
+        service: Job service dependency.
+        job_id (int): ID of the job to retry.
+    Returns:
+        ReadJobDto: Job data.
+    Raises:
+        HTTPException: If job is not found or is neither failed nor cancelled.
+    """
+    try:
+        job = service.retry_job(job_id)
+    except JobNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except InvalidJobStateException as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    get_job_runner().submit(job.id)
+    return job
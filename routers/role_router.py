@@ -1,9 +1,24 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Path,
+    Query,
+    Response,
+    status,
+)
 
+from concurrency.etag import format_etag, parse_if_match
 from dependencies.dependencies import get_current_user, get_role_service
-from exceptions.exceptions import RoleAlreadyExistsException, RoleNotFoundException
+from exceptions.exceptions import (
+    QueryLimitExceededException,
+    RoleAlreadyExistsException,
+    RoleNotFoundException,
+    VersionMismatchException,
+)
 from models.models import (
     CreateRoleDto,
     PagedResult,
@@ -21,13 +36,17 @@ user_dependency = Annotated[dict, Depends(get_current_user)]
 
 @router.get("/{role_id}", response_model=ReadRoleDto, status_code=status.HTTP_200_OK)
 async def read_role(
-    user: user_dependency, service: service_dependency, role_id: int = Path(gt=0)
+    user: user_dependency,
+    service: service_dependency,
+    response: Response,
+    role_id: int = Path(gt=0),
 ):
     """
-    Return a role by ID.
+    Return a role by ID with its version in the ETag header.
     Args:
         user: Current user dependency.
         service: Role service dependency.
+        response (Response): Response used to set the ETag header.
         role_id (int): ID of the role to return.
     Returns:
         ReadRoleDto: Role data.
@@ -38,6 +57,7 @@ async def read_role(
         role = service.get_role_by_id(role_id)
     except RoleNotFoundException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    response.headers["ETag"] = format_etag(role.version)
     return role
 
 
@@ -55,8 +75,13 @@ async def read_all_roles(
         service: Role service dependency.
     Returns:
         PagedResult[ReadRoleDto]: Paginated role data.
+    Raises:
+        HTTPException: If the page size or the estimated cost of the query is too big.
     """
-    roles = service.get_all_roles(filter_query)
+    try:
+        roles = service.get_all_roles(filter_query)
+    except QueryLimitExceededException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     return roles
 
 
@@ -88,6 +113,7 @@ async def update_role(
     service: service_dependency,
     role: UpdateRoleDto,
     role_id: int = Path(gt=0),
+    if_match: Annotated[str | None, Header()] = None,
 ):
     """
     Update an existing role.
@@ -96,17 +122,22 @@ async def update_role(
         service: Role service dependency.
         role (UpdateRoleDto): Data to update.
         role_id (int): ID of the role to update.
+        if_match (str | None): Optional ETag the role is expected to have.
     Returns:
         str: Update confirmation message.
     Raises:
-        HTTPException: If role not found or already exists.
+        HTTPException: If role not found, already exists or was modified since the given ETag.
     """
     try:
-        service.update_role(role_id, role)
+        service.update_role(role_id, role, parse_if_match(if_match))
     except RoleNotFoundException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except RoleAlreadyExistsException as e:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except VersionMismatchException as e:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED, detail=str(e)
+        )
     return f"Role with id={role_id} updated."
 
 
@@ -123,10 +154,12 @@ async def delete_role(
     Returns:
         str: Deletion confirmation message.
     Raises:
-        HTTPException: If role not found.
+        HTTPException: If role not found or was modified while being deleted.
     """
     try:
         service.delete_role(role_id)
     except RoleNotFoundException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except VersionMismatchException as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     return f"Role with id={role_id} deleted."
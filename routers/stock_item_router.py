@@ -1,39 +1,325 @@
+from datetime import datetime
 from typing import Annotated
+from urllib.parse import urlencode
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.responses import StreamingResponse
 
-from dependencies.dependencies import get_current_user, get_stock_item_service
+from app_settings import get_app_settings
+from coalescing.single_flight import get_single_flight
+from concurrency.etag import format_etag, parse_if_match
+from dependencies.dependencies import (
+    get_current_user,
+    get_job_service,
+    get_low_stock_service,
+    get_stock_forecast_service,
+    get_stock_item_analytics_service,
+    get_stock_item_import_service,
+    get_stock_item_service,
+    get_stock_item_sync_service,
+    get_stock_movement_service,
+)
 from exceptions.exceptions import (
+    BatchSizeExceededException,
     CategoryNotFoundException,
+    InsufficientStockException,
+    InvalidImportFileException,
+    InvalidSyncTokenException,
+    QueryLimitExceededException,
+    StockForecastNotFoundException,
     StockItemAlreadyExistsException,
     StockItemNotFoundException,
+    VersionMismatchException,
 )
 from models.models import (
+    AdjustStockItemQuantityDto,
+    CreateJobDto,
     CreateStockItemDto,
+    FuzzySearchQuery,
+    LowStockPageDto,
+    LowStockQuery,
+    NameSuggestionListDto,
+    NameSuggestionQuery,
     PagedResult,
+    ReadJobDto,
+    ReadStockForecastDto,
     ReadStockItemDto,
+    ReadStockItemListDto,
+    StockItemBatchDto,
+    StockItemAnalyticsDto,
+    StockItemAnalyticsQuery,
+    StockItemBatchResultDto,
+    StockBalanceDto,
+    StockItemChangesDto,
+    StockItemChangesQuery,
+    StockItemImportReportDto,
+    StockItemMatchListDto,
     StockItemQuery,
+    StockMovementHistoryQuery,
+    StockMovementPageDto,
     UpdateStockItemDto,
 )
+from jobs.job_runner import get_job_runner
+from search.name_index import get_name_index
+from search.trigram_index import get_trigram_index
+from serialization.orjson_response import ORJSONResponse
+from services.job_service import JobService
+from services.low_stock_service import LowStockService
+from services.stock_forecast_service import StockForecastService
+from services.stock_item_analytics_service import StockItemAnalyticsService
+from services.stock_item_import_service import StockItemImportService
 from services.stock_item_service import StockItemService
+from services.stock_item_sync_service import StockItemSyncService
+from services.stock_movement_service import StockMovementService
 
 router = APIRouter(prefix="/stock-items", tags=["stock-items"])
 
 service_dependency = Annotated[StockItemService, Depends(get_stock_item_service)]
 user_dependency = Annotated[dict, Depends(get_current_user)]
+movement_service_dependency = Annotated[
+    StockMovementService, Depends(get_stock_movement_service)
+]
+import_service_dependency = Annotated[
+    StockItemImportService, Depends(get_stock_item_import_service)
+]
+job_service_dependency = Annotated[JobService, Depends(get_job_service)]
+sync_service_dependency = Annotated[
+    StockItemSyncService, Depends(get_stock_item_sync_service)
+]
+analytics_service_dependency = Annotated[
+    StockItemAnalyticsService, Depends(get_stock_item_analytics_service)
+]
+low_stock_service_dependency = Annotated[
+    LowStockService, Depends(get_low_stock_service)
+]
+forecast_service_dependency = Annotated[
+    StockForecastService, Depends(get_stock_forecast_service)
+]
+
+app_settings = get_app_settings()
+
+
+@router.get(
+    "/changes", response_model=StockItemChangesDto, status_code=status.HTTP_200_OK
+)
+async def read_stock_item_changes(
+    changes_query: Annotated[StockItemChangesQuery, Query()],
+    user: user_dependency,
+    service: sync_service_dependency,
+):
+    """
+    Return stock items created, modified or deleted since a sync token.
+    Args:
+        changes_query (StockItemChangesQuery): Sync token and page size.
+        user: Current user dependency.
+        service: Stock item sync service dependency.
+    Returns:
+        StockItemChangesDto: Changed items, deleted IDs and the next sync token.
+    Raises:
+        HTTPException: If the sync token is invalid.
+    """
+    try:
+        changes = service.get_changes(changes_query)
+    except InvalidSyncTokenException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return changes
+
+
+@router.get(
+    "/batch", response_model=StockItemBatchResultDto, status_code=status.HTTP_200_OK
+)
+async def read_stock_items_batch(
+    batch_query: Annotated[StockItemBatchDto, Query()],
+    user: user_dependency,
+    service: service_dependency,
+):
+    """
+    Return several stock items by ID, e.g. ?ids=3,1,2.
+    Args:
+        batch_query (StockItemBatchDto): IDs of the stock items.
+        user: Current user dependency.
+        service: Stock item service dependency.
+    Returns:
+        StockItemBatchResultDto: Found stock items in the requested order and missing IDs.
+    Raises:
+        HTTPException: If too many IDs are requested.
+    """
+    return _get_stock_items_batch(service, batch_query)
+
+
+@router.post(
+    "/batch", response_model=StockItemBatchResultDto, status_code=status.HTTP_200_OK
+)
+async def read_stock_items_batch_by_body(
+    batch: StockItemBatchDto,
+    user: user_dependency,
+    service: service_dependency,
+):
+    """
+    Return several stock items by ID, for ID lists too long for a query string.
+    Args:
+        batch (StockItemBatchDto): IDs of the stock items.
+        user: Current user dependency.
+        service: Stock item service dependency.
+    Returns:
+        StockItemBatchResultDto: Found stock items in the requested order and missing IDs.
+    Raises:
+        HTTPException: If too many IDs are requested.
+    """
+    return _get_stock_items_batch(service, batch)
+
+
+def _get_stock_items_batch(service: StockItemService, batch: StockItemBatchDto):
+    try:
+        stock_items = service.get_stock_items_by_ids(batch.ids)
+    except BatchSizeExceededException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if app_settings.fast_serialization:
+        return ORJSONResponse(stock_items)
+    return stock_items
+
+
+@router.get(
+    "/suggest", response_model=NameSuggestionListDto, status_code=status.HTTP_200_OK
+)
+async def suggest_names(
+    suggestion_query: Annotated[NameSuggestionQuery, Query()],
+    user: user_dependency,
+):
+    """
+    Return stock item and item category names starting with a prefix, e.g. for
+    autocompletion. Served from the in-memory name index without querying the database.
+    Args:
+        suggestion_query (NameSuggestionQuery): Prefix and maximum number of suggestions.
+        user: Current user dependency.
+    Returns:
+        NameSuggestionListDto: Matching names in alphabetical order.
+    """
+    return {
+        "data": get_name_index().search(suggestion_query.prefix, suggestion_query.limit)
+    }
+
+
+@router.get(
+    "/search", response_model=StockItemMatchListDto, status_code=status.HTTP_200_OK
+)
+async def search_stock_items(
+    search_query: Annotated[FuzzySearchQuery, Query()],
+    user: user_dependency,
+):
+    """
+    Return stock items with names similar to a possibly misspelled name, most similar
+    first. Served from the in-memory trigram index without querying the database,
+    use /batch to read the found stock items.
+    Args:
+        search_query (FuzzySearchQuery): Searched name and maximum number of matches.
+        user: Current user dependency.
+    Returns:
+        StockItemMatchListDto: Matching stock items with their similarity.
+    """
+    return {"data": get_trigram_index().search(search_query.name, search_query.limit)}
+
+
+@router.get(
+    "/analytics", response_model=StockItemAnalyticsDto, status_code=status.HTTP_200_OK
+)
+def read_stock_item_analytics(
+    analytics_query: Annotated[StockItemAnalyticsQuery, Query()],
+    user: user_dependency,
+    service: analytics_service_dependency,
+):
+    """
+    Return statistics of stock item quantities in total and per category: item counts,
+    total quantities, stock items out of stock, quantity percentiles and distribution.
+    Computed in memory from all stock items and cached until the next stock write.
+    Runs in the threadpool, as computing uncached statistics blocks while stock items are read.
+    Args:
+        analytics_query (StockItemAnalyticsQuery): Selection of the analysed stock items.
+        user: Current user dependency.
+        service: Stock item analytics service dependency.
+    Returns:
+        StockItemAnalyticsDto: Statistics in total and per category.
+    Raises:
+        HTTPException: If the selected category is not found.
+    """
+    try:
+        return service.get_stock_item_analytics(analytics_query)
+    except CategoryNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@router.get(
+    "/low-stock", response_model=LowStockPageDto, status_code=status.HTTP_200_OK
+)
+async def read_low_stock_items(
+    low_stock_query: Annotated[LowStockQuery, Query()],
+    user: user_dependency,
+    service: low_stock_service_dependency,
+):
+    """
+    Return stock items whose quantity is below their reorder threshold, ordered by ID,
+    with keyset pagination. Served from the low stock item table maintained by stock
+    item writes, stock items are not scanned.
+    Args:
+        low_stock_query (LowStockQuery): Cursor, category and page size.
+        user: Current user dependency.
+        service: Low stock service dependency.
+    Returns:
+        LowStockPageDto: Stock items on the page and the cursor of the next page.
+    """
+    return service.get_low_stock_items(low_stock_query)
+
+
+@router.get("/export", response_class=StreamingResponse, status_code=status.HTTP_200_OK)
+async def export_stock_items(
+    filter_query: Annotated[StockItemQuery, Query()],
+    user: user_dependency,
+    service: service_dependency,
+):
+    """
+    Stream all stock items matching the filters as CSV in the format read by the import,
+    e.g. for reading more stock items than the list endpoint returns in one page.
+    Pagination and field selection are ignored, sorting is applied.
+    Args:
+        filter_query (StockItemQuery): Filtering and sorting options.
+        user: Current user dependency.
+        service: Stock item service dependency.
+    Returns:
+        StreamingResponse: The text/csv response.
+    """
+    return StreamingResponse(
+        service.export_stock_items(filter_query),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="stock_items.csv"'},
+    )
 
 
 @router.get(
     "/{stock_item_id}", response_model=ReadStockItemDto, status_code=status.HTTP_200_OK
 )
 async def read_stock_item(
-    user: user_dependency, service: service_dependency, stock_item_id: int = Path(gt=0)
+    user: user_dependency,
+    service: service_dependency,
+    response: Response,
+    stock_item_id: int = Path(gt=0),
 ):
     """
-    Return a stock item by ID.
+    Return a stock item by ID with its version in the ETag header.
     Args:
         user: Current user dependency.
         service: Stock item service dependency.
+        response (Response): Response used to set the ETag header.
         stock_item_id (int): ID of the stock item to return.
     Returns:
         ReadStockItemDto: Stock item data.
@@ -41,33 +327,95 @@ async def read_stock_item(
         HTTPException: If stock item is not found.
     """
     try:
+        if app_settings.fast_serialization:
+            stock_item, version = service.get_stock_item_row_by_id(stock_item_id)
+            return ORJSONResponse(stock_item, headers={"ETag": format_etag(version)})
         stock_item_model = service.get_stock_item_by_id(stock_item_id)
     except StockItemNotFoundException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    response.headers["ETag"] = format_etag(stock_item_model.version)
     return stock_item_model
 
 
 @router.get(
-    "", response_model=PagedResult[ReadStockItemDto], status_code=status.HTTP_200_OK
+    "",
+    response_model=PagedResult[ReadStockItemListDto],
+    response_model_exclude_unset=True,
+    status_code=status.HTTP_200_OK,
 )
 async def read_all_stock_items(
     filter_query: Annotated[StockItemQuery, Query()],
     user: user_dependency,
     service: service_dependency,
+    request: Request,
 ):
     """
-    Return a paginated list of stock items with optional filtering.
+    Return a paginated list of stock items with optional filtering and field selection.
+    Identical concurrent requests of users with the same role share one query and
+    serialized response.
     Args:
-        filter_query (StockItemQuery): Filtering and pagination options.
+        filter_query (StockItemQuery): Filtering, field selection and pagination options.
         user: Current user dependency.
         service: Stock item service dependency.
+        request (Request): The incoming request.
     Returns:
-        PagedResult[ReadStockItemDto]: Paginated stock item data.
+        PagedResult[ReadStockItemListDto]: Paginated stock item data with the selected fields.
+    Raises:
+        HTTPException: If the page size or the estimated cost of the query is too big,
+            with a Link header to the export of the same stock items.
     """
-    stock_items = service.get_all_stock_items(filter_query)
+    try:
+        if app_settings.request_coalescing_enabled:
+            # Return the connection used to authenticate the user to the pool, so requests
+            # waiting for a shared execution do not hold connections
+            service.db.close()
+            body = await get_single_flight().run(
+                "stock-items",
+                (
+                    request.url.path,
+                    filter_query.model_dump_json(),
+                    user["role"]["name"],
+                ),
+                _serialize_stock_items_page,
+                service,
+                filter_query,
+            )
+            return Response(body, media_type="application/json")
+        if app_settings.fast_serialization:
+            return ORJSONResponse(service.get_all_stock_items_rows(filter_query))
+        stock_items = service.get_all_stock_items(filter_query)
+    except QueryLimitExceededException as e:
+        export_url = "/api/v1/stock-items/export"
+        export_query = urlencode(
+            [
+                (name, value)
+                for name, value in request.query_params.multi_items()
+                if name not in ("page", "page_size", "fields")
+            ]
+        )
+        if export_query:
+            export_url = f"{export_url}?{export_query}"
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+            headers={"Link": f'<{export_url}>; rel="alternate"; type="text/csv"'},
+        )
     return stock_items
 
 
+def _serialize_stock_items_page(
+    service: StockItemService, filter_query: StockItemQuery
+) -> bytes:
+    if app_settings.fast_serialization:
+        return ORJSONResponse(service.get_all_stock_items_rows(filter_query)).body
+    return (
+        PagedResult[ReadStockItemListDto]
+        .model_validate(service.get_all_stock_items(filter_query), from_attributes=True)
+        .model_dump_json(exclude_unset=True)
+        .encode()
+    )
+
+
 @router.post("", status_code=status.HTTP_201_CREATED)
 async def create_stock_item(
     user: user_dependency,
@@ -86,7 +434,9 @@ async def create_stock_item(
         HTTPException: If stock item already exists or category not found.
     """
     try:
-        created_stock_item = service.create_stock_item(create_stock_item_dto)
+        created_stock_item = service.create_stock_item(
+            create_stock_item_dto, user["id"]
+        )
     except StockItemAlreadyExistsException as e:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     except CategoryNotFoundException as e:
@@ -94,12 +444,62 @@ async def create_stock_item(
     return f"api/v1/stock-items/{created_stock_item.id}"
 
 
+@router.post(
+    "/import",
+    response_model=StockItemImportReportDto | ReadJobDto,
+    status_code=status.HTTP_200_OK,
+)
+def import_stock_items(
+    user: user_dependency,
+    service: import_service_dependency,
+    job_service: job_service_dependency,
+    response: Response,
+    file: UploadFile,
+    background: bool = Query(False),
+):
+    """
+    Import stock items from an uploaded UTF-8 CSV file with the columns name,
+    description (optional), quantity and category (category name).
+    Runs in the threadpool, as the import blocks until the whole file is processed.
+    Args:
+        user: Current user dependency.
+        service: Stock item import service dependency.
+        job_service: Job service dependency.
+        response (Response): Response used to set the status of background imports.
+        file (UploadFile): The CSV file.
+        background (bool): Whether to import in a background job instead.
+    Returns:
+        StockItemImportReportDto | ReadJobDto: The import report, or with background=true
+            the queued job (202) whose result is the report.
+    Raises:
+        HTTPException: If the file is not UTF-8 CSV with the required columns.
+    """
+    if background:
+        file_name = service.save_import_file(file.file)
+        job = job_service.create_job(
+            CreateJobDto(
+                job_type="import_stock_items",
+                parameters={"file_name": file_name, "user_id": user["id"]},
+            ),
+            user["id"],
+        )
+        get_job_runner().submit(job.id)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return job
+    try:
+        report = service.import_stock_items(file.file, user["id"])
+    except InvalidImportFileException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return report
+
+
 @router.put("/{stock_item_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def update_stock_item(
     user: user_dependency,
     service: service_dependency,
     update_stock_item: UpdateStockItemDto,
     stock_item_id: int = Path(gt=0),
+    if_match: Annotated[str | None, Header()] = None,
 ):
     """
     Update an existing stock item.
@@ -108,19 +508,27 @@ async def update_stock_item(
         service: Stock item service dependency.
         update_stock_item (UpdateStockItemDto): Data to update.
         stock_item_id (int): ID of the stock item to update.
+        if_match (str | None): Optional ETag the stock item is expected to have.
     Returns:
         str: Update confirmation message.
     Raises:
-        HTTPException: If stock item not found, category not found, or stock item already exists.
+        HTTPException: If stock item not found, category not found, stock item already exists
+            or the stock item was modified since the given ETag.
     """
     try:
-        service.update_stock_item(stock_item_id, update_stock_item)
+        service.update_stock_item(
+            stock_item_id, update_stock_item, user["id"], parse_if_match(if_match)
+        )
     except StockItemNotFoundException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except CategoryNotFoundException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except StockItemAlreadyExistsException as e:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except VersionMismatchException as e:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED, detail=str(e)
+        )
     return f"StockItem with id={stock_item_id} updated."
 
 
@@ -137,10 +545,126 @@ async def delete_stock_item(
     Returns:
         str: Deletion confirmation message.
     Raises:
-        HTTPException: If stock item not found.
+        HTTPException: If stock item not found or was modified while being deleted.
     """
     try:
-        service.delete_stock_item(stock_item_id)
+        service.delete_stock_item(stock_item_id, user["id"])
     except StockItemNotFoundException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except VersionMismatchException as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     return f"StockItem with id={stock_item_id} deleted."
+
+
+@router.post(
+    "/{stock_item_id}/adjust",
+    response_model=ReadStockItemDto,
+    status_code=status.HTTP_200_OK,
+)
+async def adjust_stock_item_quantity(
+    user: user_dependency,
+    service: service_dependency,
+    adjust_dto: AdjustStockItemQuantityDto,
+    stock_item_id: int = Path(gt=0),
+):
+    """
+    Change the quantity of a stock item by a delta.
+    Args:
+        user: Current user dependency.
+        service: Stock item service dependency.
+        adjust_dto (AdjustStockItemQuantityDto): Quantity delta and reason.
+        stock_item_id (int): ID of the stock item to adjust.
+    Returns:
+        ReadStockItemDto: Adjusted stock item data.
+    Raises:
+        HTTPException: If stock item not found or quantity would become negative.
+    """
+    try:
+        stock_item = service.adjust_stock_item_quantity(
+            stock_item_id, adjust_dto, user["id"]
+        )
+    except StockItemNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except InsufficientStockException as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return stock_item
+
+
+@router.get(
+    "/{stock_item_id}/history",
+    response_model=StockMovementPageDto,
+    status_code=status.HTTP_200_OK,
+)
+async def read_stock_item_history(
+    history_query: Annotated[StockMovementHistoryQuery, Query()],
+    user: user_dependency,
+    service: movement_service_dependency,
+    stock_item_id: int = Path(gt=0),
+):
+    """
+    Return quantity changes of a stock item, newest first, with keyset pagination.
+    History is kept after the stock item is deleted.
+    Args:
+        history_query (StockMovementHistoryQuery): Cursor and page size.
+        user: Current user dependency.
+        service: Stock movement service dependency.
+        stock_item_id (int): ID of the stock item.
+    Returns:
+        StockMovementPageDto: Movements and the cursor of the next page.
+    """
+    return service.get_stock_item_history(stock_item_id, history_query)
+
+
+@router.get(
+    "/{stock_item_id}/balance",
+    response_model=StockBalanceDto,
+    status_code=status.HTTP_200_OK,
+)
+async def read_stock_item_balance(
+    user: user_dependency,
+    service: movement_service_dependency,
+    at: datetime,
+    stock_item_id: int = Path(gt=0),
+):
+    """
+    Return the quantity of a stock item at a point in time.
+    Args:
+        user: Current user dependency.
+        service: Stock movement service dependency.
+        at (datetime): Point in time.
+        stock_item_id (int): ID of the stock item.
+    Returns:
+        StockBalanceDto: Quantity in stock at that time.
+    """
+    balance = service.get_balance_at(stock_item_id, at)
+    return {"stock_item_id": stock_item_id, "at": at, "balance": balance}
+
+
+@router.get(
+    "/{stock_item_id}/forecast",
+    response_model=ReadStockForecastDto,
+    status_code=status.HTTP_200_OK,
+)
+async def read_stock_item_forecast(
+    user: user_dependency,
+    service: forecast_service_dependency,
+    stock_item_id: int = Path(gt=0),
+):
+    """
+    Return the consumption forecast of a stock item computed by the latest
+    compute_stock_forecasts job.
+    Args:
+        user: Current user dependency.
+        service: Stock forecast service dependency.
+        stock_item_id (int): ID of the stock item.
+    Returns:
+        ReadStockForecastDto: Consumption rates, days until stockout and suggested
+            reorder quantity.
+    Raises:
+        HTTPException: If the stock item is not found or its forecast was not computed yet.
+    """
+    try:
+        stock_forecast = service.get_stock_forecast(stock_item_id)
+    except StockForecastNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return stock_forecast
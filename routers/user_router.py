@@ -1,12 +1,24 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Path,
+    Query,
+    Response,
+    status,
+)
 
+from concurrency.etag import format_etag, parse_if_match
 from dependencies.dependencies import get_current_user, get_user_service
 from exceptions.exceptions import (
+    QueryLimitExceededException,
     RoleNotFoundException,
     UserAlreadyExistsException,
     UserNotFoundException,
+    VersionMismatchException,
 )
 from models.models import (
     CreateUserDto,
@@ -25,13 +37,17 @@ user_dependency = Annotated[dict, Depends(get_current_user)]
 
 @router.get("/{user_id}", response_model=ReadUserDto, status_code=status.HTTP_200_OK)
 async def read_user(
-    user: user_dependency, service: service_dependency, user_id: int = Path(gt=0)
+    user: user_dependency,
+    service: service_dependency,
+    response: Response,
+    user_id: int = Path(gt=0),
 ):
     """
-    Return a user by ID.
+    Return a user by ID with its version in the ETag header.
     Args:
         user: Current user dependency.
         service: User service dependency.
+        response (Response): Response used to set the ETag header.
         user_id (int): ID of the user to return.
     Returns:
         ReadUserDto: User data.
@@ -42,6 +58,7 @@ async def read_user(
         get_user = service.get_user_by_id(user_id)
     except UserNotFoundException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    response.headers["ETag"] = format_etag(get_user.version)
     return get_user
 
 
@@ -59,8 +76,13 @@ async def read_users(
         service: User service dependency.
     Returns:
         PagedResult[ReadUserDto]: Paginated user data.
+    Raises:
+        HTTPException: If the page size or the estimated cost of the query is too big.
     """
-    users = service.get_all_users(filter_query)
+    try:
+        users = service.get_all_users(filter_query)
+    except QueryLimitExceededException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     return users
 
@@ -95,6 +117,7 @@ async def update_user(
     service: service_dependency,
     update_user: UpdateUserDto,
     user_id: int = Path(gt=0),
+    if_match: Annotated[str | None, Header()] = None,
 ):
     """
     Update an existing user.
@@ -103,19 +126,25 @@ async def update_user(
         service: User service dependency.
         update_user (UpdateUserDto): Data to update.
         user_id (int): ID of the user to update.
+        if_match (str | None): Optional ETag the user is expected to have.
     Returns:
         str: Update confirmation message.
     Raises:
-        HTTPException: If user not found, role not found, or user already exists.
+        HTTPException: If user not found, role not found, user already exists
+            or the user was modified since the given ETag.
     """
     try:
-        service.update_user(user_id, update_user)
+        service.update_user(user_id, update_user, parse_if_match(if_match))
     except UserNotFoundException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except RoleNotFoundException as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except UserAlreadyExistsException as e:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except VersionMismatchException as e:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED, detail=str(e)
+        )
     return f"User with id={user_id} updated."
 
 
@@ -132,10 +161,12 @@ async def delete_user(
     Returns:
         str: Deletion confirmation message.
     Raises:
-        HTTPException: If user not found.
+        HTTPException: If user not found or was modified while being deleted.
     """
     try:
         service.delete_user(user_id)
     except UserNotFoundException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except VersionMismatchException as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     return f"User with id={user_id} deleted."
@@ -0,0 +1,159 @@
+"""
+In-process sorted index of stock item and item category names for prefix suggestions.
+"""
+
+import threading
+from bisect import bisect_left, insort
+from typing import Iterable
+
+from sqlalchemy.orm import Session
+
+from database_settings import SessionLocal
+from models.entities import ItemCategory, StockItem
+
+# Separates the parts of an index entry, names never contain it
+SEPARATOR = "\x00"
+KIND_CODES = {"stock_item": "i", "category": "c"}
+KIND_NAMES = {code: kind for kind, code in KIND_CODES.items()}
+
+
+class NamePrefixIndex:
+    """
+    Keeps the names of stock items and item categories in one sorted list of strings
+    "<casefolded name>\\0<kind code><id>\\0<name>", a single string object per name.
+    Names starting with a prefix are a contiguous run of the list found by bisection,
+    so a lookup reads only the returned entries. Inserts and removals shift the list
+    in memory, which is fast enough for the write rate of the catalog.
+
+    The index only sees the changes made by the current process, with several
+    workers the names written by other workers appear after their next load.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty NamePrefixIndex.
+        """
+        self._entries = []
+        self._lock = threading.Lock()
+
+    def load(self, db: Session | None = None):
+        """
+        Replace the index with the names of all stock items and item categories.
+        Args:
+            db (Session | None): SQLAlchemy session, a new session is used if not given.
+        """
+        if db is None:
+            with SessionLocal() as db:
+                return self.load(db)
+        stock_items = db.query(StockItem.id, StockItem.name).yield_per(10_000)
+        categories = db.query(ItemCategory.id, ItemCategory.name)
+        entries = [
+            _entry("stock_item", entity_id, name) for entity_id, name in stock_items
+        ]
+        entries.extend(
+            _entry("category", entity_id, name) for entity_id, name in categories
+        )
+        entries.sort()
+        with self._lock:
+            self._entries = entries
+
+    def add(self, kind: str, entity_id: int, name: str):
+        """
+        Add a name, does nothing if it is already indexed.
+        Args:
+            kind (str): "stock_item" or "category".
+            entity_id (int): ID of the stock item or category.
+            name (str): The name.
+        """
+        entry = _entry(kind, entity_id, name)
+        with self._lock:
+            position = bisect_left(self._entries, entry)
+            if position == len(self._entries) or self._entries[position] != entry:
+                self._entries.insert(position, entry)
+
+    def add_many(self, kind: str, names: Iterable[tuple[int, str]]):
+        """
+        Add several names of the same kind.
+        Args:
+            kind (str): "stock_item" or "category".
+            names (Iterable[tuple[int, str]]): IDs and names.
+        """
+        entries = [_entry(kind, entity_id, name) for entity_id, name in names]
+        with self._lock:
+            for entry in entries:
+                insort(self._entries, entry)
+
+    def remove(self, kind: str, entity_id: int, name: str):
+        """
+        Remove a name, does nothing if it is not indexed.
+        Args:
+            kind (str): "stock_item" or "category".
+            entity_id (int): ID of the stock item or category.
+            name (str): The indexed name.
+        """
+        entry = _entry(kind, entity_id, name)
+        with self._lock:
+            position = bisect_left(self._entries, entry)
+            if position < len(self._entries) and self._entries[position] == entry:
+                del self._entries[position]
+
+    def rename(self, kind: str, entity_id: int, previous_name: str, name: str):
+        """
+        Replace the indexed name of a stock item or category.
+        Args:
+            kind (str): "stock_item" or "category".
+            entity_id (int): ID of the stock item or category.
+            previous_name (str): The indexed name.
+            name (str): The new name.
+        """
+        if previous_name != name:
+            self.remove(kind, entity_id, previous_name)
+            self.add(kind, entity_id, name)
+
+    def search(self, prefix: str, limit: int) -> list[dict]:
+        """
+        Return names starting with a prefix, ignoring case, in alphabetical order.
+        Args:
+            prefix (str): The prefix.
+            limit (int): Maximum number of returned names.
+        Returns:
+            list[dict]: Kind, ID and name of every match.
+        """
+        key = prefix.casefold()
+        with self._lock:
+            position = bisect_left(self._entries, key)
+            candidates = self._entries[position : position + limit]
+        suggestions = []
+        for entry in candidates:
+            if not entry.startswith(key):
+                break
+            _, kind_id, name = entry.split(SEPARATOR, 2)
+            suggestions.append(
+                {"type": KIND_NAMES[kind_id[0]], "id": int(kind_id[1:]), "name": name}
+            )
+        return suggestions
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _entry(kind: str, entity_id: int, name: str) -> str:
+    return f"{name.casefold()}{SEPARATOR}{KIND_CODES[kind]}{entity_id}{SEPARATOR}{name}"
+
+
+_name_index = None
+_name_index_lock = threading.Lock()
+
+
+def get_name_index() -> NamePrefixIndex:
+    """
+    Return the process wide name index, creating it empty on first use.
+    Returns:
+        NamePrefixIndex: The name index.
+    """
+    global _name_index
+    if _name_index is None:
+        with _name_index_lock:
+            if _name_index is None:
+                _name_index = NamePrefixIndex()
+    return _name_index
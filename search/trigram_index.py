@@ -0,0 +1,294 @@
+"""
+In-process trigram index of stock item names for typo tolerant search.
+"""
+
+import heapq
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from operator import itemgetter
+from typing import Iterable
+
+from sqlalchemy.orm import Session
+
+from app_settings import get_app_settings
+from database_settings import SessionLocal
+from logger.logger import logger
+from models.entities import StockItem
+
+WORD_PATTERN = re.compile(r"\w+")
+# Candidates rescored per returned match
+CANDIDATES_PER_MATCH = 5
+
+
+def word_trigrams(word: str) -> set[str]:
+    """
+    Return the trigrams of a casefolded word padded with two spaces in front and one
+    after, so the beginning of the word weighs more, like in PostgreSQL pg_trgm.
+    Args:
+        word (str): The word.
+    Returns:
+        set[str]: The distinct trigrams.
+    """
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def name_trigrams(name: str) -> set[str]:
+    """
+    Return the trigrams of all words of a name.
+    Args:
+        name (str): The name.
+    Returns:
+        set[str]: The distinct trigrams.
+    """
+    trigrams = set()
+    for word in WORD_PATTERN.findall(name.casefold()):
+        trigrams |= word_trigrams(word)
+    return trigrams
+
+
+def word_similarity(query: str, name: str) -> float:
+    """
+    Return how similar the words of a query are to the words of a name: the mean over
+    the query words of the trigram similarity to the most similar word of the name,
+    the shared trigrams divided by the distinct trigrams of both words. Word order and
+    words of the name missing in the query do not lower the similarity.
+    Args:
+        query (str): The searched name.
+        name (str): The compared name.
+    Returns:
+        float: The similarity, 0 to 1.
+    """
+    query_words = WORD_PATTERN.findall(query.casefold())
+    name_words = [word_trigrams(word) for word in WORD_PATTERN.findall(name.casefold())]
+    if not query_words or not name_words:
+        return 0.0
+    total = 0.0
+    for word in query_words:
+        trigrams = word_trigrams(word)
+        best = 0.0
+        for candidate_trigrams in name_words:
+            shared = len(trigrams & candidate_trigrams)
+            best = max(
+                best, shared / (len(trigrams) + len(candidate_trigrams) - shared)
+            )
+        total += best
+    return total / len(query_words)
+
+
+class TrigramIndex:
+    """
+    Inverted index from name trigrams to stock item IDs. Each posting list is an
+    array of unsigned 32 bit IDs in ascending order, 4 bytes per ID.
+
+    A search counts the trigrams each stock item shares with the query, reading the
+    posting lists from the rarest trigram and stopping after postings_budget IDs, so
+    very common trigrams do not make a query read most of the index. The items
+    sharing the most trigrams are ranked by word_similarity.
+
+    The index only sees the changes made by the current process, with several
+    workers the names written by other workers appear after their next load.
+    """
+
+    def __init__(self, postings_budget: int, min_similarity: float):
+        """
+        Initialize an empty TrigramIndex.
+        Args:
+            postings_budget (int): Maximum number of posting list entries read per search.
+            min_similarity (float): Minimum similarity of returned matches, 0 to 1.
+        """
+        self.postings_budget = postings_budget
+        self.min_similarity = min_similarity
+        self._names = {}
+        self._postings = {}
+        # Changes made while the index is loading, applied to the loaded index
+        self._pending_changes = None
+        self._lock = threading.Lock()
+
+    def load(self, db: Session | None = None):
+        """
+        Replace the index with the names of all stock items. Changes made while the
+        names are read are applied to the loaded index.
+        Args:
+            db (Session | None): SQLAlchemy session, a new session is used if not given.
+        """
+        if db is None:
+            with SessionLocal() as db:
+                return self.load(db)
+        with self._lock:
+            self._pending_changes = []
+        try:
+            names = {}
+            postings = defaultdict(lambda: array("I"))
+            rows = (
+                db.query(StockItem.id, StockItem.name)
+                .order_by(StockItem.id)
+                .yield_per(10_000)
+            )
+            for stock_item_id, name in rows:
+                names[stock_item_id] = name
+                for trigram in name_trigrams(name):
+                    postings[trigram].append(stock_item_id)
+        except Exception:
+            with self._lock:
+                self._pending_changes = None
+            raise
+        with self._lock:
+            self._names = names
+            self._postings = dict(postings)
+            for stock_item_id, name in self._pending_changes:
+                if name is None:
+                    self._remove(stock_item_id)
+                else:
+                    self._add(stock_item_id, name)
+            self._pending_changes = None
+
+    def load_in_background(self):
+        """
+        Load the index in a daemon thread, searches find nothing until it is loaded.
+        """
+        threading.Thread(
+            target=self._load_logging_errors, name="trigram-index-load", daemon=True
+        ).start()
+
+    def add(self, stock_item_id: int, name: str):
+        """
+        Index the name of a stock item, replacing its previously indexed name.
+        Args:
+            stock_item_id (int): ID of the stock item.
+            name (str): The name.
+        """
+        self.add_many([(stock_item_id, name)])
+
+    def add_many(self, names: Iterable[tuple[int, str]]):
+        """
+        Index the names of several stock items, replacing their previously indexed names.
+        Args:
+            names (Iterable[tuple[int, str]]): IDs and names of the stock items.
+        """
+        with self._lock:
+            for stock_item_id, name in names:
+                self._add(stock_item_id, name)
+                if self._pending_changes is not None:
+                    self._pending_changes.append((stock_item_id, name))
+
+    def remove(self, stock_item_id: int):
+        """
+        Remove a stock item from the index, does nothing if it is not indexed.
+        Args:
+            stock_item_id (int): ID of the stock item.
+        """
+        with self._lock:
+            self._remove(stock_item_id)
+            if self._pending_changes is not None:
+                self._pending_changes.append((stock_item_id, None))
+
+    def search(self, query: str, limit: int) -> list[dict]:
+        """
+        Return stock items with names similar to the query, most similar first.
+        Args:
+            query (str): The searched name, possibly misspelled.
+            limit (int): Maximum number of returned stock items.
+        Returns:
+            list[dict]: ID, name and similarity of every match.
+        """
+        query_trigrams = name_trigrams(query)
+        if not query_trigrams:
+            return []
+        with self._lock:
+            postings = sorted(
+                (self._postings.get(trigram, ()) for trigram in query_trigrams),
+                key=len,
+            )
+            shared_counts = Counter()
+            budget = self.postings_budget
+            for posting_list in postings:
+                if budget <= 0:
+                    break
+                shared_counts.update(posting_list[:budget])
+                budget -= len(posting_list)
+            candidates = [
+                (stock_item_id, self._names[stock_item_id])
+                for stock_item_id, _ in heapq.nlargest(
+                    limit * CANDIDATES_PER_MATCH,
+                    shared_counts.items(),
+                    key=itemgetter(1),
+                )
+            ]
+        matches = []
+        for stock_item_id, name in candidates:
+            similarity = word_similarity(query, name)
+            if similarity >= self.min_similarity:
+                matches.append(
+                    {
+                        "id": stock_item_id,
+                        "name": name,
+                        "similarity": round(similarity, 4),
+                    }
+                )
+        matches.sort(key=lambda match: (-match["similarity"], match["name"]))
+        return matches[:limit]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _load_logging_errors(self):
+        try:
+            self.load()
+        except Exception:
+            logger.exception("Failed to load the trigram index")
+
+    def _add(self, stock_item_id: int, name: str):
+        previous_name = self._names.get(stock_item_id)
+        previous_trigrams = (
+            name_trigrams(previous_name) if previous_name is not None else set()
+        )
+        trigrams = name_trigrams(name)
+        for trigram in previous_trigrams - trigrams:
+            self._remove_posting(trigram, stock_item_id)
+        for trigram in trigrams - previous_trigrams:
+            postings = self._postings.setdefault(trigram, array("I"))
+            postings.insert(bisect_left(postings, stock_item_id), stock_item_id)
+        self._names[stock_item_id] = name
+
+    def _remove(self, stock_item_id: int):
+        name = self._names.pop(stock_item_id, None)
+        if name is not None:
+            for trigram in name_trigrams(name):
+                self._remove_posting(trigram, stock_item_id)
+
+    def _remove_posting(self, trigram: str, stock_item_id: int):
+        postings = self._postings.get(trigram)
+        if postings is None:
+            return
+        position = bisect_left(postings, stock_item_id)
+        if position < len(postings) and postings[position] == stock_item_id:
+            del postings[position]
+            if not postings:
+                del self._postings[trigram]
+
+
+_trigram_index = None
+_trigram_index_lock = threading.Lock()
+
+
+def get_trigram_index() -> TrigramIndex:
+    """
+    Return the process wide trigram index, creating it empty on first use with the
+    limits set by FUZZY_SEARCH_POSTINGS_BUDGET and FUZZY_SEARCH_MIN_SIMILARITY.
+    Returns:
+        TrigramIndex: The trigram index.
+    """
+    global _trigram_index
+    if _trigram_index is None:
+        with _trigram_index_lock:
+            if _trigram_index is None:
+                app_settings = get_app_settings()
+                _trigram_index = TrigramIndex(
+                    app_settings.fuzzy_search_postings_budget,
+                    app_settings.fuzzy_search_min_similarity,
+                )
+    return _trigram_index
@@ -0,0 +1,22 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+    Used by the fast serialization path, where content is already a plain dict
+    and Pydantic validation of the response model is skipped.
+    """
+
+    def render(self, content: Any) -> bytes:
+        """
+        Serialize content to JSON bytes.
+        Args:
+            content (Any): Dict/list content made of JSON compatible values and datetimes.
+        Returns:
+            bytes: Encoded JSON document.
+        """
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,63 @@
+"""
+Direct row-to-dict mapping for stock items, producing the same JSON shape as ReadStockItemDto
+without running Pydantic validation.
+"""
+
+from models.entities import ItemCategory, StockItem
+from models.models import STOCK_ITEM_FIELDS
+
+CATEGORY_ROW_COLUMNS = (
+    ItemCategory.id,
+    ItemCategory.name,
+    ItemCategory.creation_date,
+    ItemCategory.last_modification_date,
+)
+
+
+def stock_item_row_columns(fields=STOCK_ITEM_FIELDS) -> list:
+    """
+    Return the columns to select for the given stock item fields.
+    Category columns come last and require ItemCategory to be joined.
+    Args:
+        fields (tuple): Field names in STOCK_ITEM_FIELDS order.
+    Returns:
+        list: SQLAlchemy columns to select.
+    """
+    columns = [getattr(StockItem, field) for field in fields if field != "category"]
+    if "category" in fields:
+        columns.extend(CATEGORY_ROW_COLUMNS)
+    return columns
+
+
+def stock_item_row_to_dict(row, fields=STOCK_ITEM_FIELDS) -> dict:
+    """
+    Map a row selected with stock_item_row_columns to a ReadStockItemDto shaped dict.
+    Args:
+        row: Result row with values ordered as stock_item_row_columns(fields).
+        fields (tuple): Field names in STOCK_ITEM_FIELDS order.
+    Returns:
+        dict: Stock item data with only the selected fields.
+    """
+    scalar_count = len(fields) - 1 if "category" in fields else len(fields)
+    stock_item = dict(zip(fields[:scalar_count], row[:scalar_count]))
+    if scalar_count < len(fields):
+        stock_item["category"] = {
+            "id": row[scalar_count],
+            "name": row[scalar_count + 1],
+            "creation_date": row[scalar_count + 2],
+            "last_modification_date": row[scalar_count + 3],
+        }
+    return stock_item
+
+
+def stock_item_to_dict(stock_item: StockItem, fields=STOCK_ITEM_FIELDS) -> dict:
+    """
+    Map a stock item loaded with load_only to a dict with only the selected fields,
+    so deferred columns are never touched.
+    Args:
+        stock_item (StockItem): The stock item object.
+        fields (tuple): Field names in STOCK_ITEM_FIELDS order.
+    Returns:
+        dict: Stock item data with only the selected fields.
+    """
+    return {field: getattr(stock_item, field) for field in fields}
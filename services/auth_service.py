@@ -6,7 +6,7 @@ from fastapi import HTTPException
 from jose import JWTError
 from starlette import status
 
-from app_settings import AppSettings
+from app_settings import get_app_settings
 from exceptions.exceptions import (
     InvalidCredentialsException,
     InvalidRoleException,
@@ -39,7 +39,7 @@ class AuthService:
         self.db = db
         self.user_service = UserService(db)
         self.role_service = RoleService(db)
-        self.app_settings = AppSettings()
+        self.app_settings = get_app_settings()
 
     def create_access_token(self, user: User):
         """
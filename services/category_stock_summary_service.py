@@ -0,0 +1,188 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from models.entities import CategoryStockSummary, ItemCategory, StockItem
+
+"""
+Service maintaining the per-category stock summary table used by dashboards.
+"""
+
+
+class CategoryStockSummaryService:
+    """
+    Provides incremental maintenance, reading and rebuilding of per-category stock totals.
+    Incremental changes are written without committing, so they share the caller's transaction.
+    """
+
+    def __init__(self, db: Session):
+        """
+        Initialize CategoryStockSummaryService with a database session.
+        Args:
+            db (Session): SQLAlchemy session object.
+        """
+        self.db = db
+
+    def create_category_stock_summary(self, category_id: int) -> None:
+        """
+        Add the zero summary row of a new category, so stock item writes only ever
+        update an existing row. The change is not committed.
+        Args:
+            category_id (int): The category's ID.
+        """
+        self.db.add(
+            CategoryStockSummary(
+                category_id=category_id,
+                item_count=0,
+                total_quantity=0,
+                last_modification_date=datetime.now(ZoneInfo("Europe/Warsaw")),
+            )
+        )
+
+    def apply_stock_change(
+        self, category_id: int, item_count_delta: int, quantity_delta: int
+    ) -> None:
+        """
+        Add deltas to the summary row of a category with a single upsert, so concurrent
+        first writes of a category without a row do not collide on its primary key.
+        The change is not committed.
+        Args:
+            category_id (int): The category's ID.
+            item_count_delta (int): Change of the number of stock items.
+            quantity_delta (int): Change of the total quantity.
+        """
+        if item_count_delta == 0 and quantity_delta == 0:
+            return
+        values = {
+            "category_id": category_id,
+            "item_count": item_count_delta,
+            "total_quantity": quantity_delta,
+            "last_modification_date": datetime.now(ZoneInfo("Europe/Warsaw")),
+        }
+        if self.db.get_bind().dialect.name == "sqlite":
+            statement = sqlite_insert(CategoryStockSummary).values(values)
+            statement = statement.on_conflict_do_update(
+                index_elements=[CategoryStockSummary.category_id],
+                set_={
+                    "item_count": CategoryStockSummary.item_count
+                    + statement.excluded.item_count,
+                    "total_quantity": CategoryStockSummary.total_quantity
+                    + statement.excluded.total_quantity,
+                    "last_modification_date": statement.excluded.last_modification_date,
+                },
+            )
+        else:
+            statement = mysql_insert(CategoryStockSummary).values(values)
+            statement = statement.on_duplicate_key_update(
+                item_count=CategoryStockSummary.item_count
+                + statement.inserted.item_count,
+                total_quantity=CategoryStockSummary.total_quantity
+                + statement.inserted.total_quantity,
+                last_modification_date=statement.inserted.last_modification_date,
+            )
+        self.db.execute(statement)
+
+    def delete_category_stock_summary(self, category_id: int) -> None:
+        """
+        Delete the summary row of a category. The change is not committed.
+        Args:
+            category_id (int): The category's ID.
+        """
+        self.db.query(CategoryStockSummary).filter(
+            CategoryStockSummary.category_id == category_id
+        ).delete(synchronize_session=False)
+
+    def get_category_stock_summary(self) -> list[dict]:
+        """
+        Return stock totals for every category, read from the summary table only.
+        Categories without a summary row are reported with zero totals.
+        Returns:
+            list[dict]: Category id, name, item count and total quantity per category.
+        """
+        rows = (
+            self.db.query(
+                ItemCategory.id,
+                ItemCategory.name,
+                CategoryStockSummary.item_count,
+                CategoryStockSummary.total_quantity,
+            )
+            .outerjoin(
+                CategoryStockSummary,
+                CategoryStockSummary.category_id == ItemCategory.id,
+            )
+            .order_by(ItemCategory.id)
+            .all()
+        )
+        return [
+            {
+                "category_id": category_id,
+                "category_name": category_name,
+                "item_count": item_count or 0,
+                "total_quantity": total_quantity or 0,
+            }
+            for category_id, category_name, item_count, total_quantity in rows
+        ]
+
+    def rebuild_category_stock_summary(self) -> list[dict]:
+        """
+        Recompute the summary table from stock items and commit it.
+        Returns:
+            list[dict]: Categories whose stored totals differed from the recomputed ones,
+            with stored and actual values.
+        """
+        actual = {
+            category_id: (item_count, total_quantity or 0)
+            for category_id, item_count, total_quantity in self.db.query(
+                StockItem.category_id,
+                func.count(StockItem.id),
+                func.sum(StockItem.quantity),
+            )
+            .group_by(StockItem.category_id)
+            .all()
+        }
+        stored = {
+            summary.category_id: summary
+            for summary in self.db.query(CategoryStockSummary).all()
+        }
+        category_ids = {
+            category_id for (category_id,) in self.db.query(ItemCategory.id)
+        }
+        current_date = datetime.now(ZoneInfo("Europe/Warsaw"))
+        mismatches = []
+        for category_id in sorted(category_ids | set(stored)):
+            item_count, total_quantity = actual.get(category_id, (0, 0))
+            summary = stored.get(category_id)
+            stored_totals = (
+                (summary.item_count, summary.total_quantity) if summary else (0, 0)
+            )
+            if stored_totals != (item_count, total_quantity):
+                mismatches.append(
+                    {
+                        "category_id": category_id,
+                        "stored_item_count": stored_totals[0],
+                        "stored_total_quantity": stored_totals[1],
+                        "item_count": item_count,
+                        "total_quantity": total_quantity,
+                    }
+                )
+            if category_id not in category_ids:
+                self.db.delete(summary)
+            elif summary is None:
+                self.db.add(
+                    CategoryStockSummary(
+                        category_id=category_id,
+                        item_count=item_count,
+                        total_quantity=total_quantity,
+                        last_modification_date=current_date,
+                    )
+                )
+            elif stored_totals != (item_count, total_quantity):
+                summary.item_count = item_count
+                summary.total_quantity = total_quantity
+                summary.last_modification_date = current_date
+        self.db.commit()
+        return mismatches
@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app_settings import get_app_settings
+from models.entities import IdempotencyKey
+
+"""
+Service for reserving Idempotency-Key values and storing the responses of their requests.
+"""
+
+
+class IdempotencyService:
+    """
+    Provides reservation, storage and expiry of idempotency keys. The primary key on
+    (user_id, key) guarantees that only one request per key is ever run, across workers.
+    """
+
+    def __init__(self, db: Session):
+        """
+        Initialize IdempotencyService with a database session.
+        Args:
+            db (Session): SQLAlchemy session object.
+        """
+        self.db = db
+        self.app_settings = get_app_settings()
+
+    def acquire_key(
+        self, user_id: int, key: str, request_hash: str
+    ) -> IdempotencyKey | None:
+        """
+        Reserve an idempotency key for a request. Expired keys are taken over, including
+        reservations not renewed for IDEMPOTENCY_LOCK_TIMEOUT, left behind by a crashed
+        request.
+        Args:
+            user_id (int): ID of the user making the request.
+            key (str): Value of the Idempotency-Key header.
+            request_hash (str): Hash of the request.
+        Returns:
+            IdempotencyKey | None: None if the key was reserved for this request,
+                otherwise the existing record, completed or still running.
+        """
+        current_date = self._now()
+        record = self.db.get(IdempotencyKey, (user_id, key))
+        if record is not None and record.expiration_date <= current_date:
+            self.db.delete(record)
+            self.db.commit()
+            record = None
+        if record is not None:
+            return record
+
+        self.db.add(
+            IdempotencyKey(
+                user_id=user_id,
+                key=key,
+                request_hash=request_hash,
+                creation_date=current_date,
+                expiration_date=current_date
+                + timedelta(seconds=self.app_settings.idempotency_lock_timeout),
+            )
+        )
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # Another worker reserved the key first
+            self.db.rollback()
+            return self.db.get(IdempotencyKey, (user_id, key))
+        return None
+
+    def renew_key(self, user_id: int, key: str):
+        """
+        Extend the reservation of a running request by IDEMPOTENCY_LOCK_TIMEOUT, so it is
+        not taken over as abandoned.
+        Args:
+            user_id (int): ID of the user who made the request.
+            key (str): Value of the Idempotency-Key header.
+        """
+        self.db.execute(
+            update(IdempotencyKey)
+            .where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.status_code.is_(None),
+            )
+            .values(
+                expiration_date=self._now()
+                + timedelta(seconds=self.app_settings.idempotency_lock_timeout)
+            )
+        )
+        self.db.commit()
+
+    def store_response(
+        self, user_id: int, key: str, status_code: int, headers: str, body: bytes
+    ):
+        """
+        Store the response of a reserved request so retries can replay it for
+        IDEMPOTENCY_KEY_TTL. A response already stored is kept.
+        Args:
+            user_id (int): ID of the user who made the request.
+            key (str): Value of the Idempotency-Key header.
+            status_code (int): Status code of the response.
+            headers (str): JSON encoded headers of the response.
+            body (bytes): Body of the response.
+        """
+        record = self.db.get(IdempotencyKey, (user_id, key))
+        if record is None or record.status_code is not None:
+            return
+        record.status_code = status_code
+        record.headers = headers
+        record.body = body
+        record.expiration_date = self._now() + timedelta(
+            seconds=self.app_settings.idempotency_key_ttl
+        )
+        self.db.commit()
+
+    def release_key(self, user_id: int, key: str):
+        """
+        Remove a reservation whose request failed, so a retry runs it again.
+        Args:
+            user_id (int): ID of the user who made the request.
+            key (str): Value of the Idempotency-Key header.
+        """
+        self.db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id, IdempotencyKey.key == key
+            )
+        )
+        self.db.commit()
+
+    def purge_expired_keys(self) -> int:
+        """
+        Delete all expired idempotency keys.
+        Returns:
+            int: Number of deleted keys.
+        """
+        result = self.db.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.expiration_date <= self._now())
+        )
+        self.db.commit()
+        return result.rowcount
+
+    @staticmethod
+    def _now() -> datetime:
+        # Dates are stored as naive Europe/Warsaw times
+        return datetime.now(ZoneInfo("Europe/Warsaw")).replace(tzinfo=None)
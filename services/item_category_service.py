@@ -3,10 +3,17 @@ from zoneinfo import ZoneInfo
 
 from sqlalchemy import and_
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 
+from app_settings import get_app_settings
+from caching.query_cache import get_query_cache
+from events.event_broadcaster import get_event_broadcaster
+from read_models.stock_item_read_model import get_stock_item_read_model
+from search.name_index import get_name_index
 from exceptions.exceptions import (
     CategoryAlreadyExistsException,
     CategoryNotFoundException,
+    VersionMismatchException,
 )
 from models.entities import ItemCategory
 from models.models import (
@@ -15,7 +22,8 @@ from models.models import (
     PagedResult,
     UpdateItemCategoryDto,
 )
-from paginate.paginate import paginate
+from paginate.paginate import check_query_limits, paginate
+from services.category_stock_summary_service import CategoryStockSummaryService
 
 """
 Service for managing item category operations, including CRUD, filtering, and business logic.
@@ -34,6 +42,12 @@ class ItemCategoryService:
             db (Session): SQLAlchemy session object.
         """
         self.db = db
+        self.app_settings = get_app_settings()
+        self.category_stock_summary_service = CategoryStockSummaryService(db)
+        self.event_broadcaster = get_event_broadcaster()
+        self.query_cache = get_query_cache()
+        self.name_index = get_name_index()
+        self.read_model = get_stock_item_read_model()
 
     def get_item_category_by_id(self, item_category_id: int) -> ItemCategory | None:
         """
@@ -56,6 +70,27 @@ class ItemCategoryService:
             )
         return item_category
 
+    def get_item_category_ids_by_name(self, name: str) -> list[int]:
+        """
+        Return the IDs of the item categories whose name contains the given text.
+        Results are cached until item categories change.
+        Args:
+            name (str): Text the item category names contain.
+        Returns:
+            list[int]: IDs of the matching item categories.
+        """
+        return self.query_cache.get_or_compute(
+            "item_category_ids",
+            ItemCategoryFilterQuery(name=name),
+            [ItemCategory.__tablename__],
+            lambda: [
+                item_category_id
+                for (item_category_id,) in self.db.query(ItemCategory.id).filter(
+                    ItemCategory.name.like(f"%{name}%")
+                )
+            ],
+        )
+
     def get_all_item_categories(
         self, filter_query: ItemCategoryFilterQuery
     ) -> PagedResult:
@@ -65,21 +100,20 @@ class ItemCategoryService:
             filter_query (ItemCategoryFilterQuery): Filtering and pagination options.
         Returns:
             PagedResult: Paginated result of item categories.
+        Raises:
+            QueryLimitExceededException: If the page size or the estimated cost of the query is too big.
         """
+        check_query_limits(
+            filter_query,
+            self.app_settings.max_page_sizes["item-categories"],
+            self.app_settings.query_cost_budget,
+        )
         query = self.db.query(ItemCategory).filter(and_(*filter_query.filter_list))
         total_count = query.count()
 
-        if filter_query.sort_by is not None and hasattr(
-            ItemCategory, filter_query.sort_by
-        ):
-            column = getattr(ItemCategory, filter_query.sort_by)
-            if filter_query.sort_direction == "asc":
-                query = query.order_by(column.asc())
-            else:
-                query = query.order_by(column.desc())
-
         item_categories = (
-            query.offset((filter_query.page - 1) * filter_query.page_size)
+            query.order_by(*filter_query.order_by)
+            .offset((filter_query.page - 1) * filter_query.page_size)
             .limit(filter_query.page_size)
             .all()
         )
@@ -129,8 +163,16 @@ class ItemCategoryService:
             item_category.creation_date = current_date
             item_category.last_modification_date = current_date
             self.db.add(item_category)
+            self.db.flush()
+            self.category_stock_summary_service.create_category_stock_summary(
+                item_category.id
+            )
             self.db.commit()
+            self.query_cache.invalidate(ItemCategory.__tablename__)
             self.db.refresh(item_category)
+            self.name_index.add("category", item_category.id, item_category.name)
+            self.read_model.apply_category(item_category)
+            self._publish_item_category_event("item_category.created", item_category)
             return item_category
         else:
             raise CategoryAlreadyExistsException(
@@ -141,18 +183,25 @@ class ItemCategoryService:
         self,
         category_id: int,
         update_item_category_dto: UpdateItemCategoryDto,
+        expected_version: int | None = None,
     ) -> ItemCategory:
         """
         Update an existing item category's information.
         Args:
             category_id (int): The item category's ID.
             update_item_category_dto (UpdateItemCategoryDto): Data to update.
+            expected_version (int | None): Version the update is based on, None to skip the check.
         Returns:
             ItemCategory: The updated item category object.
         Raises:
             CategoryAlreadyExistsException: If item category already exists.
+            VersionMismatchException: If the item category was changed since expected_version.
         """
         item_category = self.get_item_category_by_id(category_id)
+        if expected_version is not None and item_category.version != expected_version:
+            raise VersionMismatchException(
+                f"Item category with id={category_id} has version={item_category.version}, expected version={expected_version}"
+            )
         try:
             self.get_category_by_name(update_item_category_dto.name)
         except CategoryNotFoundException:
@@ -160,12 +209,27 @@ class ItemCategoryService:
                 update_item_category_dto.name
                 and item_category.name != update_item_category_dto.name
             ):
+                previous_name = item_category.name
                 item_category.name = update_item_category_dto.name
                 item_category.last_modification_date = datetime.now(
                     ZoneInfo("Europe/Warsaw")
                 )
-                self.db.commit()
+                try:
+                    self.db.commit()
+                except StaleDataError:
+                    self.db.rollback()
+                    raise VersionMismatchException(
+                        f"Item category with id={category_id} was modified concurrently"
+                    )
+                self.query_cache.invalidate(ItemCategory.__tablename__)
                 self.db.refresh(item_category)
+                self.name_index.rename(
+                    "category", item_category.id, previous_name, item_category.name
+                )
+                self.read_model.apply_category(item_category)
+                self._publish_item_category_event(
+                    "item_category.updated", item_category
+                )
         else:
             raise CategoryAlreadyExistsException(
                 f"Item category with name={update_item_category_dto.name} already exists"
@@ -179,11 +243,24 @@ class ItemCategoryService:
             category_id (int): The item category's ID.
         Returns:
             bool: True if deletion was successful.
+        Raises:
+            VersionMismatchException: If the item category was changed while being deleted.
         """
         item_category = self.get_item_category_by_id(category_id)
 
+        self.category_stock_summary_service.delete_category_stock_summary(category_id)
         self.db.delete(item_category)
-        self.db.commit()
+        try:
+            self.db.commit()
+        except StaleDataError:
+            self.db.rollback()
+            raise VersionMismatchException(
+                f"Item category with id={category_id} was modified concurrently"
+            )
+        self.query_cache.invalidate(ItemCategory.__tablename__)
+        self.name_index.remove("category", item_category.id, item_category.name)
+        self.read_model.remove_category(category_id)
+        self.event_broadcaster.publish("item_category.deleted", {"id": category_id})
         return True
 
     def check_if_table_is_empty(self) -> bool:
@@ -196,3 +273,15 @@ class ItemCategoryService:
         if query.count() == 0:
             return True
         return False
+
+    def _publish_item_category_event(
+        self, event_type: str, item_category: ItemCategory
+    ):
+        self.event_broadcaster.publish(
+            event_type,
+            {
+                "id": item_category.id,
+                "name": item_category.name,
+                "version": item_category.version,
+            },
+        )
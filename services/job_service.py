@@ -0,0 +1,305 @@
+import json
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app_settings import get_app_settings
+from exceptions.exceptions import (
+    InvalidJobStateException,
+    JobNotFoundException,
+    UnknownJobTypeException,
+)
+from jobs.job_handlers import JOB_HANDLERS
+from models.entities import Job
+from models.models import CreateJobDto, JobStatus
+
+"""
+Service for managing background jobs and their state transitions.
+"""
+
+
+class JobService:
+    """
+    Provides creation, cancellation and retry of background jobs for the API, and the
+    state transitions used by the job runner. Transitions started by workers are
+    conditional UPDATEs, so a job is never claimed by two workers.
+    """
+
+    def __init__(self, db: Session):
+        """
+        Initialize JobService with a database session.
+        Args:
+            db (Session): SQLAlchemy session object.
+        """
+        self.db = db
+        self.app_settings = get_app_settings()
+
+    def get_job_by_id(self, job_id: int) -> Job:
+        """
+        Return a job by its unique ID.
+        Args:
+            job_id (int): The job's ID.
+        Returns:
+            Job: The job object if found.
+        Raises:
+            JobNotFoundException: If job is not found.
+        """
+        job = self.db.query(Job).filter(Job.id == job_id).first()
+        if job is None:
+            raise JobNotFoundException(f"Job with id={job_id} not found")
+        return job
+
+    def create_job(
+        self, create_job_dto: CreateJobDto, user_id: int | None = None
+    ) -> Job:
+        """
+        Create a queued job.
+        Args:
+            create_job_dto (CreateJobDto): Job type, parameters and number of attempts.
+            user_id (int | None): ID of the user creating the job.
+        Returns:
+            Job: The created job object.
+        Raises:
+            UnknownJobTypeException: If no handler is registered for the job type.
+        """
+        if create_job_dto.job_type not in JOB_HANDLERS:
+            raise UnknownJobTypeException(
+                f"Unknown job type={create_job_dto.job_type}, available job types are: {', '.join(sorted(JOB_HANDLERS))}"
+            )
+        current_date = datetime.now(ZoneInfo("Europe/Warsaw"))
+        job = Job(
+            job_type=create_job_dto.job_type,
+            status=JobStatus.queued.value,
+            parameters=json.dumps(create_job_dto.parameters),
+            progress_current=0,
+            attempts=0,
+            max_attempts=create_job_dto.max_attempts,
+            cancel_requested=False,
+            user_id=user_id,
+            creation_date=current_date,
+            last_modification_date=current_date,
+        )
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def cancel_job(self, job_id: int) -> Job:
+        """
+        Cancel a queued job right away or request cancellation of a running one,
+        which its handler observes on the next progress report.
+        Args:
+            job_id (int): The job's ID.
+        Returns:
+            Job: The job object.
+        Raises:
+            JobNotFoundException: If job is not found.
+            InvalidJobStateException: If the job has already finished.
+        """
+        job = self.get_job_by_id(job_id)
+        current_date = datetime.now(ZoneInfo("Europe/Warsaw"))
+        result = self.db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JobStatus.queued.value)
+            .values(
+                status=JobStatus.cancelled.value,
+                finish_date=current_date,
+                last_modification_date=current_date,
+            )
+        )
+        if result.rowcount == 0:
+            result = self.db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == JobStatus.running.value)
+                .values(cancel_requested=True, last_modification_date=current_date)
+            )
+        if result.rowcount == 0:
+            self.db.rollback()
+            raise InvalidJobStateException(
+                f"Job with id={job_id} has status={job.status} and cannot be cancelled"
+            )
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def retry_job(self, job_id: int) -> Job:
+        """
+        Queue a failed or cancelled job again with a fresh number of attempts.
+        Args:
+            job_id (int): The job's ID.
+        Returns:
+            Job: The job object.
+        Raises:
+            JobNotFoundException: If job is not found.
+            InvalidJobStateException: If the job is neither failed nor cancelled.
+        """
+        job = self.get_job_by_id(job_id)
+        result = self.db.execute(
+            update(Job)
+            .where(
+                Job.id == job_id,
+                Job.status.in_([JobStatus.failed.value, JobStatus.cancelled.value]),
+            )
+            .values(
+                status=JobStatus.queued.value,
+                attempts=0,
+                cancel_requested=False,
+                error=None,
+                progress_current=0,
+                progress_total=None,
+                finish_date=None,
+                last_modification_date=datetime.now(ZoneInfo("Europe/Warsaw")),
+            )
+        )
+        if result.rowcount == 0:
+            self.db.rollback()
+            raise InvalidJobStateException(
+                f"Job with id={job_id} has status={job.status} and cannot be retried"
+            )
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def start_job(self, job_id: int) -> Job | None:
+        """
+        Claim a queued job for the current worker and start a new attempt.
+        Args:
+            job_id (int): The job's ID.
+        Returns:
+            Job | None: The started job, None if it is no longer queued.
+        """
+        current_date = datetime.now(ZoneInfo("Europe/Warsaw"))
+        result = self.db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JobStatus.queued.value)
+            .values(
+                status=JobStatus.running.value,
+                attempts=Job.attempts + 1,
+                start_date=current_date,
+                last_modification_date=current_date,
+            )
+        )
+        self.db.commit()
+        if result.rowcount == 0:
+            return None
+        return self.get_job_by_id(job_id)
+
+    def report_progress(
+        self, job_id: int, progress_current: int, progress_total: int | None
+    ) -> bool:
+        """
+        Store the progress of a running job.
+        Args:
+            job_id (int): The job's ID.
+            progress_current (int): Number of processed units of work.
+            progress_total (int | None): Total number of units of work, if known.
+        Returns:
+            bool: Whether cancellation of the job was requested.
+        """
+        self.db.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(
+                progress_current=progress_current,
+                progress_total=progress_total,
+                last_modification_date=datetime.now(ZoneInfo("Europe/Warsaw")),
+            )
+        )
+        self.db.commit()
+        return bool(
+            self.db.query(Job.cancel_requested).filter(Job.id == job_id).scalar()
+        )
+
+    def record_heartbeat(self, job_ids: list[int]):
+        """
+        Mark running jobs as alive, so they are not requeued as interrupted.
+        Args:
+            job_ids (list[int]): IDs of the jobs running in this process.
+        """
+        self.db.execute(
+            update(Job)
+            .where(Job.id.in_(job_ids), Job.status == JobStatus.running.value)
+            .values(last_modification_date=datetime.now(ZoneInfo("Europe/Warsaw")))
+        )
+        self.db.commit()
+
+    def finish_job(self, job_id: int, result):
+        """
+        Mark a running job as succeeded.
+        Args:
+            job_id (int): The job's ID.
+            result: JSON serializable result of the handler.
+        """
+        self._finish(
+            job_id, JobStatus.succeeded, result=json.dumps(result, default=str)
+        )
+
+    def cancel_running_job(self, job_id: int):
+        """
+        Mark a running job whose handler stopped on a cancellation request as cancelled.
+        Args:
+            job_id (int): The job's ID.
+        """
+        self._finish(job_id, JobStatus.cancelled)
+
+    def fail_job(self, job_id: int, error: str) -> bool:
+        """
+        Record a failed attempt, queueing the job again while attempts remain.
+        Args:
+            job_id (int): The job's ID.
+            error (str): Error of the attempt.
+        Returns:
+            bool: Whether the job was queued for another attempt.
+        """
+        job = self.get_job_by_id(job_id)
+        if job.attempts < job.max_attempts and not job.cancel_requested:
+            job.status = JobStatus.queued.value
+            job.error = error
+            job.last_modification_date = datetime.now(ZoneInfo("Europe/Warsaw"))
+            self.db.commit()
+            return True
+        self._finish(job_id, JobStatus.failed, error=error)
+        return False
+
+    def get_jobs_to_resume(self) -> list[int]:
+        """
+        Return queued jobs and requeue running jobs without a heartbeat for
+        JOB_STALE_TIMEOUT seconds, whose worker is assumed to have stopped.
+        Returns:
+            list[int]: IDs of the jobs to submit, oldest first.
+        """
+        stale_date = datetime.now(ZoneInfo("Europe/Warsaw")) - timedelta(
+            seconds=self.app_settings.job_stale_timeout
+        )
+        self.db.execute(
+            update(Job)
+            .where(
+                Job.status == JobStatus.running.value,
+                Job.last_modification_date <= stale_date,
+            )
+            .values(status=JobStatus.queued.value, error="Interrupted")
+        )
+        self.db.commit()
+        return [
+            job_id
+            for (job_id,) in self.db.query(Job.id)
+            .filter(Job.status == JobStatus.queued.value)
+            .order_by(Job.id)
+            .all()
+        ]
+
+    def _finish(self, job_id: int, status: JobStatus, **values):
+        current_date = datetime.now(ZoneInfo("Europe/Warsaw"))
+        self.db.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(
+                status=status.value,
+                finish_date=current_date,
+                last_modification_date=current_date,
+                **values,
+            )
+        )
+        self.db.commit()
@@ -0,0 +1,112 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from sqlalchemy.orm import Session
+
+from models.entities import LowStockItem, StockItem
+from models.models import LowStockQuery
+
+"""
+Service maintaining the set of stock items below their reorder threshold.
+"""
+
+LOW_STOCK_EVENT = "stock_item.low_stock"
+RESTOCKED_EVENT = "stock_item.restocked"
+
+
+def is_low_stock(quantity: int, reorder_threshold: int) -> bool:
+    """
+    Return whether a quantity is below a reorder threshold.
+    Args:
+        quantity (int): Quantity in stock.
+        reorder_threshold (int): The reorder threshold, 0 is never crossed.
+    Returns:
+        bool: True if the stock item is low on stock.
+    """
+    return quantity < reorder_threshold
+
+
+class LowStockService:
+    """
+    Provides incremental maintenance and reading of the low stock item table.
+    Stock item writes report the state before the change, a row is only written when
+    the quantity or the threshold made the item cross its threshold, so low stock items
+    are never found by scanning stock items.
+    Changes are written without committing, so they share the caller's transaction.
+    """
+
+    def __init__(self, db: Session):
+        """
+        Initialize LowStockService with a database session.
+        Args:
+            db (Session): SQLAlchemy session object.
+        """
+        self.db = db
+
+    def apply_stock_change(self, stock_item: StockItem, was_low: bool) -> str | None:
+        """
+        Add a stock item to the low stock items or remove it if its quantity or reorder
+        threshold changed so it crossed the threshold. The change is not committed.
+        Args:
+            stock_item (StockItem): The changed stock item, already in the database.
+            was_low (bool): Whether the stock item was low on stock before the change.
+        Returns:
+            str | None: LOW_STOCK_EVENT or RESTOCKED_EVENT for the event to publish
+                after commit, None if the threshold was not crossed.
+        """
+        is_low = is_low_stock(stock_item.quantity, stock_item.reorder_threshold)
+        if is_low == was_low:
+            return None
+        if is_low:
+            self.db.add(
+                LowStockItem(
+                    stock_item_id=stock_item.id,
+                    low_since=datetime.now(ZoneInfo("Europe/Warsaw")),
+                )
+            )
+            return LOW_STOCK_EVENT
+        self.delete_low_stock_item(stock_item.id)
+        return RESTOCKED_EVENT
+
+    def delete_low_stock_item(self, stock_item_id: int) -> None:
+        """
+        Remove a stock item from the low stock items, e.g. before it is deleted.
+        The change is not committed.
+        Args:
+            stock_item_id (int): The stock item's ID.
+        """
+        self.db.query(LowStockItem).filter(
+            LowStockItem.stock_item_id == stock_item_id
+        ).delete(synchronize_session=False)
+
+    def get_low_stock_items(self, low_stock_query: LowStockQuery) -> dict:
+        """
+        Return a page of stock items low on stock ordered by ID, using keyset pagination.
+        Only the low stock items are read, joined with their stock items.
+        Args:
+            low_stock_query (LowStockQuery): Cursor, category and page size.
+        Returns:
+            dict: Stock items on the page and the cursor of the next page.
+        """
+        query = self.db.query(
+            LowStockItem.stock_item_id,
+            StockItem.name,
+            StockItem.category_id,
+            StockItem.quantity,
+            StockItem.reorder_threshold,
+            LowStockItem.low_since,
+        ).join(StockItem, StockItem.id == LowStockItem.stock_item_id)
+        if low_stock_query.after_id is not None:
+            query = query.filter(LowStockItem.stock_item_id > low_stock_query.after_id)
+        if low_stock_query.category_id is not None:
+            query = query.filter(StockItem.category_id == low_stock_query.category_id)
+        rows = (
+            query.order_by(LowStockItem.stock_item_id)
+            .limit(low_stock_query.limit + 1)
+            .all()
+        )
+        next_after_id = None
+        if len(rows) > low_stock_query.limit:
+            rows = rows[: low_stock_query.limit]
+            next_after_id = rows[-1].stock_item_id
+        return {"data": [row._asdict() for row in rows], "next_after_id": next_after_id}
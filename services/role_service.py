@@ -3,11 +3,24 @@ from zoneinfo import ZoneInfo
 
 from sqlalchemy import and_
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 
-from exceptions.exceptions import RoleAlreadyExistsException, RoleNotFoundException
+from app_settings import get_app_settings
+from caching.query_cache import get_query_cache
+from exceptions.exceptions import (
+    RoleAlreadyExistsException,
+    RoleNotFoundException,
+    VersionMismatchException,
+)
 from models.entities import Role
-from models.models import CreateRoleDto, PagedResult, RoleFilterQuery, UpdateRoleDto
-from paginate.paginate import paginate
+from models.models import (
+    CreateRoleDto,
+    PagedResult,
+    ReadRoleDto,
+    RoleFilterQuery,
+    UpdateRoleDto,
+)
+from paginate.paginate import check_query_limits, paginate
 
 """
 Service for managing role operations, including CRUD, filtering, and business logic.
@@ -26,6 +39,8 @@ class RoleService:
             db (Session): SQLAlchemy session object.
         """
         self.db = db
+        self.app_settings = get_app_settings()
+        self.query_cache = get_query_cache()
 
     def get_role_by_id(self, role_id: int) -> Role | None:
         """
@@ -42,30 +57,73 @@ class RoleService:
             raise RoleNotFoundException(f"Role with id={role_id} not found")
         return role
 
+    def get_role_ids_by_name(self, name: str) -> list[int]:
+        """
+        Return the IDs of the roles whose name contains the given text.
+        Results are cached until roles change.
+        Args:
+            name (str): Text the role names contain.
+        Returns:
+            list[int]: IDs of the matching roles.
+        """
+        return self.query_cache.get_or_compute(
+            "role_ids",
+            RoleFilterQuery(name=name),
+            [Role.__tablename__],
+            lambda: [
+                role_id
+                for (role_id,) in self.db.query(Role.id).filter(
+                    Role.name.like(f"%{name}%")
+                )
+            ],
+        )
+
     def get_all_roles(self, filter_query: RoleFilterQuery) -> PagedResult:
         """
         Return all roles matching the filter query, with pagination and sorting.
+        Results are cached until roles change.
         Args:
             filter_query (RoleFilterQuery): Filtering and pagination options.
         Returns:
-            PagedResult: Paginated result of roles.
+            PagedResult: Paginated result of roles as ReadRoleDto.
+        Raises:
+            QueryLimitExceededException: If the page size or the estimated cost of the query is too big.
+        """
+        check_query_limits(
+            filter_query,
+            self.app_settings.max_page_sizes["roles"],
+            self.app_settings.query_cost_budget,
+        )
+        return self.query_cache.get_or_compute(
+            "roles",
+            filter_query,
+            [Role.__tablename__],
+            lambda: self._query_roles(filter_query),
+        )
+
+    def _query_roles(self, filter_query: RoleFilterQuery) -> PagedResult:
+        """
+        Query a page of roles matching the filter query.
+        Args:
+            filter_query (RoleFilterQuery): Filtering and pagination options.
+        Returns:
+            PagedResult: Paginated result of roles converted to ReadRoleDto, which unlike
+                the role objects can be cached.
         """
         query = self.db.query(Role).filter(and_(*filter_query.filter_list))
         total_count = query.count()
 
-        if filter_query.sort_by is not None and hasattr(Role, filter_query.sort_by):
-            column = getattr(Role, filter_query.sort_by)
-            if filter_query.sort_direction == "asc":
-                query = query.order_by(column.asc())
-            else:
-                query = query.order_by(column.desc())
         roles = (
-            query.offset((filter_query.page - 1) * filter_query.page_size)
+            query.order_by(*filter_query.order_by)
+            .offset((filter_query.page - 1) * filter_query.page_size)
             .limit(filter_query.page_size)
             .all()
         )
         paged_result = paginate(
-            roles, filter_query.page, filter_query.page_size, total_count
+            [ReadRoleDto.model_validate(role) for role in roles],
+            filter_query.page,
+            filter_query.page_size,
+            total_count,
         )
         return paged_result
 
@@ -103,6 +161,7 @@ class RoleService:
             role.last_modification_date = current_date
             self.db.add(role)
             self.db.commit()
+            self.query_cache.invalidate(Role.__tablename__)
             self.db.refresh(role)
             return role
         else:
@@ -110,25 +169,43 @@ class RoleService:
                 f"Role with name={create_role_dto.name} already exists"
             )
 
-    def update_role(self, role_id: int, update_role_dto: UpdateRoleDto) -> Role:
+    def update_role(
+        self,
+        role_id: int,
+        update_role_dto: UpdateRoleDto,
+        expected_version: int | None = None,
+    ) -> Role:
         """
         Update an existing role's information.
         Args:
             role_id (int): The role's ID.
             update_role_dto (UpdateRoleDto): Data to update.
+            expected_version (int | None): Version the update is based on, None to skip the check.
         Returns:
             Role: The updated role object.
         Raises:
             RoleAlreadyExistsException: If role already exists.
+            VersionMismatchException: If the role was changed since expected_version.
         """
         role = self.get_role_by_id(role_id)
+        if expected_version is not None and role.version != expected_version:
+            raise VersionMismatchException(
+                f"Role with id={role_id} has version={role.version}, expected version={expected_version}"
+            )
         try:
             self.get_role_by_name(update_role_dto.name)
         except RoleNotFoundException:
             if update_role_dto and role.name != update_role_dto.name:
                 role.name = update_role_dto.name
                 role.last_modification_date = datetime.now(ZoneInfo("Europe/Warsaw"))
-                self.db.commit()
+                try:
+                    self.db.commit()
+                except StaleDataError:
+                    self.db.rollback()
+                    raise VersionMismatchException(
+                        f"Role with id={role_id} was modified concurrently"
+                    )
+                self.query_cache.invalidate(Role.__tablename__)
                 self.db.refresh(role)
             return role
         else:
@@ -143,11 +220,20 @@ class RoleService:
             role_id (int): The role's ID.
         Returns:
             Role: The deleted role object.
+        Raises:
+            VersionMismatchException: If the role was changed while being deleted.
         """
         role = self.get_role_by_id(role_id)
 
         self.db.delete(role)
-        self.db.commit()
+        try:
+            self.db.commit()
+        except StaleDataError:
+            self.db.rollback()
+            raise VersionMismatchException(
+                f"Role with id={role_id} was modified concurrently"
+            )
+        self.query_cache.invalidate(Role.__tablename__)
         return role
 
     def check_if_table_is_empty(self) -> bool:
@@ -0,0 +1,283 @@
+from datetime import datetime, timedelta
+from itertools import chain
+from typing import Callable
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from sqlalchemy import delete, exists, func, insert, select
+from sqlalchemy.orm import Session
+
+from app_settings import get_app_settings
+from exceptions.exceptions import StockForecastNotFoundException
+from models.entities import (
+    StockForecast,
+    StockForecastRun,
+    StockItem,
+    StockMovement,
+)
+
+"""
+Service computing stock item consumption forecasts in batch from the stock movement ledger.
+"""
+
+# Stock items read, computed and written at once
+FORECAST_BATCH_SIZE = 5000
+# Movements taking stock out that are not consumption
+NON_CONSUMPTION_REASONS = ("delete",)
+# Age after which forecasts with consumption are recomputed, as old movements leave
+# their windows even when no new ones are recorded
+FORECAST_MAX_AGE = timedelta(days=1)
+
+
+class StockForecastService:
+    """
+    Provides batch computation and reading of stock item consumption forecasts.
+
+    Consumption is the stock taken out by movements within the long window. The
+    movements of a batch of stock items are read with one query into NumPy arrays and
+    summed per stock item for both windows with np.bincount, so the moving averages,
+    days until stockout and suggested reorder quantities of all items of the batch are
+    computed without a Python loop over stock items.
+
+    Every completed run stores the ID of the last movement recorded when it started, so
+    the next run recomputes only stock items with movements after it, plus forecasts
+    with consumption older than FORECAST_MAX_AGE.
+    """
+
+    def __init__(self, db: Session):
+        """
+        Initialize StockForecastService with a database session.
+        Args:
+            db (Session): SQLAlchemy session object.
+        """
+        self.db = db
+        self.app_settings = get_app_settings()
+
+    def get_stock_forecast(self, stock_item_id: int) -> StockForecast:
+        """
+        Return the latest computed forecast of a stock item.
+        Args:
+            stock_item_id (int): The stock item's ID.
+        Returns:
+            StockForecast: The forecast.
+        Raises:
+            StockForecastNotFoundException: If the stock item is not found or its
+                forecast was not computed yet.
+        """
+        stock_forecast = (
+            self.db.query(StockForecast)
+            .join(StockItem, StockItem.id == StockForecast.stock_item_id)
+            .filter(StockForecast.stock_item_id == stock_item_id)
+            .first()
+        )
+        if stock_forecast is None:
+            raise StockForecastNotFoundException(
+                f"Stock forecast for stock item with id={stock_item_id} not found"
+            )
+        return stock_forecast
+
+    def compute_stock_forecasts(
+        self,
+        full: bool = False,
+        progress_callback: Callable[[int, int], None] | None = None,
+    ) -> dict:
+        """
+        Compute the forecasts of stock items changed since the last completed run, or of
+        every stock item on the first run or if requested. Forecasts of deleted stock
+        items are removed. Every batch is committed, the run is recorded only once all
+        of them are, so the stock items of an interrupted run are recomputed by the next.
+        Args:
+            full (bool): Whether to recompute every stock item.
+            progress_callback (Callable[[int, int], None] | None): Called with the
+                number of processed and of all selected stock items after every batch.
+        Returns:
+            dict: Whether the run was full and the number of computed forecasts.
+        """
+        current_date = datetime.now(ZoneInfo("Europe/Warsaw")).replace(tzinfo=None)
+        last_movement_id = self.db.query(func.max(StockMovement.id)).scalar() or 0
+        last_run = (
+            self.db.query(StockForecastRun).order_by(StockForecastRun.id.desc()).first()
+        )
+        full = full or last_run is None
+        if full:
+            self.db.execute(
+                delete(StockForecast).where(
+                    ~exists().where(StockItem.id == StockForecast.stock_item_id)
+                )
+            )
+            stock_item_ids = self._fetch_ids(select(StockItem.id))
+        else:
+            stock_item_ids = np.union1d(
+                self._fetch_ids(
+                    select(StockMovement.stock_item_id)
+                    .where(
+                        StockMovement.id > last_run.movement_id,
+                        StockMovement.id <= last_movement_id,
+                    )
+                    .distinct()
+                ),
+                self._fetch_ids(
+                    select(StockForecast.stock_item_id).where(
+                        StockForecast.long_term_daily_consumption > 0,
+                        StockForecast.computation_date
+                        < current_date - FORECAST_MAX_AGE,
+                    )
+                ),
+            )
+
+        computed = 0
+        for start in range(0, len(stock_item_ids), FORECAST_BATCH_SIZE):
+            batch_ids = stock_item_ids[start : start + FORECAST_BATCH_SIZE].tolist()
+            forecasts = self._compute_batch(batch_ids, last_movement_id, current_date)
+            self.db.execute(
+                delete(StockForecast).where(StockForecast.stock_item_id.in_(batch_ids))
+            )
+            if forecasts:
+                self.db.execute(insert(StockForecast.__table__), forecasts)
+            self.db.commit()
+            computed += len(forecasts)
+            if progress_callback is not None:
+                progress_callback(
+                    min(start + FORECAST_BATCH_SIZE, len(stock_item_ids)),
+                    len(stock_item_ids),
+                )
+        self.db.add(
+            StockForecastRun(
+                movement_id=last_movement_id,
+                full=full,
+                computed=computed,
+                computation_date=current_date,
+            )
+        )
+        self.db.commit()
+        return {"full": full, "computed": computed}
+
+    def _compute_batch(
+        self, stock_item_ids: list[int], last_movement_id: int, current_date: datetime
+    ) -> list[dict]:
+        """
+        Compute the forecasts of a batch of stock items.
+        Args:
+            stock_item_ids (list[int]): IDs of the stock items, ascending. IDs of
+                deleted stock items are skipped.
+            last_movement_id (int): ID of the last movement recorded when the run started.
+            current_date (datetime): Date of the run, in Europe/Warsaw time.
+        Returns:
+            list[dict]: Rows of the stock forecast table.
+        """
+        short_window_days = self.app_settings.stock_forecast_short_window_days
+        long_window_days = self.app_settings.stock_forecast_long_window_days
+        items = self._fetch_columns(
+            select(StockItem.id, StockItem.quantity)
+            .where(StockItem.id.in_(stock_item_ids))
+            .order_by(StockItem.id),
+            2,
+        )
+        ids, quantities = items[:, 0], items[:, 1]
+        movements = self._fetch_columns(
+            select(
+                StockMovement.stock_item_id,
+                -StockMovement.delta,
+                StockMovement.creation_date
+                >= current_date - timedelta(days=short_window_days),
+            ).where(
+                StockMovement.stock_item_id.in_(stock_item_ids),
+                StockMovement.id <= last_movement_id,
+                StockMovement.delta < 0,
+                StockMovement.reason.not_in(NON_CONSUMPTION_REASONS),
+                StockMovement.creation_date
+                >= current_date - timedelta(days=long_window_days),
+            ),
+            3,
+        )
+
+        # Position of every movement's stock item, movements of stock items deleted
+        # since the run started are dropped
+        positions = np.searchsorted(ids, movements[:, 0])
+        found = positions < len(ids)
+        found[found] = ids[positions[found]] == movements[found, 0]
+        positions, consumed, in_short_window = (
+            positions[found],
+            movements[found, 1],
+            movements[found, 2].astype(bool),
+        )
+        short_term = (
+            np.bincount(
+                positions[in_short_window],
+                weights=consumed[in_short_window],
+                minlength=len(ids),
+            )
+            / short_window_days
+        )
+        long_term = (
+            np.bincount(positions, weights=consumed, minlength=len(ids))
+            / long_window_days
+        )
+        # The higher rate reacts to rising consumption without forgetting a slow week
+        daily_consumption = np.maximum(short_term, long_term)
+        consuming = daily_consumption > 0
+        days_until_stockout = np.full(len(ids), np.nan)
+        np.divide(
+            quantities, daily_consumption, out=days_until_stockout, where=consuming
+        )
+        suggested_reorder_quantities = np.maximum(
+            np.ceil(
+                daily_consumption
+                * (
+                    self.app_settings.stock_forecast_lead_time_days
+                    + self.app_settings.stock_forecast_coverage_days
+                )
+            )
+            - quantities,
+            0,
+        ).astype(np.int64)
+        return [
+            {
+                "stock_item_id": stock_item_id,
+                "short_term_daily_consumption": short_term_rate,
+                "long_term_daily_consumption": long_term_rate,
+                "days_until_stockout": days if is_consuming else None,
+                "suggested_reorder_quantity": suggested_reorder_quantity,
+                "movement_id": last_movement_id,
+                "computation_date": current_date,
+            }
+            for (
+                stock_item_id,
+                short_term_rate,
+                long_term_rate,
+                days,
+                is_consuming,
+                suggested_reorder_quantity,
+            ) in zip(
+                ids.tolist(),
+                short_term.tolist(),
+                long_term.tolist(),
+                days_until_stockout.tolist(),
+                consuming.tolist(),
+                suggested_reorder_quantities.tolist(),
+            )
+        ]
+
+    def _fetch_ids(self, ids_query) -> np.ndarray:
+        """
+        Read the IDs selected by a query into an array.
+        Args:
+            ids_query: Select of one integer column.
+        Returns:
+            np.ndarray: IDs as 64 bit integers.
+        """
+        return np.fromiter(self.db.scalars(ids_query), dtype=np.int64)
+
+    def _fetch_columns(self, columns_query, column_count: int) -> np.ndarray:
+        """
+        Read the integer columns selected by a query into a two-dimensional array.
+        Args:
+            columns_query: Select of integer or boolean columns.
+            column_count (int): Number of selected columns.
+        Returns:
+            np.ndarray: One row per selected row, as 64 bit integers.
+        """
+        rows = self.db.execute(columns_query)
+        return np.fromiter(chain.from_iterable(rows), dtype=np.int64).reshape(
+            -1, column_count
+        )
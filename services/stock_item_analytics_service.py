@@ -0,0 +1,256 @@
+from itertools import chain
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from caching.query_cache import get_query_cache
+from exceptions.exceptions import CategoryNotFoundException
+from models.entities import ItemCategory, StockItem
+from models.models import StockItemAnalyticsQuery
+
+"""
+Service computing inventory analytics over stock item quantities with NumPy.
+"""
+
+# Reported percentiles, linearly interpolated like numpy.percentile
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+# Lowest quantities of the distribution ranges, the last range is unbounded and the
+# first one holds the stock items out of stock
+QUANTITY_BUCKETS = (0, 1, 10, 100, 1000, 10000)
+
+
+class StockItemAnalyticsService:
+    """
+    Provides statistics of stock item quantities, in total and per category.
+
+    The category IDs and quantities of the analysed stock items are read with one query
+    into NumPy arrays, counted per distinct pair by the database from the index on both
+    columns, so inventories with repeated quantities transfer far fewer rows. Every
+    statistic is then computed for all categories at once from the boundaries of their
+    runs, weighted by the counts, without a Python loop over stock items.
+    """
+
+    def __init__(self, db: Session):
+        """
+        Initialize StockItemAnalyticsService with a database session.
+        Args:
+            db (Session): SQLAlchemy session object.
+        """
+        self.db = db
+        self.query_cache = get_query_cache()
+
+    def get_stock_item_analytics(
+        self, analytics_query: StockItemAnalyticsQuery
+    ) -> dict:
+        """
+        Return statistics of stock item quantities in total and per category.
+        Results are cached until stock items or item categories change.
+        Args:
+            analytics_query (StockItemAnalyticsQuery): Selection of the analysed stock items.
+        Returns:
+            dict: Statistics shaped like StockItemAnalyticsDto.
+        Raises:
+            CategoryNotFoundException: If the selected category is not found.
+        """
+        return self.query_cache.get_or_compute(
+            "stock_item_analytics",
+            analytics_query,
+            [StockItem.__tablename__, ItemCategory.__tablename__],
+            lambda: self._compute_stock_item_analytics(analytics_query),
+        )
+
+    def _compute_stock_item_analytics(
+        self, analytics_query: StockItemAnalyticsQuery
+    ) -> dict:
+        """
+        Compute the statistics of stock item quantities in total and per category.
+        Args:
+            analytics_query (StockItemAnalyticsQuery): Selection of the analysed stock items.
+        Returns:
+            dict: Statistics shaped like StockItemAnalyticsDto.
+        Raises:
+            CategoryNotFoundException: If the selected category is not found.
+        """
+        categories_query = self.db.query(ItemCategory.id, ItemCategory.name)
+        stock_items_query = select(StockItem.category_id, StockItem.quantity)
+        if analytics_query.category_id is not None:
+            categories_query = categories_query.filter(
+                ItemCategory.id == analytics_query.category_id
+            )
+            stock_items_query = stock_items_query.where(
+                StockItem.category_id == analytics_query.category_id
+            )
+        categories = categories_query.order_by(ItemCategory.id).all()
+        if analytics_query.category_id is not None and not categories:
+            raise CategoryNotFoundException(
+                f"Item category with id={analytics_query.category_id} not found"
+            )
+        category_ids, quantities, item_counts = self._fetch_columns(stock_items_query)
+        buckets = np.array(QUANTITY_BUCKETS, dtype=np.int64)
+
+        # Rows are ordered by category and quantity and quantities are non-negative 32
+        # bit integers, so the combined keys are ascending too
+        keys = (category_ids << 32) | quantities
+        group_starts = np.flatnonzero(np.diff(category_ids, prepend=-1))
+        group_category_ids = category_ids[group_starts]
+        category_statistics = _group_statistics(
+            quantities,
+            item_counts,
+            group_starts,
+            np.searchsorted(keys, (group_category_ids[:, np.newaxis] << 32) | buckets),
+        )
+        statistics_by_category_id = dict(
+            zip(group_category_ids.tolist(), category_statistics)
+        )
+
+        order = np.argsort(quantities, kind="stable")
+        total_statistics = _group_statistics(
+            quantities[order],
+            item_counts[order],
+            np.zeros(min(len(order), 1), dtype=np.int64),
+            np.searchsorted(quantities[order], buckets)[np.newaxis, :],
+        )
+        return {
+            "total": total_statistics[0] if total_statistics else _empty_statistics(),
+            "categories": [
+                {
+                    "category_id": category_id,
+                    "category_name": category_name,
+                    **statistics_by_category_id.get(category_id, _empty_statistics()),
+                }
+                for category_id, category_name in categories
+            ],
+        }
+
+    def _fetch_columns(
+        self, stock_items_query
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Read the distinct category IDs and quantities selected by a query with their
+        number of stock items into arrays, ordered by category ID and quantity.
+        Args:
+            stock_items_query: Select of the category ID and quantity columns.
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: Category IDs, quantities and
+                numbers of stock items as 64 bit integers.
+        """
+        rows = self.db.execute(
+            stock_items_query.add_columns(func.count())
+            .group_by(StockItem.category_id, StockItem.quantity)
+            .order_by(StockItem.category_id, StockItem.quantity)
+        )
+        columns = np.fromiter(chain.from_iterable(rows), dtype=np.int64).reshape(-1, 3)
+        return columns[:, 0], columns[:, 1], columns[:, 2]
+
+
+def _group_statistics(
+    quantities: np.ndarray,
+    item_counts: np.ndarray,
+    starts: np.ndarray,
+    bucket_starts: np.ndarray,
+) -> list[dict]:
+    """
+    Compute the statistics of consecutive groups of quantities.
+    Args:
+        quantities (np.ndarray): Quantities, ascending within every group.
+        item_counts (np.ndarray): Number of stock items with every quantity.
+        starts (np.ndarray): Position of the first quantity of every group.
+        bucket_starts (np.ndarray): Position of the first quantity of every group in
+            every range of QUANTITY_BUCKETS, one row per group.
+    Returns:
+        list[dict]: Statistics of every group shaped like QuantityStatisticsDto.
+    """
+    if not len(starts):
+        return []
+    ends = np.append(starts[1:], len(quantities))
+    # Number of stock items before every quantity, and before the end
+    items_before = np.concatenate(([0], np.cumsum(item_counts)))
+    counts = items_before[ends] - items_before[starts]
+    totals = np.add.reduceat(quantities * item_counts, starts)
+    # Percentiles of the stock items, each quantity repeated by its number of items
+    positions = items_before[starts][:, np.newaxis] + (counts[:, np.newaxis] - 1) * (
+        np.array(PERCENTILES) / 100
+    )
+    lower = np.floor(positions)
+    lower_quantities = quantities[
+        np.searchsorted(items_before, lower, side="right") - 1
+    ]
+    upper_quantities = quantities[
+        np.searchsorted(items_before, np.ceil(positions), side="right") - 1
+    ]
+    percentiles = lower_quantities + (upper_quantities - lower_quantities) * (
+        positions - lower
+    )
+    bucket_counts = np.diff(
+        items_before[np.concatenate((bucket_starts, ends[:, np.newaxis]), axis=1)],
+        axis=1,
+    )
+    return [
+        {
+            "item_count": item_count,
+            "total_quantity": total_quantity,
+            "zero_stock_count": group_bucket_counts[0],
+            "min_quantity": min_quantity,
+            "max_quantity": max_quantity,
+            "mean_quantity": round(total_quantity / item_count, 2),
+            "percentiles": {
+                f"p{percentile}": round(value, 2)
+                for percentile, value in zip(PERCENTILES, group_percentiles)
+            },
+            "distribution": _distribution(group_bucket_counts),
+        }
+        for (
+            item_count,
+            total_quantity,
+            min_quantity,
+            max_quantity,
+            group_percentiles,
+            group_bucket_counts,
+        ) in zip(
+            counts.tolist(),
+            totals.tolist(),
+            quantities[starts].tolist(),
+            quantities[ends - 1].tolist(),
+            percentiles.tolist(),
+            bucket_counts.tolist(),
+        )
+    ]
+
+
+def _empty_statistics() -> dict:
+    """
+    Return the statistics of a group without stock items.
+    Returns:
+        dict: Statistics shaped like QuantityStatisticsDto.
+    """
+    return {
+        "item_count": 0,
+        "total_quantity": 0,
+        "zero_stock_count": 0,
+        "min_quantity": None,
+        "max_quantity": None,
+        "mean_quantity": None,
+        "percentiles": {},
+        "distribution": _distribution([0] * len(QUANTITY_BUCKETS)),
+    }
+
+
+def _distribution(bucket_counts: list[int]) -> list[dict]:
+    """
+    Return the number of stock items per range of QUANTITY_BUCKETS.
+    Args:
+        bucket_counts (list[int]): Number of stock items in every range.
+    Returns:
+        list[dict]: Ranges shaped like QuantityBucketDto.
+    """
+    return [
+        {
+            "min_quantity": min_quantity,
+            "max_quantity": max_quantity - 1 if max_quantity is not None else None,
+            "item_count": item_count,
+        }
+        for min_quantity, max_quantity, item_count in zip(
+            QUANTITY_BUCKETS, (*QUANTITY_BUCKETS[1:], None), bucket_counts
+        )
+    ]
@@ -0,0 +1,288 @@
+import codecs
+import csv
+import shutil
+import tempfile
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Callable
+from zoneinfo import ZoneInfo
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app_settings import get_app_settings
+from caching.query_cache import get_query_cache
+from events.event_broadcaster import get_event_broadcaster
+from read_models.stock_item_read_model import get_stock_item_read_model
+from search.name_index import get_name_index
+from search.trigram_index import get_trigram_index
+from exceptions.exceptions import InvalidImportFileException
+from models.entities import ItemCategory, StockItem
+from models.models import CreateStockItemDto
+from services.category_stock_summary_service import CategoryStockSummaryService
+from services.stock_item_sync_service import StockItemSyncService
+from services.stock_movement_service import StockMovementService
+
+"""
+Service for importing stock items from CSV files in chunks.
+"""
+
+REQUIRED_IMPORT_COLUMNS = ("name", "quantity", "category")
+IMPORT_DIRECTORY = Path(tempfile.gettempdir()) / "stock_manager_imports"
+
+
+class StockItemImportService:
+    """
+    Imports stock items from a CSV stream. Rows are read one at a time and handled in
+    chunks of IMPORT_CHUNK_SIZE: categories are resolved and duplicates checked with one
+    query each per chunk, valid rows are bulk inserted and every chunk is committed on
+    its own, so memory use does not depend on the size of the file.
+    """
+
+    def __init__(self, db: Session):
+        """
+        Initialize StockItemImportService with a database session.
+        Args:
+            db (Session): SQLAlchemy session object.
+        """
+        self.db = db
+        self.app_settings = get_app_settings()
+        self.category_stock_summary_service = CategoryStockSummaryService(db)
+        self.stock_movement_service = StockMovementService(db)
+        self.stock_item_sync_service = StockItemSyncService(db)
+        self.event_broadcaster = get_event_broadcaster()
+        self.name_index = get_name_index()
+        self.trigram_index = get_trigram_index()
+        self.read_model = get_stock_item_read_model()
+        self.query_cache = get_query_cache()
+
+    @staticmethod
+    def save_import_file(csv_file: BinaryIO) -> str:
+        """
+        Copy an uploaded CSV file to the import directory, so a background job can read it
+        after the request has finished.
+        Args:
+            csv_file (BinaryIO): The CSV file opened in binary mode.
+        Returns:
+            str: Name of the saved file in the import directory.
+        """
+        IMPORT_DIRECTORY.mkdir(exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=IMPORT_DIRECTORY, prefix="stock_items_", suffix=".csv", delete=False
+        ) as saved_file:
+            shutil.copyfileobj(csv_file, saved_file)
+        return Path(saved_file.name).name
+
+    @staticmethod
+    def get_import_file_path(file_name: str) -> Path:
+        """
+        Return the path of a file saved by save_import_file.
+        Args:
+            file_name (str): Name of the saved file.
+        Returns:
+            Path: Path of the file.
+        Raises:
+            InvalidImportFileException: If the name points outside of the import directory.
+        """
+        path = IMPORT_DIRECTORY / file_name
+        if path.parent != IMPORT_DIRECTORY or not path.name.startswith("stock_items_"):
+            raise InvalidImportFileException(f"Invalid import file name={file_name}")
+        return path
+
+    def import_stock_items(
+        self,
+        csv_file: BinaryIO,
+        user_id: int | None = None,
+        progress_callback: Callable[[int], None] | None = None,
+    ) -> dict:
+        """
+        Import stock items from a UTF-8 CSV file with a header row of the columns
+        name, description (optional), quantity and category (category name).
+        Chunks committed before a failure or cancellation stay imported.
+        Args:
+            csv_file (BinaryIO): The CSV file opened in binary mode.
+            user_id (int | None): ID of the importing user, recorded in the stock ledger.
+            progress_callback (Callable[[int], None] | None): Called with the number of
+                processed rows after every chunk.
+        Returns:
+            dict: Numbers of processed, imported and rejected rows and the row errors,
+                limited to IMPORT_MAX_ERRORS entries.
+        Raises:
+            InvalidImportFileException: If the file is not UTF-8 CSV with the required columns.
+        """
+        reader = csv.DictReader(
+            codecs.getreader("utf-8-sig")(csv_file), skipinitialspace=True
+        )
+        try:
+            columns = [column.strip().lower() for column in reader.fieldnames or []]
+        except UnicodeDecodeError:
+            raise InvalidImportFileException("Import file must be UTF-8 encoded")
+        missing_columns = [
+            column for column in REQUIRED_IMPORT_COLUMNS if column not in columns
+        ]
+        if missing_columns:
+            raise InvalidImportFileException(
+                f"Import file is missing the columns: {', '.join(missing_columns)}"
+            )
+        reader.fieldnames = columns
+
+        report = {"total_rows": 0, "imported": 0, "failed": 0, "errors": []}
+        chunk = []
+        try:
+            for row in reader:
+                # Line of the row in the file, the header is line 1
+                chunk.append((reader.line_num, row))
+                if len(chunk) >= self.app_settings.import_chunk_size:
+                    self._import_chunk(chunk, user_id, report)
+                    chunk = []
+                    if progress_callback is not None:
+                        progress_callback(report["total_rows"])
+        except UnicodeDecodeError:
+            raise InvalidImportFileException(
+                f"Import file must be UTF-8 encoded, invalid data after row {report['total_rows']}"
+            )
+        except csv.Error as e:
+            raise InvalidImportFileException(f"Invalid CSV: {e}")
+        if chunk:
+            self._import_chunk(chunk, user_id, report)
+        if progress_callback is not None:
+            progress_callback(report["total_rows"])
+        return report
+
+    def _import_chunk(self, chunk: list[tuple[int, dict]], user_id, report: dict):
+        report["total_rows"] += len(chunk)
+        category_names = {(row.get("category") or "").strip() for _, row in chunk} - {
+            ""
+        }
+        category_ids = dict(
+            self.db.query(ItemCategory.name, ItemCategory.id)
+            .filter(ItemCategory.name.in_(category_names))
+            .all()
+        )
+
+        valid_rows = []
+        for line_number, row in chunk:
+            if None in row:
+                self._add_error(
+                    report, line_number, ["Row has more values than columns"]
+                )
+                continue
+            category_name = (row.get("category") or "").strip()
+            if category_name not in category_ids:
+                self._add_error(
+                    report,
+                    line_number,
+                    [f"category: Item category with name={category_name} not found"],
+                )
+                continue
+            try:
+                create_stock_item_dto = CreateStockItemDto(
+                    name=(row.get("name") or "").strip(),
+                    description=(row.get("description") or "").strip() or None,
+                    quantity=(row.get("quantity") or "").strip(),
+                    category_id=category_ids[category_name],
+                )
+            except ValidationError as e:
+                self._add_error(
+                    report,
+                    line_number,
+                    [
+                        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                        for error in e.errors()
+                    ],
+                )
+                continue
+            valid_rows.append((line_number, create_stock_item_dto))
+
+        existing = set(
+            self.db.query(StockItem.name, StockItem.category_id)
+            .filter(
+                StockItem.name.in_({dto.name for _, dto in valid_rows}),
+                StockItem.category_id.in_({dto.category_id for _, dto in valid_rows}),
+            )
+            .all()
+        )
+        new_rows = []
+        for line_number, dto in valid_rows:
+            if (dto.name, dto.category_id) in existing:
+                self._add_error(
+                    report,
+                    line_number,
+                    [f"name: Stock item with name={dto.name} already exists"],
+                )
+                continue
+            existing.add((dto.name, dto.category_id))
+            new_rows.append(dto)
+        if not new_rows:
+            return
+
+        current_date = datetime.now(ZoneInfo("Europe/Warsaw"))
+        # Core INSERT on the table, the ORM bulk insert path adds no value here
+        stock_item_ids = self.db.scalars(
+            insert(StockItem.__table__).returning(
+                StockItem.id, sort_by_parameter_order=True
+            ),
+            [
+                {
+                    **dto.model_dump(),
+                    "creation_date": current_date,
+                    "last_modification_date": current_date,
+                    "version": 1,
+                    "movement_count": 1 if dto.quantity else 0,
+                }
+                for dto in new_rows
+            ],
+        ).all()
+        category_changes = defaultdict(lambda: [0, 0])
+        for dto in new_rows:
+            category_changes[dto.category_id][0] += 1
+            category_changes[dto.category_id][1] += dto.quantity
+        for category_id, (item_count, quantity) in category_changes.items():
+            self.category_stock_summary_service.apply_stock_change(
+                category_id, item_count, quantity
+            )
+        self.stock_movement_service.record_opening_movements(
+            [
+                (stock_item_id, dto.quantity)
+                for stock_item_id, dto in zip(stock_item_ids, new_rows)
+            ],
+            "import",
+            user_id,
+        )
+        self.stock_item_sync_service.record_changes(stock_item_ids)
+        self.db.commit()
+        self.query_cache.invalidate(StockItem.__tablename__)
+        names = [
+            (stock_item_id, dto.name)
+            for stock_item_id, dto in zip(stock_item_ids, new_rows)
+        ]
+        self.name_index.add_many("stock_item", names)
+        self.trigram_index.add_many(names)
+        self.read_model.apply_rows(
+            (
+                stock_item_id,
+                dto.name,
+                dto.quantity,
+                dto.category_id,
+                current_date,
+                current_date,
+                1,
+                dto.reorder_threshold,
+            )
+            for stock_item_id, dto in zip(stock_item_ids, new_rows)
+        )
+        report["imported"] += len(new_rows)
+        self.event_broadcaster.publish(
+            "stock_item.imported",
+            {
+                "count": len(new_rows),
+                "category_ids": sorted(category_changes),
+            },
+        )
+
+    def _add_error(self, report: dict, line_number: int, errors: list[str]):
+        report["failed"] += 1
+        if len(report["errors"]) < self.app_settings.import_max_errors:
+            report["errors"].append({"row": line_number, "errors": errors})
@@ -1,27 +1,61 @@
+import csv
+import io
 from datetime import datetime
+from typing import Iterator
 from zoneinfo import ZoneInfo
 
-from sqlalchemy import and_
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, update
+from sqlalchemy.orm import Session, contains_eager, load_only, undefer
+from sqlalchemy.orm.exc import StaleDataError
 
+from caching.query_cache import get_query_cache
+from events.event_broadcaster import get_event_broadcaster
+from read_models.stock_item_read_model import get_stock_item_read_model
+from search.name_index import get_name_index
+from search.trigram_index import get_trigram_index
+from app_settings import get_app_settings
 from exceptions.exceptions import (
+    BatchSizeExceededException,
+    InsufficientStockException,
     StockItemAlreadyExistsException,
     StockItemNotFoundException,
+    VersionMismatchException,
 )
 from models.entities import ItemCategory, StockItem
 from models.models import (
+    AdjustStockItemQuantityDto,
     CreateStockItemDto,
     PagedResult,
     StockItemQuery,
     UpdateStockItemDto,
 )
-from paginate.paginate import paginate
+from paginate.paginate import check_query_limits, paginate, paginate_dict
+from serialization.stock_item_serializer import (
+    stock_item_row_columns,
+    stock_item_row_to_dict,
+    stock_item_to_dict,
+)
+from services.category_stock_summary_service import CategoryStockSummaryService
 from services.item_category_service import ItemCategoryService
+from services.low_stock_service import LowStockService, is_low_stock
+from services.stock_item_sync_service import StockItemSyncService
+from services.stock_movement_service import StockMovementService
 
 """
 Service for managing stock item operations, including CRUD, filtering, and business logic.
 """
 
+EXPORT_COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "quantity",
+    "category",
+    "creation_date",
+    "last_modification_date",
+)
+EXPORT_BATCH_SIZE = 1000
+
 
 class StockItemService:
     """
@@ -35,7 +69,17 @@ class StockItemService:
             db (Session): SQLAlchemy session object.
         """
         self.db = db
+        self.app_settings = get_app_settings()
         self.item_category_service = ItemCategoryService(db)
+        self.category_stock_summary_service = CategoryStockSummaryService(db)
+        self.low_stock_service = LowStockService(db)
+        self.stock_movement_service = StockMovementService(db)
+        self.stock_item_sync_service = StockItemSyncService(db)
+        self.event_broadcaster = get_event_broadcaster()
+        self.query_cache = get_query_cache()
+        self.name_index = get_name_index()
+        self.trigram_index = get_trigram_index()
+        self.read_model = get_stock_item_read_model()
 
     def get_stock_item_by_id(self, stock_item_id: int) -> StockItem | None:
         """
@@ -48,7 +92,10 @@ class StockItemService:
             StockItemNotFoundException: If stock item is not found.
         """
         stock_item = (
-            self.db.query(StockItem).filter(StockItem.id == stock_item_id).first()
+            self.db.query(StockItem)
+            .options(undefer(StockItem.description))
+            .filter(StockItem.id == stock_item_id)
+            .first()
         )
         if stock_item is None:
             raise StockItemNotFoundException(
@@ -59,38 +106,259 @@ class StockItemService:
     def get_all_stock_items(self, filter_query: StockItemQuery) -> PagedResult:
         """
         Return all stock items matching the filter query, with pagination and sorting.
+        Results are cached until stock items or item categories change.
         Args:
-            filter_query (StockItemQuery): Filtering and pagination options.
+            filter_query (StockItemQuery): Filtering, field selection and pagination options.
         Returns:
-            PagedResult: Paginated result of stock items.
+            PagedResult: Paginated result of stock item dicts with the selected fields.
+        Raises:
+            QueryLimitExceededException: If the page size or the estimated cost of the query is too big.
         """
-        query = self.db.query(StockItem).filter(and_(*filter_query.filter_list))
-        total_count = query.count()
+        self._check_query_limits(filter_query)
+        return self.query_cache.get_or_compute(
+            "stock_items",
+            filter_query,
+            [StockItem.__tablename__, ItemCategory.__tablename__],
+            lambda: self._query_stock_items(filter_query),
+        )
 
-        if filter_query.sort_by == "category":
-            query = query.join(ItemCategory)
-            if filter_query.sort_direction == "asc":
-                query = query.order_by(ItemCategory.name.asc())
-            else:
-                query = query.order_by(ItemCategory.name.desc())
-        elif filter_query.sort_by is not None and hasattr(
-            StockItem, filter_query.sort_by
-        ):
-            column = getattr(StockItem, filter_query.sort_by)
-            if filter_query.sort_direction == "asc":
-                query = query.order_by(column.asc())
-            else:
-                query = query.order_by(column.desc())
+    def _query_stock_items(self, filter_query: StockItemQuery) -> PagedResult:
+        """
+        Query a page of stock items matching the filter query.
+        Only the selected fields are loaded, description is deferred unless requested.
+        Args:
+            filter_query (StockItemQuery): Filtering, field selection and pagination options.
+        Returns:
+            PagedResult: Paginated result of stock item dicts with the selected fields.
+        """
+        self._resolve_category_name(filter_query)
+        read_model_page = self.read_model.query(self.db, filter_query)
+        if read_model_page is not None:
+            stock_items, total_count = read_model_page
+            return paginate(
+                stock_items, filter_query.page, filter_query.page_size, total_count
+            )
+        fields = filter_query.selected_fields
+        total_count = self._count_stock_items(filter_query)
+        query = self.db.query(StockItem).filter(and_(*filter_query.filter_list))
+        query = query.options(
+            load_only(
+                *[getattr(StockItem, field) for field in fields if field != "category"]
+            )
+        )
+        if "category" in fields:
+            query = query.join(StockItem.category).options(
+                contains_eager(StockItem.category)
+            )
+        query = query.order_by(*filter_query.order_by)
         stock_items = (
             query.offset((filter_query.page - 1) * filter_query.page_size)
             .limit(filter_query.page_size)
             .all()
         )
         paged_result = paginate(
-            stock_items, filter_query.page, filter_query.page_size, total_count
+            [stock_item_to_dict(stock_item, fields) for stock_item in stock_items],
+            filter_query.page,
+            filter_query.page_size,
+            total_count,
         )
         return paged_result
 
+    def get_stock_item_row_by_id(self, stock_item_id: int) -> tuple[dict, int]:
+        """
+        Return a stock item by its unique ID as a plain dict, selecting only the needed columns.
+        Args:
+            stock_item_id (int): The stock item's ID.
+        Returns:
+            tuple[dict, int]: Stock item data shaped like ReadStockItemDto and its version.
+        Raises:
+            StockItemNotFoundException: If stock item is not found.
+        """
+        row = (
+            self.db.query(*stock_item_row_columns(), StockItem.version)
+            .join(ItemCategory, StockItem.category_id == ItemCategory.id)
+            .filter(StockItem.id == stock_item_id)
+            .first()
+        )
+        if row is None:
+            raise StockItemNotFoundException(
+                f"Stock item with id={stock_item_id} not found"
+            )
+        return stock_item_row_to_dict(row), row[-1]
+
+    def get_stock_items_by_ids(self, stock_item_ids: list[int]) -> dict:
+        """
+        Return stock items by their IDs as plain dicts with a single IN query joined with
+        their categories. Duplicated IDs are returned once.
+        Args:
+            stock_item_ids (list[int]): IDs of the stock items.
+        Returns:
+            dict: Found stock items shaped like ReadStockItemDto, in the requested order,
+                and the IDs that were not found.
+        Raises:
+            BatchSizeExceededException: If more than STOCK_ITEM_BATCH_MAX_IDS distinct IDs are given.
+        """
+        unique_ids = list(dict.fromkeys(stock_item_ids))
+        max_ids = self.app_settings.stock_item_batch_max_ids
+        if len(unique_ids) > max_ids:
+            raise BatchSizeExceededException(
+                f"At most {max_ids} stock item IDs can be requested at once, got {len(unique_ids)}"
+            )
+        rows = (
+            self.db.query(*stock_item_row_columns())
+            .join(ItemCategory, StockItem.category_id == ItemCategory.id)
+            .filter(StockItem.id.in_(unique_ids))
+            .all()
+        )
+        stock_items = {row[0]: stock_item_row_to_dict(row) for row in rows}
+        return {
+            "data": [
+                stock_items[stock_item_id]
+                for stock_item_id in unique_ids
+                if stock_item_id in stock_items
+            ],
+            "missing_ids": [
+                stock_item_id
+                for stock_item_id in unique_ids
+                if stock_item_id not in stock_items
+            ],
+        }
+
+    def get_all_stock_items_rows(self, filter_query: StockItemQuery) -> dict:
+        """
+        Return all stock items matching the filter query as plain dicts, with pagination and sorting.
+        Results are cached until stock items or item categories change.
+        Args:
+            filter_query (StockItemQuery): Filtering, field selection and pagination options.
+        Returns:
+            dict: Paginated result of stock items shaped like PagedResult[ReadStockItemListDto].
+        Raises:
+            QueryLimitExceededException: If the page size or the estimated cost of the query is too big.
+        """
+        self._check_query_limits(filter_query)
+        return self.query_cache.get_or_compute(
+            "stock_items_rows",
+            filter_query,
+            [StockItem.__tablename__, ItemCategory.__tablename__],
+            lambda: self._query_stock_items_rows(filter_query),
+        )
+
+    def _query_stock_items_rows(self, filter_query: StockItemQuery) -> dict:
+        """
+        Query a page of stock items matching the filter query as plain dicts.
+        Selects only the columns of the selected fields as rows instead of building ORM objects.
+        Args:
+            filter_query (StockItemQuery): Filtering, field selection and pagination options.
+        Returns:
+            dict: Paginated result of stock items shaped like PagedResult[ReadStockItemListDto].
+        """
+        self._resolve_category_name(filter_query)
+        read_model_page = self.read_model.query(self.db, filter_query)
+        if read_model_page is not None:
+            stock_items, total_count = read_model_page
+            return paginate_dict(
+                stock_items, filter_query.page, filter_query.page_size, total_count
+            )
+        fields = filter_query.selected_fields
+        total_count = self._count_stock_items(filter_query)
+        query = self.db.query(*stock_item_row_columns(fields)).select_from(StockItem)
+        if "category" in fields:
+            query = query.join(ItemCategory, StockItem.category_id == ItemCategory.id)
+        query = query.filter(and_(*filter_query.filter_list))
+        query = query.order_by(*filter_query.order_by)
+        rows = (
+            query.offset((filter_query.page - 1) * filter_query.page_size)
+            .limit(filter_query.page_size)
+            .all()
+        )
+        return paginate_dict(
+            [stock_item_row_to_dict(row, fields) for row in rows],
+            filter_query.page,
+            filter_query.page_size,
+            total_count,
+        )
+
+    def export_stock_items(self, filter_query: StockItemQuery) -> Iterator[str]:
+        """
+        Yield all stock items matching the filter query as CSV, with the columns read by
+        the import and their IDs and dates. Pagination and field selection are ignored.
+        Rows are fetched with a server side cursor where supported and yielded in batches
+        of EXPORT_BATCH_SIZE, so memory use does not depend on the number of stock items.
+        Args:
+            filter_query (StockItemQuery): Filtering and sorting options.
+        Returns:
+            Iterator[str]: The header row, then the CSV rows in batches.
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        self._resolve_category_name(filter_query)
+        query = (
+            self.db.query(
+                StockItem.id,
+                StockItem.name,
+                StockItem.description,
+                StockItem.quantity,
+                ItemCategory.name,
+                StockItem.creation_date,
+                StockItem.last_modification_date,
+            )
+            .join(ItemCategory, StockItem.category_id == ItemCategory.id)
+            .filter(and_(*filter_query.filter_list))
+            .order_by(*filter_query.order_by)
+            .execution_options(stream_results=True)
+            .yield_per(EXPORT_BATCH_SIZE)
+        )
+        for count, row in enumerate(query, start=1):
+            writer.writerow(
+                (
+                    *row[:5],
+                    row.creation_date.isoformat(),
+                    row.last_modification_date.isoformat(),
+                )
+            )
+            if count % EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    def _check_query_limits(self, filter_query: StockItemQuery):
+        check_query_limits(
+            filter_query,
+            self.app_settings.max_page_sizes["stock-items"],
+            self.app_settings.query_cost_budget,
+            "Use GET /api/v1/stock-items/export to read all matching stock items.",
+        )
+
+    def _resolve_category_name(self, filter_query: StockItemQuery):
+        """
+        Resolve the category name filter to the IDs of the matching categories, so stock
+        items are filtered on the indexed category_id instead of a subquery per row.
+        Args:
+            filter_query (StockItemQuery): Filtering options.
+        """
+        if filter_query.category_name:
+            filter_query.resolve_category_name(
+                self.item_category_service.get_item_category_ids_by_name(
+                    filter_query.category_name
+                )
+            )
+
+    def _count_stock_items(self, filter_query: StockItemQuery) -> int:
+        """
+        Count stock items matching the filter query without selecting their columns.
+        Args:
+            filter_query (StockItemQuery): Filtering options.
+        Returns:
+            int: Number of matching stock items.
+        """
+        return (
+            self.db.query(func.count(StockItem.id))
+            .filter(and_(*filter_query.filter_list))
+            .scalar()
+        )
+
     def get_stock_item_by_name(self, stock_item_name: str) -> StockItem | None:
         """
         Return a stock item by its name.
@@ -136,11 +404,14 @@ class StockItemService:
             )
         return stock_item
 
-    def create_stock_item(self, create_stock_item_dto: CreateStockItemDto) -> StockItem:
+    def create_stock_item(
+        self, create_stock_item_dto: CreateStockItemDto, user_id: int | None = None
+    ) -> StockItem:
         """
         Create a new stock item in the database.
         Args:
             create_stock_item_dto (CreateStockItemDto): Data for the new stock item.
+            user_id (int | None): ID of the user creating the item, recorded in the stock ledger.
         Returns:
             StockItem: The created stock item object.
         Raises:
@@ -159,9 +430,33 @@ class StockItemService:
             current_date = datetime.now(ZoneInfo("Europe/Warsaw"))
             stock_item.creation_date = current_date
             stock_item.last_modification_date = current_date
+            stock_item.movement_count = 1 if stock_item.quantity else 0
             self.db.add(stock_item)
+            self.db.flush()
+            self.category_stock_summary_service.apply_stock_change(
+                stock_item.category_id, 1, stock_item.quantity
+            )
+            low_stock_event = self.low_stock_service.apply_stock_change(
+                stock_item, False
+            )
+            self.stock_movement_service.record_movement(
+                stock_item.id,
+                stock_item.quantity,
+                stock_item.quantity,
+                stock_item.movement_count,
+                "create",
+                user_id,
+            )
+            self.stock_item_sync_service.record_changes([stock_item.id])
             self.db.commit()
+            self.query_cache.invalidate(StockItem.__tablename__)
             self.db.refresh(stock_item)
+            self.name_index.add("stock_item", stock_item.id, stock_item.name)
+            self.trigram_index.add(stock_item.id, stock_item.name)
+            self.read_model.apply(stock_item)
+            self._publish_stock_item_event("stock_item.created", stock_item)
+            if low_stock_event:
+                self._publish_stock_item_event(low_stock_event, stock_item)
             return stock_item
         else:
             raise StockItemAlreadyExistsException(
@@ -172,18 +467,32 @@ class StockItemService:
         self,
         stock_item_id: int,
         update_stock_item_dto: UpdateStockItemDto,
+        user_id: int | None = None,
+        expected_version: int | None = None,
     ) -> StockItem:
         """
         Update an existing stock item's information.
         Args:
             stock_item_id (int): The stock item's ID.
             update_stock_item_dto (UpdateStockItemDto): Data to update.
+            user_id (int | None): ID of the user updating the item, recorded in the stock ledger.
+            expected_version (int | None): Version the update is based on, None to skip the check.
         Returns:
             StockItem: The updated stock item object.
         Raises:
             StockItemAlreadyExistsException: If stock item already exists.
+            VersionMismatchException: If the stock item was changed since expected_version.
         """
         stock_item = self.get_stock_item_by_id(stock_item_id)
+        if expected_version is not None and stock_item.version != expected_version:
+            raise VersionMismatchException(
+                f"Stock item with id={stock_item_id} has version={stock_item.version}, expected version={expected_version}"
+            )
+        previous_name = stock_item.name
+        previous_category_id = stock_item.category_id
+        previous_quantity = stock_item.quantity
+        previous_version = stock_item.version
+        was_low = is_low_stock(stock_item.quantity, stock_item.reorder_threshold)
         current_date = datetime.now(ZoneInfo("Europe/Warsaw"))
         if update_stock_item_dto.name and stock_item.name != update_stock_item_dto.name:
             try:
@@ -209,6 +518,12 @@ class StockItemService:
         ):
             stock_item.quantity = update_stock_item_dto.quantity
             stock_item.last_modification_date = current_date
+        if (
+            update_stock_item_dto.reorder_threshold is not None
+            and stock_item.reorder_threshold != update_stock_item_dto.reorder_threshold
+        ):
+            stock_item.reorder_threshold = update_stock_item_dto.reorder_threshold
+            stock_item.last_modification_date = current_date
         if (
             update_stock_item_dto.category_id
             and stock_item.category_id != update_stock_item_dto.category_id
@@ -218,24 +533,183 @@ class StockItemService:
             )
             stock_item.category_id = update_stock_item_dto.category_id
             stock_item.last_modification_date = current_date
-        self.db.commit()
+        if stock_item.category_id != previous_category_id:
+            self.category_stock_summary_service.apply_stock_change(
+                previous_category_id, -1, -previous_quantity
+            )
+            self.category_stock_summary_service.apply_stock_change(
+                stock_item.category_id, 1, stock_item.quantity
+            )
+        else:
+            self.category_stock_summary_service.apply_stock_change(
+                stock_item.category_id, 0, stock_item.quantity - previous_quantity
+            )
+        low_stock_event = self.low_stock_service.apply_stock_change(stock_item, was_low)
+        if stock_item.quantity != previous_quantity:
+            stock_item.movement_count += 1
+        self.stock_movement_service.record_movement(
+            stock_item.id,
+            stock_item.quantity - previous_quantity,
+            stock_item.quantity,
+            stock_item.movement_count,
+            "update",
+            user_id,
+        )
+        try:
+            self.db.flush()
+            if stock_item.version != previous_version:
+                self.stock_item_sync_service.record_changes([stock_item.id])
+            self.db.commit()
+        except StaleDataError:
+            self.db.rollback()
+            raise VersionMismatchException(
+                f"Stock item with id={stock_item_id} was modified concurrently"
+            )
+        self.query_cache.invalidate(StockItem.__tablename__)
         self.db.refresh(stock_item)
+        self.name_index.rename(
+            "stock_item", stock_item.id, previous_name, stock_item.name
+        )
+        self.trigram_index.add(stock_item.id, stock_item.name)
+        self.read_model.apply(stock_item)
+        if stock_item.version != previous_version:
+            self._publish_stock_item_event("stock_item.updated", stock_item)
+        if low_stock_event:
+            self._publish_stock_item_event(low_stock_event, stock_item)
         return stock_item
 
-    def delete_stock_item(self, stock_item_id: int) -> bool:
+    def delete_stock_item(self, stock_item_id: int, user_id: int | None = None) -> bool:
         """
-        Delete a stock item by its ID.
+        Delete a stock item by its ID and leave a tombstone for the delta sync.
         Args:
             stock_item_id (int): The stock item's ID.
+            user_id (int | None): ID of the user deleting the item, recorded in the stock ledger.
         Returns:
             bool: True if deletion was successful.
+        Raises:
+            VersionMismatchException: If the stock item was changed while being deleted.
         """
         stock_item = self.get_stock_item_by_id(stock_item_id)
 
+        self.low_stock_service.delete_low_stock_item(stock_item.id)
         self.db.delete(stock_item)
-        self.db.commit()
+        self.category_stock_summary_service.apply_stock_change(
+            stock_item.category_id, -1, -stock_item.quantity
+        )
+        self.stock_movement_service.record_movement(
+            stock_item.id,
+            -stock_item.quantity,
+            0,
+            stock_item.movement_count + 1,
+            "delete",
+            user_id,
+        )
+        try:
+            self.stock_item_sync_service.record_deletion(stock_item.id)
+            self.db.commit()
+        except StaleDataError:
+            self.db.rollback()
+            raise VersionMismatchException(
+                f"Stock item with id={stock_item_id} was modified concurrently"
+            )
+        self.query_cache.invalidate(StockItem.__tablename__)
+        self.name_index.remove("stock_item", stock_item.id, stock_item.name)
+        self.trigram_index.remove(stock_item.id)
+        self.read_model.remove(stock_item.id)
+        self.event_broadcaster.publish(
+            "stock_item.deleted",
+            {"id": stock_item.id, "category_id": stock_item.category_id},
+        )
         return True
 
+    def adjust_stock_item_quantity(
+        self,
+        stock_item_id: int,
+        adjust_dto: AdjustStockItemQuantityDto,
+        user_id: int | None = None,
+    ) -> StockItem:
+        """
+        Change the quantity of a stock item by a delta with a single atomic UPDATE,
+        so concurrent adjustments never overwrite each other.
+        Args:
+            stock_item_id (int): The stock item's ID.
+            adjust_dto (AdjustStockItemQuantityDto): Quantity delta and reason.
+            user_id (int | None): ID of the user adjusting the item, recorded in the stock ledger.
+        Returns:
+            StockItem: The adjusted stock item object.
+        Raises:
+            StockItemNotFoundException: If stock item is not found.
+            InsufficientStockException: If the quantity would become negative.
+        """
+        stock_item = self.get_stock_item_by_id(stock_item_id)
+        result = self.db.execute(
+            update(StockItem)
+            .where(
+                StockItem.id == stock_item_id,
+                StockItem.quantity + adjust_dto.delta >= 0,
+            )
+            .values(
+                quantity=StockItem.quantity + adjust_dto.delta,
+                last_modification_date=datetime.now(ZoneInfo("Europe/Warsaw")),
+                version=StockItem.version + 1,
+                movement_count=StockItem.movement_count
+                + (1 if adjust_dto.delta else 0),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            self.db.rollback()
+            raise InsufficientStockException(
+                f"Stock item with id={stock_item_id} has not enough quantity for delta={adjust_dto.delta}"
+            )
+        self.db.refresh(stock_item)
+        self.category_stock_summary_service.apply_stock_change(
+            stock_item.category_id, 0, adjust_dto.delta
+        )
+        # The UPDATE is atomic, so the quantity before it is exactly the delta lower
+        low_stock_event = self.low_stock_service.apply_stock_change(
+            stock_item,
+            is_low_stock(
+                stock_item.quantity - adjust_dto.delta, stock_item.reorder_threshold
+            ),
+        )
+        self.stock_movement_service.record_movement(
+            stock_item.id,
+            adjust_dto.delta,
+            stock_item.quantity,
+            stock_item.movement_count,
+            adjust_dto.reason,
+            user_id,
+        )
+        self.stock_item_sync_service.record_changes([stock_item.id])
+        self.db.commit()
+        self.query_cache.invalidate(StockItem.__tablename__)
+        self.db.refresh(stock_item)
+        self.read_model.apply(stock_item)
+        self._publish_stock_item_event(
+            "stock_item.quantity_changed", stock_item, delta=adjust_dto.delta
+        )
+        if low_stock_event:
+            self._publish_stock_item_event(low_stock_event, stock_item)
+        return stock_item
+
+    def _publish_stock_item_event(
+        self, event_type: str, stock_item: StockItem, **extra_data
+    ):
+        self.event_broadcaster.publish(
+            event_type,
+            {
+                "id": stock_item.id,
+                "name": stock_item.name,
+                "quantity": stock_item.quantity,
+                "reorder_threshold": stock_item.reorder_threshold,
+                "category_id": stock_item.category_id,
+                "version": stock_item.version,
+                "last_modification_date": stock_item.last_modification_date.isoformat(),
+                **extra_data,
+            },
+        )
+
     def check_if_table_is_empty(self) -> bool:
         """
         Check if the stock item table is empty.
@@ -0,0 +1,257 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, joinedload, undefer
+
+from exceptions.exceptions import InvalidSyncTokenException
+from models.entities import StockItem, StockItemChangeSequence, StockItemTombstone
+from models.models import StockItemChangesQuery
+
+"""
+Service for the stock item delta sync used by clients that mirror the catalogue.
+"""
+
+
+def encode_sync_token(
+    change_sequence: int,
+    stock_item_id: int,
+    tombstone_sequence: int,
+    tombstone_id: int,
+) -> str:
+    """
+    Encode a sync watermark as an opaque URL-safe token.
+    Args:
+        change_sequence (int): Change sequence of the last synced item.
+        stock_item_id (int): ID of the last synced item, breaks ties within a write.
+        tombstone_sequence (int): Change sequence of the last synced tombstone.
+        tombstone_id (int): ID of the last synced tombstone.
+    Returns:
+        str: The sync token.
+    """
+    payload = [change_sequence, stock_item_id, tombstone_sequence, tombstone_id]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_sync_token(token: str) -> tuple[int, int, int, int]:
+    """
+    Decode a sync token created by encode_sync_token.
+    Args:
+        token (str): The sync token.
+    Returns:
+        tuple[int, int, int, int]: Change sequence and ID of the last synced item and
+            change sequence and ID of the last synced tombstone.
+    Raises:
+        InvalidSyncTokenException: If the token is malformed.
+    """
+    try:
+        watermark = json.loads(base64.urlsafe_b64decode(token.encode()))
+        if (
+            not isinstance(watermark, list)
+            or len(watermark) != 4
+            or not all(type(value) is int for value in watermark)
+        ):
+            raise ValueError
+    except (binascii.Error, UnicodeError, TypeError, ValueError) as e:
+        raise InvalidSyncTokenException("Invalid sync token.") from e
+    change_sequence, stock_item_id, tombstone_sequence, tombstone_id = watermark
+    return change_sequence, stock_item_id, tombstone_sequence, tombstone_id
+
+
+def get_change_sequence(db: Session) -> int:
+    """
+    Return the number of the last committed stock item write.
+    Args:
+        db (Session): SQLAlchemy session object.
+    Returns:
+        int: The change sequence, 0 before the first numbered write.
+    """
+    value = db.scalar(
+        select(StockItemChangeSequence.value).where(StockItemChangeSequence.id == 1)
+    )
+    return value or 0
+
+
+def get_tombstone_watermark(db: Session, change_sequence: int) -> tuple[int, int]:
+    """
+    Return the position of the last tombstone written up to a change sequence.
+    Args:
+        db (Session): SQLAlchemy session object.
+        change_sequence (int): The change sequence.
+    Returns:
+        tuple[int, int]: Change sequence and ID of the tombstone, (0, 0) if there is none.
+    """
+    tombstone = (
+        db.query(StockItemTombstone.change_sequence, StockItemTombstone.id)
+        .filter(StockItemTombstone.change_sequence <= change_sequence)
+        .order_by(
+            StockItemTombstone.change_sequence.desc(), StockItemTombstone.id.desc()
+        )
+        .first()
+    )
+    if tombstone is None:
+        return 0, 0
+    return tombstone.change_sequence, tombstone.id
+
+
+class StockItemSyncService:
+    """
+    Provides the changes of the stock catalogue since a watermark and numbers the writes
+    that make them. Changed items and tombstones are read through their
+    (change_sequence, id) indexes, so the cost of a sync follows the number of changes.
+
+    Every write takes the next value of the stock_item_change_sequence counter right
+    before it commits and stamps it on the rows it changed. The counter row stays locked
+    until the commit, so writes become visible in the order of their numbers and a
+    watermark never passes a write that is not committed yet. A client following the
+    tokens receives every change exactly once, as soon as it is committed. Numbered
+    writes are serialized at the counter for the duration of their commit.
+    """
+
+    def __init__(self, db: Session):
+        """
+        Initialize StockItemSyncService with a database session.
+        Args:
+            db (Session): SQLAlchemy session object.
+        """
+        self.db = db
+
+    def next_change_sequence(self) -> int:
+        """
+        Take the next change sequence for the current transaction. Pending changes are
+        flushed first, so the counter is the last row the transaction locks.
+        Returns:
+            int: The change sequence.
+        """
+        self.db.flush()
+        values = {"id": 1, "value": 1}
+        if self.db.get_bind().dialect.name == "sqlite":
+            statement = sqlite_insert(StockItemChangeSequence).values(values)
+            statement = statement.on_conflict_do_update(
+                index_elements=[StockItemChangeSequence.id],
+                set_={"value": StockItemChangeSequence.value + 1},
+            )
+        else:
+            statement = mysql_insert(StockItemChangeSequence).values(values)
+            statement = statement.on_duplicate_key_update(
+                value=StockItemChangeSequence.value + 1
+            )
+        self.db.execute(statement)
+        return self.db.scalar(
+            select(StockItemChangeSequence.value).where(StockItemChangeSequence.id == 1)
+        )
+
+    def record_changes(self, stock_item_ids: list[int]) -> None:
+        """
+        Stamp created or modified stock items with the next change sequence. Call it right
+        before the commit. The change is not committed.
+        Args:
+            stock_item_ids (list[int]): IDs of the changed stock items.
+        """
+        change_sequence = self.next_change_sequence()
+        self.db.execute(
+            update(StockItem)
+            .where(StockItem.id.in_(stock_item_ids))
+            .values(change_sequence=change_sequence)
+            .execution_options(synchronize_session=False)
+        )
+
+    def record_deletion(self, stock_item_id: int) -> StockItemTombstone:
+        """
+        Write a tombstone for a deleted stock item, stamped with the next change sequence.
+        Call it right before the commit. The change is not committed.
+        Args:
+            stock_item_id (int): ID of the deleted stock item.
+        Returns:
+            StockItemTombstone: The written tombstone.
+        """
+        tombstone = StockItemTombstone(
+            stock_item_id=stock_item_id,
+            deletion_date=datetime.now(ZoneInfo("Europe/Warsaw")),
+            change_sequence=self.next_change_sequence(),
+        )
+        self.db.add(tombstone)
+        return tombstone
+
+    def get_changes(self, changes_query: StockItemChangesQuery) -> dict:
+        """
+        Return committed stock item changes and deletions since a sync token.
+        Without a token every stock item is returned and past deletions are skipped.
+        Args:
+            changes_query (StockItemChangesQuery): Sync token and page size.
+        Returns:
+            dict: Changed items, deleted IDs, the next token and whether more changes wait.
+        Raises:
+            InvalidSyncTokenException: If the sync token is malformed.
+        """
+        if changes_query.since is not None:
+            change_sequence, stock_item_id, tombstone_sequence, tombstone_id = (
+                decode_sync_token(changes_query.since)
+            )
+        else:
+            change_sequence, stock_item_id = 0, 0
+            tombstone_sequence, tombstone_id = get_tombstone_watermark(
+                self.db, get_change_sequence(self.db)
+            )
+
+        changed = (
+            self.db.query(StockItem)
+            .options(undefer(StockItem.description), joinedload(StockItem.category))
+            .filter(
+                or_(
+                    StockItem.change_sequence > change_sequence,
+                    and_(
+                        StockItem.change_sequence == change_sequence,
+                        StockItem.id > stock_item_id,
+                    ),
+                )
+            )
+            .order_by(StockItem.change_sequence, StockItem.id)
+            .limit(changes_query.limit + 1)
+            .all()
+        )
+        tombstones = (
+            self.db.query(
+                StockItemTombstone.id,
+                StockItemTombstone.stock_item_id,
+                StockItemTombstone.change_sequence,
+            )
+            .filter(
+                or_(
+                    StockItemTombstone.change_sequence > tombstone_sequence,
+                    and_(
+                        StockItemTombstone.change_sequence == tombstone_sequence,
+                        StockItemTombstone.id > tombstone_id,
+                    ),
+                )
+            )
+            .order_by(StockItemTombstone.change_sequence, StockItemTombstone.id)
+            .limit(changes_query.limit + 1)
+            .all()
+        )
+
+        has_more = (
+            len(changed) > changes_query.limit or len(tombstones) > changes_query.limit
+        )
+        changed = changed[: changes_query.limit]
+        tombstones = tombstones[: changes_query.limit]
+        if changed:
+            change_sequence = changed[-1].change_sequence
+            stock_item_id = changed[-1].id
+        if tombstones:
+            tombstone_sequence = tombstones[-1].change_sequence
+            tombstone_id = tombstones[-1].id
+
+        return {
+            "changed": changed,
+            "deleted": [tombstone.stock_item_id for tombstone in tombstones],
+            "next_since": encode_sync_token(
+                change_sequence, stock_item_id, tombstone_sequence, tombstone_id
+            ),
+            "has_more": has_more,
+        }
@@ -0,0 +1,196 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from app_settings import get_app_settings
+from models.entities import StockBalanceSnapshot, StockMovement
+from models.models import StockMovementHistoryQuery
+
+"""
+Service for the append-only stock movement ledger and its periodic balance snapshots.
+"""
+
+
+class StockMovementService:
+    """
+    Provides recording of stock movements, keyset paginated history and point-in-time balances.
+    Movements are written without committing, so they share the caller's transaction.
+    """
+
+    def __init__(self, db: Session):
+        """
+        Initialize StockMovementService with a database session.
+        Args:
+            db (Session): SQLAlchemy session object.
+        """
+        self.db = db
+        self.app_settings = get_app_settings()
+
+    def record_movement(
+        self,
+        stock_item_id: int,
+        delta: int,
+        balance: int,
+        movement_count: int,
+        reason: str,
+        user_id: int | None = None,
+    ) -> StockMovement | None:
+        """
+        Append a movement to the ledger and write a balance snapshot on the first
+        movement of the item and every STOCK_SNAPSHOT_INTERVAL movements after it.
+        The change is not committed.
+        Args:
+            stock_item_id (int): The stock item's ID.
+            delta (int): Quantity change.
+            balance (int): Quantity of the stock item after the change.
+            movement_count (int): Number of movements of the stock item including this
+                one, counted in StockItem.movement_count by the write recording it.
+            reason (str): Reason of the change.
+            user_id (int | None): ID of the user who made the change.
+        Returns:
+            StockMovement | None: The recorded movement, None if delta is zero.
+        """
+        if delta == 0:
+            return None
+        current_date = datetime.now(ZoneInfo("Europe/Warsaw"))
+        movement = StockMovement(
+            stock_item_id=stock_item_id,
+            delta=delta,
+            reason=reason,
+            user_id=user_id,
+            creation_date=current_date,
+        )
+        self.db.add(movement)
+        if (movement_count - 1) % self.app_settings.stock_snapshot_interval != 0:
+            return movement
+        self.db.flush()
+        self.db.add(
+            StockBalanceSnapshot(
+                stock_item_id=stock_item_id,
+                movement_id=movement.id,
+                balance=balance,
+                snapshot_date=current_date,
+            )
+        )
+        return movement
+
+    def record_opening_movements(
+        self, balances: list[tuple[int, int]], reason: str, user_id: int | None = None
+    ):
+        """
+        Append the first movement and its snapshot for many new stock items with two
+        bulk INSERTs. The stock items are inserted with a movement_count of 1 by the
+        caller. The change is not committed.
+        Args:
+            balances (list[tuple[int, int]]): Stock item IDs with their initial quantity.
+            reason (str): Reason of the change.
+            user_id (int | None): ID of the user who made the change.
+        """
+        balances = [
+            (stock_item_id, quantity)
+            for stock_item_id, quantity in balances
+            if quantity != 0
+        ]
+        if not balances:
+            return
+        current_date = datetime.now(ZoneInfo("Europe/Warsaw"))
+        movement_ids = self.db.scalars(
+            insert(StockMovement.__table__).returning(
+                StockMovement.id, sort_by_parameter_order=True
+            ),
+            [
+                {
+                    "stock_item_id": stock_item_id,
+                    "delta": quantity,
+                    "reason": reason,
+                    "user_id": user_id,
+                    "creation_date": current_date,
+                }
+                for stock_item_id, quantity in balances
+            ],
+        ).all()
+        self.db.execute(
+            insert(StockBalanceSnapshot.__table__),
+            [
+                {
+                    "stock_item_id": stock_item_id,
+                    "movement_id": movement_id,
+                    "balance": quantity,
+                    "snapshot_date": current_date,
+                }
+                for (stock_item_id, quantity), movement_id in zip(
+                    balances, movement_ids
+                )
+            ],
+        )
+
+    def get_stock_item_history(
+        self, stock_item_id: int, history_query: StockMovementHistoryQuery
+    ) -> dict:
+        """
+        Return a page of movements of a stock item, newest first, using keyset pagination.
+        Args:
+            stock_item_id (int): The stock item's ID.
+            history_query (StockMovementHistoryQuery): Cursor and page size.
+        Returns:
+            dict: Movements on the page and the cursor of the next page.
+        """
+        query = self.db.query(StockMovement).filter(
+            StockMovement.stock_item_id == stock_item_id
+        )
+        if history_query.before_id is not None:
+            query = query.filter(StockMovement.id < history_query.before_id)
+        movements = (
+            query.order_by(StockMovement.id.desc()).limit(history_query.limit + 1).all()
+        )
+        next_before_id = None
+        if len(movements) > history_query.limit:
+            movements = movements[: history_query.limit]
+            next_before_id = movements[-1].id
+        return {"data": movements, "next_before_id": next_before_id}
+
+    def get_balance_at(self, stock_item_id: int, at: datetime) -> int:
+        """
+        Return the balance of a stock item at a point in time.
+        Reads the latest snapshot taken at or before that time plus the movements
+        recorded after it, which are at most STOCK_SNAPSHOT_INTERVAL rows. Snapshots
+        are ordered by their movement, since local dates may repeat or go backwards.
+        Args:
+            stock_item_id (int): The stock item's ID.
+            at (datetime): Point in time, naive values are read as Europe/Warsaw time.
+        Returns:
+            int: Quantity in stock at that time, 0 before the item existed.
+        """
+        if at.tzinfo is not None:
+            at = at.astimezone(ZoneInfo("Europe/Warsaw")).replace(tzinfo=None)
+        snapshot = (
+            self.db.query(StockBalanceSnapshot)
+            .filter(
+                StockBalanceSnapshot.stock_item_id == stock_item_id,
+                StockBalanceSnapshot.snapshot_date <= at,
+            )
+            .order_by(StockBalanceSnapshot.movement_id.desc())
+            .first()
+        )
+        if snapshot is None:
+            return 0
+        next_snapshot = (
+            self.db.query(StockBalanceSnapshot.movement_id)
+            .filter(
+                StockBalanceSnapshot.stock_item_id == stock_item_id,
+                StockBalanceSnapshot.movement_id > snapshot.movement_id,
+            )
+            .order_by(StockBalanceSnapshot.movement_id.asc())
+            .first()
+        )
+        query = self.db.query(func.sum(StockMovement.delta)).filter(
+            StockMovement.stock_item_id == stock_item_id,
+            StockMovement.id > snapshot.movement_id,
+            StockMovement.creation_date <= at,
+        )
+        if next_snapshot is not None:
+            query = query.filter(StockMovement.id < next_snapshot.movement_id)
+        delta_sum = query.scalar()
+        return snapshot.balance + (delta_sum or 0)
@@ -4,11 +4,15 @@ from zoneinfo import ZoneInfo
 from passlib.context import CryptContext
 from sqlalchemy import and_
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 
+from app_settings import get_app_settings
+from caching.query_cache import get_query_cache
 from exceptions.exceptions import (
     UserAccountIsDisabledException,
     UserAlreadyExistsException,
     UserNotFoundException,
+    VersionMismatchException,
     WrongPasswordException,
 )
 from models.entities import Role, User
@@ -16,10 +20,11 @@ from models.models import (
     CreateUserDto,
     LoginUserDto,
     PagedResult,
+    ReadUserDto,
     UpdateUserDto,
     UserFilterQuery,
 )
-from paginate.paginate import paginate
+from paginate.paginate import check_query_limits, paginate
 from services.role_service import RoleService
 
 """
@@ -39,8 +44,10 @@ class UserService:
             db (Session): SQLAlchemy session object.
         """
         self.db = db
+        self.app_settings = get_app_settings()
         self.bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
         self.role_service = RoleService(db)
+        self.query_cache = get_query_cache()
 
     def get_user_by_id(self, user_id: int) -> User | None:
         """
@@ -60,33 +67,53 @@ class UserService:
     def get_all_users(self, filter_query: UserFilterQuery) -> PagedResult:
         """
         Return all users matching the filter query, with pagination and sorting.
+        Results are cached until users or roles change.
         Args:
             filter_query (UserFilterQuery): Filtering and pagination options.
         Returns:
-            PagedResult: Paginated result of users.
+            PagedResult: Paginated result of users as ReadUserDto.
+        Raises:
+            QueryLimitExceededException: If the page size or the estimated cost of the query is too big.
+        """
+        check_query_limits(
+            filter_query,
+            self.app_settings.max_page_sizes["users"],
+            self.app_settings.query_cost_budget,
+        )
+        return self.query_cache.get_or_compute(
+            "users",
+            filter_query,
+            [User.__tablename__, Role.__tablename__],
+            lambda: self._query_users(filter_query),
+        )
+
+    def _query_users(self, filter_query: UserFilterQuery) -> PagedResult:
+        """
+        Query a page of users matching the filter query.
+        Args:
+            filter_query (UserFilterQuery): Filtering and pagination options.
+        Returns:
+            PagedResult: Paginated result of users converted to ReadUserDto, which unlike
+                the user objects can be cached.
         """
+        if filter_query.role_name:
+            filter_query.resolve_role_name(
+                self.role_service.get_role_ids_by_name(filter_query.role_name)
+            )
         query = self.db.query(User).filter(and_(*filter_query.filter_list))
         total_count = query.count()
 
-        if filter_query.sort_by == "role":
-            query = query.join(Role)
-            if filter_query.sort_direction == "asc":
-                query = query.order_by(Role.name.asc())
-            else:
-                query = query.order_by(Role.name.desc())
-        elif filter_query.sort_by is not None and hasattr(User, filter_query.sort_by):
-            column = getattr(User, filter_query.sort_by)
-            if filter_query.sort_direction == "asc":
-                query = query.order_by(column.asc())
-            else:
-                query = query.order_by(column.desc())
         users = (
-            query.offset((filter_query.page - 1) * filter_query.page_size)
+            query.order_by(*filter_query.order_by)
+            .offset((filter_query.page - 1) * filter_query.page_size)
             .limit(filter_query.page_size)
             .all()
         )
         paged_result = paginate(
-            users, filter_query.page, filter_query.page_size, total_count
+            [ReadUserDto.model_validate(user) for user in users],
+            filter_query.page,
+            filter_query.page_size,
+            total_count,
         )
         return paged_result
 
@@ -148,6 +175,7 @@ class UserService:
                 user.is_active = True
                 self.db.add(user)
                 self.db.commit()
+                self.query_cache.invalidate(User.__tablename__)
                 self.db.refresh(user)
                 return user
             else:
@@ -159,18 +187,29 @@ class UserService:
                 f"User with user_name={user.user_name} already exists"
             )
 
-    def update_user(self, user_id: int, update_user_dto: UpdateUserDto) -> User:
+    def update_user(
+        self,
+        user_id: int,
+        update_user_dto: UpdateUserDto,
+        expected_version: int | None = None,
+    ) -> User:
         """
         Update an existing user's information.
         Args:
             user_id (int): The user's ID.
             update_user_dto (UpdateUserDto): Data to update.
+            expected_version (int | None): Version the update is based on, None to skip the check.
         Returns:
             User: The updated user object.
         Raises:
             UserAlreadyExistsException: If username or email already exists.
+            VersionMismatchException: If the user was changed since expected_version.
         """
         user = self.get_user_by_id(user_id)
+        if expected_version is not None and user.version != expected_version:
+            raise VersionMismatchException(
+                f"User with id={user_id} has version={user.version}, expected version={expected_version}"
+            )
         current_date = datetime.now(ZoneInfo("Europe/Warsaw"))
 
         if update_user_dto.user_name and user.user_name != update_user_dto.user_name:
@@ -213,7 +252,14 @@ class UserService:
 
             user.role_id = update_user_dto.role_id
             user.last_modification_date = current_date
-        self.db.commit()
+        try:
+            self.db.commit()
+        except StaleDataError:
+            self.db.rollback()
+            raise VersionMismatchException(
+                f"User with id={user_id} was modified concurrently"
+            )
+        self.query_cache.invalidate(User.__tablename__)
         self.db.refresh(user)
         return user
 
@@ -224,11 +270,20 @@ class UserService:
             user_id (int): The user's ID.
         Returns:
             User: The deleted user object.
+        Raises:
+            VersionMismatchException: If the user was changed while being deleted.
         """
         user = self.get_user_by_id(user_id)
 
         self.db.delete(user)
-        self.db.commit()
+        try:
+            self.db.commit()
+        except StaleDataError:
+            self.db.rollback()
+            raise VersionMismatchException(
+                f"User with id={user_id} was modified concurrently"
+            )
+        self.query_cache.invalidate(User.__tablename__)
         return user
 
     def verify_user_password(self, login_data: LoginUserDto) -> User:
@@ -0,0 +1,49 @@
+"""
+Shared fixtures of the test suite, run from the project root:
+    python -m pytest
+
+Every test gets its own SQLite database file, services are given sessions of it.
+"""
+
+import os
+
+os.environ.setdefault("envirnoment", "development")
+# Cached results would outlive the database of the test that cached them
+os.environ.setdefault("DEV_QUERY_CACHE_BACKEND", "none")
+
+import pytest  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from database_settings import Base  # noqa: E402
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """
+    Engine of a fresh SQLite database with all tables created.
+    """
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'stock_manager.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    """
+    Session factory bound to the test database, configured like SessionLocal.
+    """
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db(session_factory):
+    """
+    Session of the test database, closed after the test.
+    """
+    with session_factory() as db:
+        yield db
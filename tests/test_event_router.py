@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+
+import dependencies.dependencies
+from models.models import CreateRoleDto, CreateUserDto
+from routers import event_router
+from services.auth_service import AuthService
+from services.role_service import RoleService
+from services.user_service import UserService
+
+
+@pytest.fixture
+def access_token(db):
+    role = RoleService(db).create_role(CreateRoleDto(name="admin"))
+    user = UserService(db).create_user(
+        CreateUserDto(
+            user_name="admin",
+            first_name="Admin",
+            last_name="Admin",
+            email="admin@example.com",
+            password="admin123",
+            role_id=role.id,
+        )
+    )
+    access_token = AuthService(db).create_access_token(user)
+    # Release the connection of the fixture session before streams are counted
+    db.close()
+    return access_token
+
+
+async def _open_streams(app, access_token: str, count: int, on_open):
+    """
+    Open event streams through the ASGI interface, call on_open once all have started
+    and disconnect them.
+    """
+    disconnected = asyncio.Event()
+    opened = [asyncio.Event() for _ in range(count)]
+    status_codes = []
+
+    def stream(index: int):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/events/stream",
+            "raw_path": b"/events/stream",
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"authorization", f"Bearer {access_token}".encode())],
+            "client": ("testclient", 50000 + index),
+            "server": ("testserver", 80),
+        }
+        requested = False
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status_codes.append(message["status"])
+            elif message["type"] == "http.response.body":
+                opened[index].set()
+
+        return app(scope, receive, send)
+
+    tasks = [asyncio.create_task(stream(index)) for index in range(count)]
+    await asyncio.wait_for(asyncio.gather(*(event.wait() for event in opened)), 5)
+    on_open()
+    disconnected.set()
+    await asyncio.wait_for(asyncio.gather(*tasks), 5)
+    return status_codes
+
+
+def test_open_event_streams_hold_no_database_connection(
+    monkeypatch, engine, session_factory, access_token
+):
+    monkeypatch.setattr(dependencies.dependencies, "SessionLocal", session_factory)
+    app = FastAPI()
+    app.include_router(event_router.router)
+    checked_out = []
+
+    status_codes = asyncio.run(
+        _open_streams(
+            app, access_token, 3, lambda: checked_out.append(engine.pool.checkedout())
+        )
+    )
+
+    assert status_codes == [200, 200, 200]
+    assert checked_out == [0]
@@ -0,0 +1,184 @@
+import asyncio
+
+import jwt
+import pytest
+
+import idempotency.idempotency_middleware
+from app_settings import get_app_settings
+from idempotency.idempotency_middleware import (
+    IdempotencyMiddleware,
+    MultipartBodyHasher,
+)
+
+
+class SlowEndpoint:
+    """
+    ASGI application answering 201 once released, counting the requests it ran.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.released = asyncio.Event()
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        while (await receive()).get("more_body", False):
+            pass
+        await self.released.wait()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 201,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        await send({"type": "http.response.body", "body": b'{"id": 1}'})
+
+
+@pytest.fixture
+def app_settings(monkeypatch, session_factory):
+    monkeypatch.setattr(
+        idempotency.idempotency_middleware, "SessionLocal", session_factory
+    )
+    app_settings = get_app_settings()
+    monkeypatch.setattr(app_settings, "_idempotency_wait_timeout", "1")
+    monkeypatch.setattr(app_settings, "_idempotency_lock_timeout", "1")
+    return app_settings
+
+
+def _multipart_body(boundary: str, content: bytes, part_type: str) -> bytes:
+    return (
+        (
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="stock.csv"\r\n'
+            f"Content-Type: {part_type}\r\n\r\n"
+        ).encode()
+        + content
+        + f"\r\n--{boundary}--\r\n".encode()
+    )
+
+
+def _multipart_hash(body: bytes, boundary: str, chunk_size: int = 7) -> bytes:
+    hasher = MultipartBodyHasher(boundary.encode())
+    for start in range(0, len(body), chunk_size):
+        hasher.update(body[start : start + chunk_size])
+    return hasher.digest()
+
+
+async def _post(
+    app,
+    app_settings,
+    key: str = "key-1",
+    body: bytes = b'{"name": "Hammer"}',
+    content_type: bytes = b"application/json",
+) -> tuple[int, dict]:
+    token = jwt.encode(
+        {"id": 1, "sub": "admin"},
+        app_settings.secret_key,
+        algorithm=app_settings.token_algorithm,
+    )
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/v1/stock-items",
+        "query_string": b"",
+        "headers": [
+            (b"authorization", f"Bearer {token}".encode()),
+            (b"idempotency-key", key.encode()),
+            (b"content-type", content_type),
+        ],
+    }
+    messages = [{"type": "http.request", "body": body}]
+    response = {}
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = dict(message["headers"])
+
+    await app(scope, receive, send)
+    return response["status"], response["headers"]
+
+
+def test_duplicate_in_process_gets_409_when_first_request_runs_too_long(
+    app_settings,
+):
+    async def run():
+        endpoint = SlowEndpoint()
+        app = IdempotencyMiddleware(endpoint, [r"/api/v1/stock-items"])
+        first = asyncio.create_task(_post(app, app_settings))
+        await asyncio.sleep(0.2)
+        duplicate_status, _ = await asyncio.wait_for(_post(app, app_settings), 3)
+        endpoint.released.set()
+        first_status, _ = await first
+        return endpoint.calls, first_status, duplicate_status
+
+    assert asyncio.run(run()) == (1, 201, 409)
+
+
+def test_running_request_is_not_taken_over_by_another_worker(app_settings):
+    async def run():
+        endpoint = SlowEndpoint()
+        worker = IdempotencyMiddleware(endpoint, [r"/api/v1/stock-items"])
+        other_worker = IdempotencyMiddleware(endpoint, [r"/api/v1/stock-items"])
+        first = asyncio.create_task(_post(worker, app_settings))
+        # Outlast the lock timeout, the reservation is renewed meanwhile
+        await asyncio.sleep(1.5)
+        duplicate_status, _ = await _post(other_worker, app_settings)
+        endpoint.released.set()
+        first_status, _ = await first
+        retry_status, retry_headers = await _post(other_worker, app_settings)
+        return (
+            endpoint.calls,
+            first_status,
+            duplicate_status,
+            retry_status,
+            retry_headers.get(b"idempotent-replayed"),
+        )
+
+    assert asyncio.run(run()) == (1, 201, 409, 201, b"true")
+
+
+def test_multipart_hash_ignores_boundary_and_part_content_type():
+    content = b"name,quantity,category_id\nHammer,5,1\n"
+    first = _multipart_body("boundary-1", content, "text/csv")
+    retry = _multipart_body("other-boundary-2", content, "application/octet-stream")
+    changed = _multipart_body("boundary-1", content + b"Saw,1,1\n", "text/csv")
+
+    assert _multipart_hash(first, "boundary-1") == _multipart_hash(
+        retry, "other-boundary-2", chunk_size=3
+    )
+    assert _multipart_hash(first, "boundary-1") != _multipart_hash(
+        changed, "boundary-1"
+    )
+
+
+def test_invalid_multipart_is_hashed_by_bytes():
+    assert _multipart_hash(b"not multipart", "boundary-1") != _multipart_hash(
+        b"not multipart either", "boundary-1"
+    )
+
+
+def test_retry_of_reencoded_upload_replays_response(app_settings):
+    async def run():
+        endpoint = SlowEndpoint()
+        endpoint.released.set()
+        app = IdempotencyMiddleware(endpoint, [r"/api/v1/stock-items"])
+        content = b"name,quantity,category_id\nHammer,5,1\n"
+        statuses = []
+        for boundary in ("boundary-1", "boundary-2"):
+            status, headers = await _post(
+                app,
+                app_settings,
+                body=_multipart_body(boundary, content, "text/csv"),
+                content_type=f"multipart/form-data; boundary={boundary}".encode(),
+            )
+            statuses.append((status, headers.get(b"idempotent-replayed")))
+        return endpoint.calls, statuses
+
+    assert asyncio.run(run()) == (1, [(201, None), (201, b"true")])
@@ -0,0 +1,32 @@
+import pytest
+
+from exceptions.exceptions import VersionMismatchException
+from models.entities import ItemCategory
+from models.models import CreateItemCategoryDto, UpdateItemCategoryDto
+from services.item_category_service import ItemCategoryService
+
+
+def test_delete_category_changed_concurrently_raises_version_mismatch(
+    session_factory,
+):
+    with session_factory() as db:
+        category_id = (
+            ItemCategoryService(db)
+            .create_item_category(CreateItemCategoryDto(name="Tools"))
+            .id
+        )
+
+    with session_factory() as deleting_db, session_factory() as updating_db:
+        deleting_service = ItemCategoryService(deleting_db)
+        # The deleting request has read the category before the rename commits
+        item_category = deleting_service.get_item_category_by_id(category_id)
+        ItemCategoryService(updating_db).update_category(
+            category_id, UpdateItemCategoryDto(name="Hand tools")
+        )
+
+        with pytest.raises(VersionMismatchException):
+            deleting_service.delete_category(category_id)
+        assert item_category.version == 2
+
+    with session_factory() as db:
+        assert db.get(ItemCategory, category_id).name == "Hand tools"
@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pytest
+
+import jobs.job_runner
+from app_settings import get_app_settings
+from jobs.job_handlers import JOB_HANDLERS
+from jobs.job_runner import JobRunner
+from models.models import CreateJobDto, JobStatus
+from services.job_service import JobService
+
+
+@pytest.fixture
+def job_runner(monkeypatch, session_factory):
+    monkeypatch.setattr(jobs.job_runner, "SessionLocal", session_factory)
+    job_runner = JobRunner(1, heartbeat_interval=0.1, retry_delay=0.5)
+    yield job_runner
+    job_runner.executor.shutdown(wait=True)
+
+
+def _wait_for_status(db, job_id: int, status: JobStatus, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        db.expire_all()
+        job = JobService(db).get_job_by_id(job_id)
+        if job.status == status.value:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job with id={job_id} did not become {status.value}")
+
+
+def test_running_job_without_progress_is_not_requeued(
+    monkeypatch, db, session_factory, job_runner
+):
+    monkeypatch.setattr(get_app_settings(), "_job_stale_timeout", "1")
+    released = threading.Event()
+    monkeypatch.setitem(
+        JOB_HANDLERS, "wait", lambda db, parameters, context: released.wait(5)
+    )
+    job = JobService(db).create_job(CreateJobDto(job_type="wait"))
+
+    job_runner.submit(job.id)
+    _wait_for_status(db, job.id, JobStatus.running)
+    # Outlast the stale timeout, the handler reports no progress meanwhile
+    time.sleep(1.5)
+    # Resumed in its own session, like JobRunner.resume_jobs
+    with session_factory() as resume_db:
+        assert JobService(resume_db).get_jobs_to_resume() == []
+    released.set()
+
+    job = _wait_for_status(db, job.id, JobStatus.succeeded)
+    assert job.attempts == 1
+
+
+def test_failed_job_is_retried_after_delay(monkeypatch, db, job_runner):
+    attempt_times = []
+
+    def fail(db, parameters, context):
+        attempt_times.append(time.monotonic())
+        raise ValueError("Failed")
+
+    monkeypatch.setitem(JOB_HANDLERS, "fail", fail)
+    job = JobService(db).create_job(CreateJobDto(job_type="fail", max_attempts=3))
+
+    job_runner.submit(job.id)
+
+    job = _wait_for_status(db, job.id, JobStatus.failed)
+    assert job.attempts == 3
+    assert job.error == "ValueError: Failed"
+    # Delays double, 0.5 s after the first attempt and 1 s after the second
+    assert attempt_times[1] - attempt_times[0] >= 0.5
+    assert attempt_times[2] - attempt_times[1] >= 1.0
@@ -0,0 +1,137 @@
+"""
+Checks on SQLite that the stock item list filters and the indexed sorts are served by
+an index, like benchmarks/explain_stock_item_filters.py does on a larger database.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from caching.query_cache import QueryCache
+from database_settings import Base
+from models.entities import ItemCategory, StockItem
+from models.models import StockItemQuery
+from services.stock_item_service import StockItemService
+
+CATEGORY_COUNT = 20
+STOCK_ITEM_COUNT = 5_000
+START_DATE = datetime(2025, 1, 1)
+END_DATE = START_DATE + timedelta(minutes=STOCK_ITEM_COUNT)
+
+FILTER_COMBINATIONS = {
+    "low stock": StockItemQuery(quantity_max=2),
+    "low stock in category": StockItemQuery(category_id=3, quantity_max=2),
+    "quantity range in category": StockItemQuery(
+        category_id=3, quantity_min=10, quantity_max=20
+    ),
+    "category": StockItemQuery(category_id=3),
+    "recently modified": StockItemQuery(modified_after=END_DATE - timedelta(hours=12)),
+    "created between": StockItemQuery(
+        created_after=START_DATE + timedelta(days=1),
+        created_before=START_DATE + timedelta(days=1, hours=6),
+    ),
+}
+
+SORT_COMBINATIONS = {
+    "by name": StockItemQuery(sort="name"),
+    "by quantity descending": StockItemQuery(sort="-quantity"),
+    "by category and quantity": StockItemQuery(sort="category_id,quantity"),
+    "by creation date": StockItemQuery(sort="creation_date"),
+    "recently modified first": StockItemQuery(sort="-last_modification_date"),
+    "category by quantity": StockItemQuery(category_id=3, sort="quantity"),
+}
+
+
+@pytest.fixture(scope="module")
+def seeded_db(tmp_path_factory):
+    engine = create_engine(
+        f"sqlite:///{tmp_path_factory.mktemp('plans') / 'stock_manager.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add_all(
+            ItemCategory(
+                name=f"Category {i}",
+                creation_date=START_DATE,
+                last_modification_date=START_DATE,
+            )
+            for i in range(CATEGORY_COUNT)
+        )
+        db.flush()
+        category_ids = [category_id for (category_id,) in db.query(ItemCategory.id)]
+        db.execute(
+            insert(StockItem.__table__),
+            [
+                {
+                    "name": f"Item {i}",
+                    "quantity": i % 97,
+                    "category_id": category_ids[i % CATEGORY_COUNT],
+                    "creation_date": START_DATE + timedelta(minutes=i),
+                    "last_modification_date": START_DATE + timedelta(minutes=i),
+                    "version": 1,
+                }
+                for i in range(STOCK_ITEM_COUNT)
+            ],
+        )
+        db.execute(text("ANALYZE"))
+        db.commit()
+        yield db
+    engine.dispose()
+
+
+def _capture_statements(db, filter_query: StockItemQuery) -> list[tuple]:
+    """
+    Run the list queries of a filter on the database and return their SQL and parameters.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        statements.append((statement, parameters))
+
+    service = StockItemService(db)
+    service.query_cache = QueryCache(None, 0)
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        service.get_all_stock_items_rows(filter_query)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    assert statements
+    return statements
+
+
+def _query_plan(db, statement: str, parameters) -> list[str]:
+    return [
+        row[3]
+        for row in db.connection()
+        .exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        .all()
+    ]
+
+
+@pytest.mark.parametrize("name", FILTER_COMBINATIONS)
+def test_filter_does_not_scan_stock_items(seeded_db, name):
+    for statement, parameters in _capture_statements(
+        seeded_db, FILTER_COMBINATIONS[name]
+    ):
+        plan = _query_plan(seeded_db, statement, parameters)
+        assert not any(detail.startswith("SCAN stock_item") for detail in plan), plan
+
+
+@pytest.mark.parametrize("name", SORT_COMBINATIONS)
+def test_sort_does_not_sort_stock_items(seeded_db, name):
+    # The last statement is the page query, the count query is not sorted
+    statement, parameters = _capture_statements(seeded_db, SORT_COMBINATIONS[name])[-1]
+    plan = _query_plan(seeded_db, statement, parameters)
+    assert not any(detail.startswith("USE TEMP B-TREE") for detail in plan), plan
+
+
+def test_unindexed_sort_is_sorted_by_the_database(seeded_db):
+    statement, parameters = _capture_statements(
+        seeded_db, StockItemQuery(sort="category")
+    )[-1]
+    plan = _query_plan(seeded_db, statement, parameters)
+    assert any(detail.startswith("USE TEMP B-TREE") for detail in plan), plan
@@ -0,0 +1,49 @@
+import pytest
+
+from exceptions.exceptions import VersionMismatchException
+from models.entities import StockItem, StockItemTombstone
+from models.models import (
+    AdjustStockItemQuantityDto,
+    CreateItemCategoryDto,
+    CreateStockItemDto,
+)
+from services.item_category_service import ItemCategoryService
+from services.stock_item_service import StockItemService
+
+
+@pytest.fixture
+def stock_item_id(db):
+    category = ItemCategoryService(db).create_item_category(
+        CreateItemCategoryDto(name="Tools")
+    )
+    stock_item = StockItemService(db).create_stock_item(
+        CreateStockItemDto(name="Hammer", quantity=5, category_id=category.id)
+    )
+    return stock_item.id
+
+
+def test_delete_stock_item_changed_concurrently_raises_version_mismatch(
+    session_factory, stock_item_id
+):
+    with session_factory() as deleting_db, session_factory() as adjusting_db:
+        deleting_service = StockItemService(deleting_db)
+        # The deleting request has read the stock item before the adjustment commits
+        stock_item = deleting_service.get_stock_item_by_id(stock_item_id)
+        StockItemService(adjusting_db).adjust_stock_item_quantity(
+            stock_item_id, AdjustStockItemQuantityDto(delta=-2, reason="sale")
+        )
+
+        with pytest.raises(VersionMismatchException):
+            deleting_service.delete_stock_item(stock_item_id)
+        assert stock_item.version == 2
+
+    with session_factory() as db:
+        assert db.get(StockItem, stock_item_id).quantity == 3
+        assert db.query(StockItemTombstone).count() == 0
+
+
+def test_delete_stock_item(db, stock_item_id):
+    assert StockItemService(db).delete_stock_item(stock_item_id)
+
+    assert db.get(StockItem, stock_item_id) is None
+    assert db.query(StockItemTombstone).count() == 1
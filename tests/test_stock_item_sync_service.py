@@ -0,0 +1,102 @@
+import pytest
+
+from exceptions.exceptions import InvalidSyncTokenException
+from models.models import (
+    AdjustStockItemQuantityDto,
+    CreateItemCategoryDto,
+    CreateStockItemDto,
+    StockItemChangesQuery,
+    UpdateStockItemDto,
+)
+from services.item_category_service import ItemCategoryService
+from services.stock_item_service import StockItemService
+from services.stock_item_sync_service import (
+    StockItemSyncService,
+    encode_sync_token,
+    get_change_sequence,
+)
+
+
+@pytest.fixture
+def stock_item_ids(db):
+    category = ItemCategoryService(db).create_item_category(
+        CreateItemCategoryDto(name="Tools")
+    )
+    stock_item_service = StockItemService(db)
+    return [
+        stock_item_service.create_stock_item(
+            CreateStockItemDto(name=name, quantity=5, category_id=category.id)
+        ).id
+        for name in ("Hammer", "Saw", "Drill")
+    ]
+
+
+def test_get_changes_hands_out_writes_in_commit_order(db, stock_item_ids):
+    hammer_id, saw_id, drill_id = stock_item_ids
+    sync_service = StockItemSyncService(db)
+    changes = sync_service.get_changes(StockItemChangesQuery())
+    assert [stock_item.id for stock_item in changes["changed"]] == stock_item_ids
+    assert changes["deleted"] == []
+    assert not changes["has_more"]
+
+    stock_item_service = StockItemService(db)
+    stock_item_service.adjust_stock_item_quantity(
+        drill_id, AdjustStockItemQuantityDto(delta=1, reason="delivery")
+    )
+    stock_item_service.update_stock_item(hammer_id, UpdateStockItemDto(quantity=7))
+    stock_item_service.delete_stock_item(saw_id)
+    changes = sync_service.get_changes(
+        StockItemChangesQuery(since=changes["next_since"])
+    )
+    assert [stock_item.id for stock_item in changes["changed"]] == [drill_id, hammer_id]
+    assert changes["deleted"] == [saw_id]
+    assert get_change_sequence(db) == 6
+
+    changes = sync_service.get_changes(
+        StockItemChangesQuery(since=changes["next_since"])
+    )
+    assert changes["changed"] == []
+    assert changes["deleted"] == []
+
+
+def test_get_changes_pages_through_changes(db, stock_item_ids):
+    sync_service = StockItemSyncService(db)
+    changed = []
+    changes = {"next_since": None, "has_more": True}
+    while changes["has_more"]:
+        changes = sync_service.get_changes(
+            StockItemChangesQuery(since=changes["next_since"], limit=2)
+        )
+        changed += [stock_item.id for stock_item in changes["changed"]]
+    assert changed == stock_item_ids
+
+
+def test_full_sync_skips_past_deletions(db, stock_item_ids):
+    StockItemService(db).delete_stock_item(stock_item_ids[0])
+
+    changes = StockItemSyncService(db).get_changes(StockItemChangesQuery())
+    assert [stock_item.id for stock_item in changes["changed"]] == stock_item_ids[1:]
+    assert changes["deleted"] == []
+
+
+def test_unchanged_update_is_not_handed_out_again(db, stock_item_ids):
+    sync_service = StockItemSyncService(db)
+    since = sync_service.get_changes(StockItemChangesQuery())["next_since"]
+
+    StockItemService(db).update_stock_item(stock_item_ids[0], UpdateStockItemDto())
+    changes = sync_service.get_changes(StockItemChangesQuery(since=since))
+    assert changes["changed"] == []
+
+
+@pytest.mark.parametrize(
+    "since",
+    [
+        "not a token",
+        encode_sync_token(1, 1, 1, 1)[:-4],
+        # Tokens of the former date based watermark
+        "WyIyMDI2LTEwLTE5VDEyOjAwOjAwIiwgMSwgMF0=",
+    ],
+)
+def test_get_changes_rejects_invalid_tokens(db, since):
+    with pytest.raises(InvalidSyncTokenException):
+        StockItemSyncService(db).get_changes(StockItemChangesQuery(since=since))